@@ -10,3 +10,13 @@ class TestdjereoConfig(AppConfig):
 
         checks.register(check_dev_mode)
         checks.register(check_model_names)
+
+        # connect the receivers invalidating cached pages & waffle snapshots when
+        # waffle state changes, adding fields & cache stats to the request logs, and
+        # recording metrics & slow queries, of the queries timed by `db`
+        from testdjereo import db, metrics, request_logs, slow_queries  # noqa: F401
+        from testdjereo.cache import flags, instrumented, page  # noqa: F401
+        from testdjereo.cache.rows import connect_signals
+
+        # once every model is loaded, to find those opting in to the row cache
+        connect_signals()
@@ -0,0 +1,126 @@
+"""Move soft-deleted rows of `DeletedAtModel` subclasses out of their hot tables.
+
+Rows tombstoned for longer than a retention window are processed in bounded batches.
+Each batch runs in its own short transaction: its rows are locked, copied to an
+archive and hard-deleted. Committed batches are never revisited, so an interrupted
+purge resumes where it left off when run again.
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+
+@dataclass
+class PurgeResult:
+    rows: int = 0
+    batches: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+class TableArchive:
+    """Copy rows into an archive table with the same columns as the source table.
+
+    The archive table is created on first use if it does not exist yet.
+    """
+
+    def __init__(self, table: str):
+        self.table = table
+
+    def prepare(self, model, using):
+        connection = connections[using]
+        table = connection.ops.quote_name(self.table)
+        source = connection.ops.quote_name(model._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} (LIKE {source} INCLUDING DEFAULTS)"
+            )
+
+    def write(self, model, pks, using):
+        connection = connections[using]
+        table = connection.ops.quote_name(self.table)
+        source = connection.ops.quote_name(model._meta.db_table)
+        pk = connection.ops.quote_name(model._meta.pk.column)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} SELECT * FROM {source} WHERE {pk} = ANY(%s)",  # noqa: S608
+                [list(pks)],
+            )
+
+
+class NdjsonArchive:
+    """Append rows to a newline-delimited JSON file, one object per row."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def prepare(self, model, using):
+        pass
+
+    def write(self, model, pks, using):
+        rows = model.all_objects.using(using).filter(pk__in=pks).values()
+        with open(self.path, "a") as f:
+            for row in rows:
+                f.write(json.dumps(row, cls=DjangoJSONEncoder) + "\n")
+            # make sure rows are on disk before the transaction deleting them commits
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def purge_soft_deleted(
+    model,
+    *,
+    retention,
+    batch_size=1000,
+    pause=0.0,
+    archive=None,
+    max_batches=None,
+    using=DEFAULT_DB_ALIAS,
+    on_batch=None,
+) -> PurgeResult:
+    """Archive then hard-delete rows of `model` soft-deleted before `retention` ago.
+
+    `pause` seconds are slept between batches to throttle the load on the database,
+    and `on_batch` is called with the running `PurgeResult` after every batch. Rows
+    locked by other transactions are skipped rather than waited on.
+    """
+    cutoff = timezone.now() - retention
+    expired = model.all_objects.using(using).filter(deleted_at__lt=cutoff)
+    result = PurgeResult()
+    start = time.perf_counter()
+
+    if archive is not None:
+        archive.prepare(model, using)
+
+    while max_batches is None or result.batches < max_batches:
+        with transaction.atomic(using=using):
+            pks = list(
+                expired.select_for_update(skip_locked=True)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            if archive is not None:
+                archive.write(model, pks, using)
+            model.all_objects.using(using).filter(pk__in=pks).delete()
+
+        result.rows += len(pks)
+        result.batches += 1
+        result.elapsed = time.perf_counter() - start
+        if on_batch is not None:
+            on_batch(result)
+        if pause:
+            time.sleep(pause)
+
+    result.elapsed = time.perf_counter() - start
+    return result
@@ -0,0 +1,203 @@
+"""Compute cached values once, however many requests miss them at the same time.
+
+When a popular key expires, or the whole cache goes cold as on deploys, every
+request missing the key would otherwise recompute it at once. `get_or_compute()`
+and the `cached_computation` decorator collapse concurrent misses of a key into a
+single computation:
+
+- within a process, threads missing the same key wait for the first one's result.
+- across processes, the first to `add()` a lock key computes, while the others poll
+  the cache for its result, computing it themselves only after `lock_timeout`.
+
+Values are also refreshed before they expire, XFetch-style: each read recomputes
+early with a probability that grows as expiry nears, scaled by how long the value
+took to compute & by `beta`. So popular keys are usually refreshed by one request
+before they expire at all. With `stale_timeout`, values are kept for that many more
+seconds after they expire, and served while one background thread recomputes them.
+
+It works with any cache backend, although only backends with an atomic `add()`
+shared between processes, eg. `SharedMemoryCache` or `PostgresCache`, collapse
+misses across processes.
+"""
+
+import functools
+import hashlib
+import math
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache as default_cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import connections
+
+LOCK_SUFFIX = ":compute-lock"
+POLL_INTERVAL = 0.05
+
+
+class _Flight:
+    """A computation in progress in this process, which other threads can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.ok = False
+
+
+_flights: dict[str, _Flight] = {}
+_flights_lock = threading.Lock()
+_refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+
+
+def get_or_compute(
+    key,
+    compute,
+    *,
+    timeout=DEFAULT_TIMEOUT,
+    beta=1.0,
+    stale_timeout=0,
+    lock_timeout=10,
+    cache=None,
+):
+    """The value cached under `key`, computed by calling `compute()` on a miss.
+
+    `timeout` is how many seconds values are fresh for, defaulting to the cache's
+    timeout. `beta` scales early recomputation: 0 disables it, above 1 favours it.
+    """
+    cache = cache or default_cache
+    if timeout is DEFAULT_TIMEOUT:
+        timeout = cache.default_timeout
+    entry = cache.get(key)
+    now = time.time()
+
+    if entry is not None:
+        value, delta, expires = entry
+        # XFetch: `-log(random())` is exponentially distributed around 1
+        if now - delta * beta * math.log(1 - random.random()) < expires:  # noqa: S311
+            return value
+        if now >= expires:
+            # stale, so serve it while it is recomputed in the background
+            if token := _lock(cache, key, lock_timeout):
+                _refresher.submit(
+                    _refresh, cache, key, compute, timeout, stale_timeout, token
+                )
+            return value
+        # early recomputation, by whoever takes the lock first
+        if not (token := _lock(cache, key, lock_timeout)):
+            return value
+        try:
+            return _compute(cache, key, compute, timeout, stale_timeout)
+        finally:
+            _unlock(cache, key, token)
+
+    return _single_flight(cache, key, compute, timeout, stale_timeout, lock_timeout)
+
+
+def _single_flight(cache, key, compute, timeout, stale_timeout, lock_timeout):
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+
+    if not leader:
+        if flight.done.wait(lock_timeout) and flight.ok:
+            return flight.value
+        return compute()
+
+    try:
+        flight.value = _compute_once(
+            cache, key, compute, timeout, stale_timeout, lock_timeout
+        )
+        flight.ok = True
+        return flight.value
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        flight.done.set()
+
+
+def _compute_once(cache, key, compute, timeout, stale_timeout, lock_timeout):
+    """Compute the value, unless another process already is & finishes in time."""
+    token = _lock(cache, key, lock_timeout)
+    if token:
+        try:
+            return _compute(cache, key, compute, timeout, stale_timeout)
+        finally:
+            _unlock(cache, key, token)
+
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+    return _compute(cache, key, compute, timeout, stale_timeout)
+
+
+def _compute(cache, key, compute, timeout, stale_timeout):
+    start = time.perf_counter()
+    value = compute()
+    delta = time.perf_counter() - start
+    if timeout is None:
+        cache.set(key, (value, delta, math.inf), None)
+    else:
+        cache.set(key, (value, delta, time.time() + timeout), timeout + stale_timeout)
+    return value
+
+
+def _refresh(cache, key, compute, timeout, stale_timeout, token):
+    try:
+        _compute(cache, key, compute, timeout, stale_timeout)
+    finally:
+        _unlock(cache, key, token)
+        # don't leave this thread's database connections open
+        connections.close_all()
+
+
+def _lock(cache, key, lock_timeout):
+    """Take the lock on computing `key`, returning a token to release it with."""
+    token = uuid.uuid4().hex
+    return token if cache.add(key + LOCK_SUFFIX, token, lock_timeout) else None
+
+
+def _unlock(cache, key, token):
+    # unless the lock timed out & was taken by someone else since
+    if cache.get(key + LOCK_SUFFIX) == token:
+        cache.delete(key + LOCK_SUFFIX)
+
+
+def cached_computation(
+    timeout=DEFAULT_TIMEOUT, *, key=None, beta=1.0, stale_timeout=0, lock_timeout=10
+):
+    """Decorate a function to cache its results with `get_or_compute()`.
+
+    The cache key is built by `key(*args, **kwargs)`, by default from the function's
+    name and the `repr()` of its arguments. To cache a view, pass a `key` built from
+    the request, eg. `lambda request: request.get_full_path()`, and only cache
+    responses that do not vary by user.
+    """
+
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        def default_key(*args, **kwargs):
+            arguments = repr((args, sorted(kwargs.items()))).encode()
+            return f"{name}:{hashlib.md5(arguments, usedforsecurity=False).hexdigest()}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_or_compute(
+                (key or default_key)(*args, **kwargs),
+                functools.partial(func, *args, **kwargs),
+                timeout=timeout,
+                beta=beta,
+                stale_timeout=stale_timeout,
+                lock_timeout=lock_timeout,
+            )
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,223 @@
+"""In-process snapshot of every waffle flag, switch & sample, served as waffle's cache.
+
+waffle looks each flag, switch & sample up in its cache (`WAFFLE_CACHE_NAME`), and
+the users & groups of each flag too, so every `flag_is_active()` costs one or more
+round trips to a shared cache, or to the database when it misses. This backend
+instead loads all of them, with one query, into a snapshot shared by the threads of
+the process, and answers waffle's lookups from it: a dict lookup each.
+
+The snapshot is tagged with a version kept in a shared cache (`OPTIONS["CACHE"]`).
+waffle flushes its cache whenever a flag, switch or sample is saved or deleted, eg.
+in the admin, which here replaces the version, so every process reloads on its next
+check. A request checks the version once, on its first lookup, then keeps using the
+same snapshot until it finishes; outside requests, it is checked again every
+`RECHECK_INTERVAL` seconds.
+
+```
+CACHES = {
+    "waffle": {
+        "BACKEND": "testdjereo.cache.flags.WaffleSnapshotCache",
+        "OPTIONS": {"CACHE": "default", "RECHECK_INTERVAL": 1},
+    },
+}
+WAFFLE_CACHE_NAME = "waffle"
+```
+
+Writes by waffle are ignored, and keys not in the snapshot read as waffle's "empty"
+marker, as every flag, switch & sample that exists is in it. The objects served are
+shared, so must not be modified.
+"""
+
+import json
+import threading
+import time
+import uuid
+from decimal import Decimal
+
+import waffle
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+from waffle.models import CACHE_EMPTY
+from waffle.utils import get_setting, keyfmt
+
+# the latest snapshot loaded by this process, by cache name: (version, entries)
+_snapshots: dict[str, tuple[str, dict]] = {}
+_snapshots_lock = threading.Lock()
+
+
+class WaffleSnapshotCache(BaseCache):
+    def __init__(self, name, params):
+        super().__init__(params)
+        self._name = name
+        options = params.get("OPTIONS", {})
+        self._version_cache = options.get("CACHE", "default")
+        self._recheck_interval = options.get("RECHECK_INTERVAL", 1)
+        self._database = options.get("DATABASE", DEFAULT_DB_ALIAS)
+        self._version_key = f"waffle-snapshot:{name}:version"
+        # the snapshot used until the end of the current request
+        self._pinned = None
+        self._pinned_at = 0.0
+
+    def get(self, key, default=None, version=None):
+        return self._entries().get(key, CACHE_EMPTY)
+
+    def get_many(self, keys, version=None):
+        entries = self._entries()
+        return {key: entries.get(key, CACHE_EMPTY) for key in keys}
+
+    def has_key(self, key, version=None):
+        return True
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return False
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        pass
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return False
+
+    def delete(self, key, version=None):
+        self.invalidate()
+        return True
+
+    def delete_many(self, keys, version=None):
+        self.invalidate()
+
+    def clear(self):
+        self.invalidate()
+
+    def close(self, **kwargs):
+        # called when each request finishes, so the next one checks the version
+        self._pinned = None
+
+    def invalidate(self):
+        """Make every process reload the snapshot."""
+        caches[self._version_cache].set(self._version_key, uuid.uuid4().hex, None)
+        self._pinned = None
+
+    def _entries(self):
+        now = time.monotonic()
+        if self._pinned is None or now - self._pinned_at > self._recheck_interval:
+            self._pinned = self._snapshot()
+            self._pinned_at = now
+        return self._pinned
+
+    def _snapshot(self):
+        version_cache = caches[self._version_cache]
+        version = version_cache.get(self._version_key)
+        if version is None:
+            version_cache.add(self._version_key, uuid.uuid4().hex, None)
+            version = version_cache.get(self._version_key)
+        snapshot = _snapshots.get(self._name)
+        if snapshot is not None and version is not None and snapshot[0] == version:
+            return snapshot[1]
+
+        with _snapshots_lock:
+            # another thread may have loaded it while this one waited
+            snapshot = _snapshots.get(self._name)
+            if snapshot is not None and version is not None and snapshot[0] == version:
+                return snapshot[1]
+            entries = load_snapshot(self._database)
+            if version is not None:
+                _snapshots[self._name] = (version, entries)
+            return entries
+
+
+def load_snapshot(using=DEFAULT_DB_ALIAS):
+    """Load every flag, switch & sample, and the users & groups of each flag, with
+    one query, into a dict of waffle's cache keys to the values it would cache."""
+    flag_model = waffle.get_waffle_flag_model()
+    switch_model = waffle.get_waffle_switch_model()
+    sample_model = waffle.get_waffle_sample_model()
+    users_field = flag_model._meta.get_field("users")
+    groups_field = flag_model._meta.get_field("groups")
+
+    connection = connections[using]
+    qn = connection.ops.quote_name
+
+    def rows(model):
+        return f"(SELECT json_agg(t)::text FROM {qn(model._meta.db_table)} t)"  # noqa: S608
+
+    def pairs(field):
+        table = qn(field.remote_field.through._meta.db_table)
+        pair = f"{qn(field.m2m_column_name())}, {qn(field.m2m_reverse_name())}"
+        return f"(SELECT json_agg(json_build_array({pair}))::text FROM {table})"  # noqa: S608
+
+    # all tables in one statement, so the snapshot is consistent too
+    query = "SELECT " + ", ".join(
+        [
+            rows(flag_model),
+            rows(switch_model),
+            rows(sample_model),
+            pairs(users_field),
+            pairs(groups_field),
+        ]
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(query)
+        results = [
+            # exact numbers, eg. for `Flag.percent`
+            json.loads(value, parse_float=Decimal) if value else []
+            for value in cursor.fetchone()
+        ]
+    flag_rows, switch_rows, sample_rows, user_pairs, group_pairs = results
+
+    entries = {}
+    flags = {}
+    for model, model_rows in [
+        (flag_model, flag_rows),
+        (switch_model, switch_rows),
+        (sample_model, sample_rows),
+    ]:
+        objs = [from_row(model, row, using) for row in model_rows]
+        for obj in objs:
+            entries[model._cache_key(obj.name)] = obj
+        entries[get_setting(model.ALL_CACHE_KEY)] = objs or CACHE_EMPTY
+        if model is flag_model:
+            flags = {obj.pk: obj for obj in objs}
+
+    user_pk = get_user_model()._meta.pk
+    group_pk = Group._meta.pk
+    for setting, related_pairs, pk_field in [
+        ("FLAG_USERS_CACHE_KEY", user_pairs, user_pk),
+        ("FLAG_GROUPS_CACHE_KEY", group_pairs, group_pk),
+    ]:
+        ids = {}
+        for flag_id, related_id in related_pairs:
+            ids.setdefault(flag_id, set()).add(pk_field.to_python(related_id))
+        for flag in flags.values():
+            entries[keyfmt(get_setting(setting), flag.name)] = (
+                ids.get(flag.pk) or CACHE_EMPTY
+            )
+    return entries
+
+
+def from_row(model, row, using):
+    fields = model._meta.concrete_fields
+    return model.from_db(
+        using,
+        [f.attname for f in fields],
+        [f.to_python(row[f.column]) for f in fields],
+    )
+
+
+def _invalidate_snapshots():
+    cache_name = get_setting("CACHE_NAME")
+    cache = caches[cache_name]
+    if isinstance(cache, WaffleSnapshotCache):
+        cache.invalidate()
+
+
+@receiver(m2m_changed, sender=waffle.get_waffle_flag_model().users.through)
+@receiver(m2m_changed, sender=waffle.get_waffle_flag_model().groups.through)
+def invalidate_on_flag_members_changed(action, **kwargs):
+    # waffle flushes its cache when a flag is saved, but not when only its users or
+    # groups change
+    if action.startswith("post_"):
+        transaction.on_commit(_invalidate_snapshots)
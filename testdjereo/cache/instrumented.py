@@ -0,0 +1,335 @@
+"""Cache backend wrapper recording hits, misses, value sizes & latencies.
+
+Wraps the backend configured in `OPTIONS["WRAPPED"]`, with which it shares nothing
+but the keys & values passing through:
+
+```
+CACHES = {
+    "default": {
+        "BACKEND": "testdjereo.cache.instrumented.InstrumentedCache",
+        "LOCATION": "default",  # names the cache in stats
+        "OPTIONS": {
+            "WRAPPED": {"BACKEND": "testdjereo.cache.shm.SharedMemoryCache", ...},
+        },
+    },
+}
+```
+
+Each operation is counted per cache, operation & key namespace, ie. the part of the
+key before the first ":", eg. "users" for "users:user:1:version". Reads count hits &
+misses, writes the pickled size of one value in `SIZE_SAMPLE_EVERY`, and every
+operation goes in a latency histogram. Then:
+
+- The request log of `django_structlog` gets a `cache` entry summing the operations
+  of the request per cache, for the requests sampled by `testdjereo.request_logs`.
+- Latencies are recorded by `testdjereo.metrics`, per cache & operation.
+- This process's totals are written to `CACHE_STATS_DIR`, at most every
+  `FLUSH_INTERVAL` seconds & at exit, where the `cache_stats` command reads the
+  totals of every process. Each process writes a file named after its pid & start
+  time, so one reusing the pid of an exited process does not overwrite its totals.
+  Only gunicorn sets `CACHE_STATS_DIR`, so commands & cron jobs write nothing.
+"""
+
+import atexit
+import contextvars
+import itertools
+import json
+import os
+import pickle
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from django_structlog import signals
+
+from testdjereo import metrics
+
+# upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, float("inf"))
+FLUSH_INTERVAL = 5
+# values whose pickled size is measured, one in this many, as pickling every value
+# would take about as long as writing it
+SIZE_SAMPLE_EVERY = 16
+# returned by the wrapped cache's `get()` on a miss
+_MISSING = object()
+
+# totals of this process: `OpStats` by cache, operation & key namespace
+_stats: dict[tuple[str, str, str], "OpStats"] = {}
+_stats_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_flushed_at = 0.0
+# the pid & start time of this process, naming its stats file
+_process: tuple[int, int] | None = None
+_writes = itertools.count()
+# operations of the current request by cache, or None outside requests
+_request_stats = contextvars.ContextVar("cache_request_stats", default=None)
+
+
+class OpStats:
+    # `bytes` is the total size of the `sized` values measured
+    __slots__ = ("calls", "hits", "misses", "bytes", "sized", "buckets")
+
+    def __init__(self):
+        self.calls = self.hits = self.misses = self.bytes = self.sized = 0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class InstrumentedCache(BaseCache):
+    def __init__(self, name, params):
+        super().__init__(params)
+        self._name = name or "-"
+        wrapped = params.get("OPTIONS", {})["WRAPPED"]
+        self.wrapped = import_string(wrapped["BACKEND"])(
+            wrapped.get("LOCATION", ""), wrapped
+        )
+
+    def __getattr__(self, name):
+        # backend specific methods, eg. `TieredCache.stats()`
+        if name == "wrapped":
+            raise AttributeError(name)
+        return getattr(self.wrapped, name)
+
+    def _record(self, op, key, start, hits=0, misses=0, size=None):
+        elapsed = (time.perf_counter() - start) * 1000
+        sized = size is not None
+        record(self._name, op, namespace(key), elapsed, hits, misses, size or 0, sized)
+
+    def _record_many(self, op, keys, start, found=None, values=None):
+        """Record a bulk operation once per namespace of its keys, each taking the
+        whole operation's time."""
+        elapsed = (time.perf_counter() - start) * 1000
+        by_namespace = {}
+        for key in keys:
+            by_namespace.setdefault(namespace(key), []).append(key)
+        for ns, ns_keys in by_namespace.items():
+            hits = misses = 0
+            sizes = []
+            if found is not None:
+                hits = sum(key in found for key in ns_keys)
+                misses = len(ns_keys) - hits
+            if values is not None:
+                sizes = [sample_size(values[key]) for key in ns_keys]
+                sizes = [size for size in sizes if size is not None]
+            record(self._name, op, ns, elapsed, hits, misses, sum(sizes), len(sizes))
+
+    def get(self, key, default=None, version=None):
+        start = time.perf_counter()
+        value = self.wrapped.get(key, _MISSING, version)
+        hit = value is not _MISSING
+        self._record("get", key, start, hits=hit, misses=not hit)
+        return value if hit else default
+
+    def get_many(self, keys, version=None):
+        start = time.perf_counter()
+        keys = list(keys)
+        found = self.wrapped.get_many(keys, version)
+        self._record_many("get_many", keys, start, found=found)
+        return found
+
+    def has_key(self, key, version=None):
+        start = time.perf_counter()
+        hit = self.wrapped.has_key(key, version)
+        self._record("has_key", key, start, hits=hit, misses=not hit)
+        return hit
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        start = time.perf_counter()
+        added = self.wrapped.add(key, value, timeout, version)
+        self._record("add", key, start, size=sample_size(value) if added else None)
+        return added
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        start = time.perf_counter()
+        self.wrapped.set(key, value, timeout, version)
+        self._record("set", key, start, size=sample_size(value))
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        start = time.perf_counter()
+        failed = self.wrapped.set_many(data, timeout, version)
+        self._record_many("set_many", data, start, values=data)
+        return failed
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        start = time.perf_counter()
+        touched = self.wrapped.touch(key, timeout, version)
+        self._record("touch", key, start)
+        return touched
+
+    def incr(self, key, delta=1, version=None):
+        start = time.perf_counter()
+        value = self.wrapped.incr(key, delta, version)
+        self._record("incr", key, start)
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        start = time.perf_counter()
+        value = self.wrapped.decr(key, delta, version)
+        self._record("decr", key, start)
+        return value
+
+    def delete(self, key, version=None):
+        start = time.perf_counter()
+        deleted = self.wrapped.delete(key, version)
+        self._record("delete", key, start)
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        start = time.perf_counter()
+        keys = list(keys)
+        self.wrapped.delete_many(keys, version)
+        self._record_many("delete_many", keys, start)
+
+    def clear(self):
+        self.wrapped.clear()
+
+    def close(self, **kwargs):
+        self.wrapped.close(**kwargs)
+
+
+def namespace(key):
+    prefix, sep, _ = key.partition(":")
+    return prefix if sep else "-"
+
+
+def sample_size(value):
+    """The pickled size of `value` for one call in `SIZE_SAMPLE_EVERY`, else None."""
+    if next(_writes) % SIZE_SAMPLE_EVERY:
+        return None
+    return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+
+def record(cache_name, op, ns, elapsed, hits=0, misses=0, size=0, sized=0):
+    """Count an operation taking `elapsed` milliseconds, writing `sized` values
+    measured at `size` bytes in all."""
+    with _stats_lock:
+        stats = _stats.get((cache_name, op, ns))
+        if stats is None:
+            stats = _stats[cache_name, op, ns] = OpStats()
+        stats.calls += 1
+        stats.hits += hits
+        stats.misses += misses
+        stats.bytes += size
+        stats.sized += sized
+        stats.buckets[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+    metrics.CACHE_OPERATION_DURATION.observe(elapsed / 1000, cache=cache_name, op=op)
+
+    request_stats = _request_stats.get()
+    if request_stats is not None:
+        totals = request_stats.setdefault(
+            cache_name, {"calls": 0, "hits": 0, "misses": 0, "ms": 0.0}
+        )
+        totals["calls"] += 1
+        totals["hits"] += hits
+        totals["misses"] += misses
+        totals["ms"] += elapsed
+
+
+def stats_dir():
+    path = getattr(settings, "CACHE_STATS_DIR", None)
+    return Path(path) if path else None
+
+
+def stats_file_name():
+    """The name of this process's stats file, eg. "1234-1760000000000000000.json"."""
+    global _process
+
+    pid = os.getpid()
+    # not the start time inherited from the parent process
+    if _process is None or _process[0] != pid:
+        _process = (pid, time.time_ns())
+    return f"{pid}-{_process[1]}.json"
+
+
+def flush_stats(force=False):
+    """Write this process's totals to `CACHE_STATS_DIR`, unless written in the last
+    `FLUSH_INTERVAL` seconds."""
+    global _flushed_at
+
+    directory = stats_dir()
+    if directory is None or not _stats:
+        return
+    # one thread flushes at a time, others carry on with their request
+    if not _flush_lock.acquire(blocking=force):
+        return
+    try:
+        now = time.monotonic()
+        if not force and now - _flushed_at < FLUSH_INTERVAL:
+            return
+        _flushed_at = now
+        with _stats_lock:
+            rows = [
+                {"cache": cache_name, "op": op, "namespace": ns, **stats.as_dict()}
+                for (cache_name, op, ns), stats in _stats.items()
+            ]
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / stats_file_name()
+        # written aside then renamed, so readers never see a partial file
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(rows))
+        tmp.replace(path)
+    finally:
+        _flush_lock.release()
+
+
+def read_stats(directory):
+    """Sum the totals written by every process to `directory`."""
+    totals = {}
+    for path in sorted(directory.glob("*.json")):
+        try:
+            rows = json.loads(path.read_text())
+        except FileNotFoundError:
+            # removed since listed, eg. by `cache_stats --reset`
+            continue
+        for row in rows:
+            key = (row["cache"], row["op"], row["namespace"])
+            stats = totals.get(key)
+            if stats is None:
+                stats = totals[key] = OpStats()
+            for name in ("calls", "hits", "misses", "bytes", "sized"):
+                # `sized` is missing from the files of processes started before it
+                setattr(stats, name, getattr(stats, name) + row.get(name, 0))
+            stats.buckets = [
+                a + b for a, b in zip(stats.buckets, row["buckets"], strict=True)
+            ]
+    return totals
+
+
+def percentile(buckets, q):
+    """The upper bound of the latency bucket holding the `q` quantile, eg. 0.99."""
+    total = sum(buckets)
+    if not total:
+        return 0.0
+    seen = 0
+    for bound, count in zip(LATENCY_BUCKETS, buckets, strict=True):
+        seen += count
+        if seen >= q * total:
+            return bound
+    return LATENCY_BUCKETS[-1]
+
+
+def start_request_stats(enabled=True):
+    """Start summing the operations of the request, called by `testdjereo.request_logs`
+    for the requests it samples."""
+    _request_stats.set({} if enabled else None)
+
+
+@receiver(signals.bind_extra_request_finished_metadata)
+def log_request_stats(log_kwargs, **kwargs):
+    request_stats = _request_stats.get()
+    _request_stats.set(None)
+    if request_stats:
+        for totals in request_stats.values():
+            totals["ms"] = round(totals["ms"], 3)
+        log_kwargs["cache"] = request_stats
+    flush_stats()
+
+
+atexit.register(flush_stats, force=True)
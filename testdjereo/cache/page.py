@@ -0,0 +1,133 @@
+"""Full-page cache for anonymous responses embedding a CSP nonce & CSRF token.
+
+Django's per-site & per-view caches would serve every visitor the nonce & CSRF token
+of whoever's request rendered the page, breaking CSP & CSRF protection. Instead,
+`cache_anonymous_page` stores the rendered HTML with placeholders where the nonce &
+token were, and fills in fresh values for each request it serves.
+
+Pages are cached per host, path & query string, HTMX request headers and waffle
+state: the waffle cookies of the request, and a version bumped whenever a flag,
+switch or sample changes. Pages deciding a waffle flag for a visitor with no cookie
+for it yet, or setting cookies of their own, are not cached.
+"""
+
+import functools
+import hashlib
+import re
+
+import waffle
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.middleware.csrf import (
+    CSRF_ALLOWED_CHARS,
+    CSRF_TOKEN_LENGTH,
+    _does_token_match,
+    get_token,
+)
+from waffle.models import Sample, Switch
+
+Flag = waffle.get_waffle_flag_model()
+
+NONCE_PLACEHOLDER = "\x00csp-nonce\x00"
+CSRF_TOKEN_PLACEHOLDER = "\x00csrf-token\x00"  # noqa: S105
+_CSRF_CHAR = f"[{CSRF_ALLOWED_CHARS}]"
+CSRF_TOKEN_RE = re.compile(
+    f"(?<!{_CSRF_CHAR}){_CSRF_CHAR}{{{CSRF_TOKEN_LENGTH}}}(?!{_CSRF_CHAR})"
+)
+HTMX_HEADERS = ["HX-Request", "HX-Boosted", "HX-Target", "HX-Trigger", "HX-Trigger-Name"]
+WAFFLE_VERSION_KEY = "page-cache:waffle-version"
+WAFFLE_COOKIE_PREFIX = "dwf_"
+
+
+def cache_anonymous_page(timeout=DEFAULT_TIMEOUT):
+    """Decorate a view to cache its responses to anonymous GET requests."""
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD") or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+
+            key = page_key(request)
+            page = cache.get(key)
+            if page is not None:
+                return restore_page(request, page)
+
+            response = view(request, *args, **kwargs)
+            page = make_page(request, response)
+            if page is not None:
+                cache.set(key, page, timeout)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def page_key(request):
+    parts = [
+        request.get_host(),
+        request.get_full_path(),
+        *(request.headers.get(header, "") for header in HTMX_HEADERS),
+        *sorted(
+            f"{name}={value}"
+            for name, value in request.COOKIES.items()
+            if name.startswith(WAFFLE_COOKIE_PREFIX)
+        ),
+    ]
+    digest = hashlib.md5("\n".join(parts).encode(), usedforsecurity=False).hexdigest()
+    return f"page:{cache.get(WAFFLE_VERSION_KEY, 0)}:{digest}"
+
+
+def make_page(request, response):
+    """The cacheable parts of `response`, with placeholders for the nonce & CSRF
+    token, or None if it cannot be cached."""
+    if hasattr(response, "render") and callable(response.render):
+        response.render()
+    if (
+        response.status_code != 200
+        or response.streaming
+        or response.cookies
+        or getattr(request, "waffles", None)
+    ):
+        return None
+
+    content = response.content.decode(response.charset)
+    # only if the page used the nonce, so it was generated
+    nonce = getattr(request, "_csp_nonce", None)
+    if nonce:
+        content = content.replace(nonce, NONCE_PLACEHOLDER)
+    secret = request.META.get("CSRF_COOKIE")
+    if secret:
+        # `{% csrf_token %}` outputs a freshly masked token every time, so match them
+        # by the secret they unmask to
+        content = CSRF_TOKEN_RE.sub(
+            lambda m: CSRF_TOKEN_PLACEHOLDER if _does_token_match(m[0], secret) else m[0],
+            content,
+        )
+    return {"content": content, "content_type": response["Content-Type"]}
+
+
+def restore_page(request, page):
+    content = page["content"]
+    if NONCE_PLACEHOLDER in content:
+        content = content.replace(NONCE_PLACEHOLDER, str(request.csp_nonce))
+    if CSRF_TOKEN_PLACEHOLDER in content:
+        content = content.replace(CSRF_TOKEN_PLACEHOLDER, get_token(request))
+    return HttpResponse(content, content_type=page["content_type"])
+
+
+@receiver(post_save, sender=Flag)
+@receiver(post_delete, sender=Flag)
+@receiver(post_save, sender=Switch)
+@receiver(post_delete, sender=Switch)
+@receiver(post_save, sender=Sample)
+@receiver(post_delete, sender=Sample)
+def bump_waffle_version(**kwargs):
+    try:
+        cache.incr(WAFFLE_VERSION_KEY)
+    except ValueError:
+        cache.set(WAFFLE_VERSION_KEY, 1, None)
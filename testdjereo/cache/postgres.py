@@ -0,0 +1,181 @@
+"""Cache backend storing entries in an UNLOGGED PostgreSQL table.
+
+Every worker on every node shares one cache without running Redis or memcached.
+Unlike Django's `DatabaseCache`:
+
+- the table is UNLOGGED, so writes skip the write-ahead log. Its contents are lost if
+  PostgreSQL crashes, which is fine for a cache.
+- `get_many()`, `set_many()` & `delete_many()` each run a single statement.
+- values are stored as pickled `bytea` rather than base64-encoded text.
+- expired entries are ignored when read & overwritten when set, and deleted by a
+  sweep run at most every `SWEEP_INTERVAL` seconds, rather than by counting the
+  table's rows on every write.
+- expiry uses the database's clock, so nodes with skewed clocks agree on it.
+
+The cache runs its queries on the `DATABASE` connection, `default` by default, so
+it reuses its settings & any connection pool. Within a transaction, each operation
+runs in a savepoint, so a failed one does not abort the caller's transaction, but its
+writes & row locks still last until that transaction ends. A database alias of its
+own, eg. a copy of `default`, keeps the cache out of the callers' transactions.
+Create the table with the `createcachetable` command:
+
+```
+DATABASES["cache"] = DATABASES["default"]
+
+CACHES = {
+    "default": {
+        "BACKEND": "testdjereo.cache.postgres.PostgresCache",
+        "LOCATION": "cache_entries",
+        "OPTIONS": {"DATABASE": "cache", "SWEEP_INTERVAL": 60},
+    }
+}
+```
+"""
+
+import pickle
+import time
+from contextlib import nullcontext
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+
+def row_count(cursor):
+    return cursor.rowcount
+
+
+class PostgresCache(BaseCache):
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, table, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._table = table
+        self._db = options.get("DATABASE", DEFAULT_DB_ALIAS)
+        self._sweep_interval = options.get("SWEEP_INTERVAL", 60)
+        self._last_sweep = time.monotonic()
+
+        table = connections[self._db].ops.quote_name(table)
+        # unlike `now()`, `statement_timestamp()` advances within a transaction
+        live = "(expires IS NULL OR expires > statement_timestamp())"
+        # NULL, ie. never, when the timeout is None
+        expires = "statement_timestamp() + make_interval(secs => %s)"
+        self._sql_create = f"""
+            CREATE UNLOGGED TABLE IF NOT EXISTS {table} (
+                key text PRIMARY KEY, value bytea NOT NULL, expires timestamptz
+            )
+        """
+        self._sql_get_many = f"""
+            SELECT key, value FROM {table} WHERE key = ANY(%s) AND {live}
+        """  # noqa: S608
+        self._sql_set_many = f"""
+            INSERT INTO {table} (key, value, expires)
+            SELECT key, value, {expires} FROM unnest(%s::text[], %s::bytea[])
+                AS entries (key, value)
+            ON CONFLICT (key) DO UPDATE
+            SET value = excluded.value, expires = excluded.expires
+        """  # noqa: S608
+        self._sql_add = f"""
+            INSERT INTO {table} AS entries (key, value, expires)
+            VALUES (%s, %s, {expires})
+            ON CONFLICT (key) DO UPDATE
+            SET value = excluded.value, expires = excluded.expires
+            WHERE entries.expires <= statement_timestamp()
+        """  # noqa: S608
+        self._sql_touch = f"""
+            UPDATE {table} SET expires = {expires} WHERE key = %s AND {live}
+        """  # noqa: S608
+        self._sql_has_key = f"SELECT 1 FROM {table} WHERE key = %s AND {live}"  # noqa: S608
+        self._sql_delete_many = f"DELETE FROM {table} WHERE key = ANY(%s)"  # noqa: S608
+        self._sql_sweep = f"DELETE FROM {table} WHERE expires <= statement_timestamp()"  # noqa: S608
+        self._sql_clear = f"DELETE FROM {table}"  # noqa: S608
+
+    def create_table(self):
+        with connections[self._db].cursor() as cursor:
+            cursor.execute(self._sql_create)
+
+    def _execute(self, sql, params=(), result=None):
+        """Run `sql`, in a savepoint within a transaction, & return `result(cursor)`."""
+        connection = connections[self._db]
+        # outside transactions, the statement is committed on its own
+        savepoint = (
+            transaction.atomic(using=self._db)
+            if connection.in_atomic_block
+            else nullcontext()
+        )
+        with savepoint, connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return result(cursor) if result else None
+
+    def _timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._get_many([key]).get(key, default)
+
+    def get_many(self, keys, version=None):
+        keys = {self.make_and_validate_key(key, version=version): key for key in keys}
+        return {keys[key]: value for key, value in self._get_many(list(keys)).items()}
+
+    def _get_many(self, keys):
+        rows = self._execute(self._sql_get_many, [keys], lambda c: c.fetchall())
+        return {key: pickle.loads(value) for key, value in rows}  # noqa: S301
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        keys = [self.make_and_validate_key(key, version=version) for key in data]
+        if timeout is not None and timeout <= 0:
+            self._delete_many(keys)
+            return []
+
+        values = [pickle.dumps(value, self.pickle_protocol) for value in data.values()]
+        self._execute(self._sql_set_many, [timeout, keys, values])
+        self._maybe_sweep()
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        key = self.make_and_validate_key(key, version=version)
+        if timeout is not None and timeout <= 0:
+            return not self._has_key(key)
+
+        value = pickle.dumps(value, self.pickle_protocol)
+        return self._execute(self._sql_add, [key, value, timeout], row_count) > 0
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        key = self.make_and_validate_key(key, version=version)
+        if timeout is not None and timeout <= 0:
+            return self._delete_many([key])
+        return self._execute(self._sql_touch, [timeout, key], row_count) > 0
+
+    def has_key(self, key, version=None):
+        return self._has_key(self.make_and_validate_key(key, version=version))
+
+    def _has_key(self, key):
+        return self._execute(self._sql_has_key, [key], lambda c: c.fetchone()) is not None
+
+    def delete(self, key, version=None):
+        return self._delete_many([self.make_and_validate_key(key, version=version)])
+
+    def delete_many(self, keys, version=None):
+        self._delete_many([self.make_and_validate_key(k, version=version) for k in keys])
+
+    def _delete_many(self, keys):
+        return self._execute(self._sql_delete_many, [keys], row_count) > 0
+
+    def clear(self):
+        self._execute(self._sql_clear)
+
+    def sweep(self):
+        """Delete expired entries, and return how many were deleted."""
+        self._last_sweep = time.monotonic()
+        return self._execute(self._sql_sweep, result=row_count)
+
+    def _maybe_sweep(self):
+        if time.monotonic() - self._last_sweep >= self._sweep_interval:
+            self.sweep()
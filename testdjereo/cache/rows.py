@@ -0,0 +1,164 @@
+"""Cache of rows of `UpdatedAtModel` subclasses, by primary key & `updated_at`.
+
+Models opt in by setting `ROW_CACHE_TIMEOUT`, then `Model.objects.cached_get(pk)`
+and `Model.objects.cached_in_bulk(pks)` serve rows from the cache, and load only the
+missing ones from the database.
+
+Each row is cached under a key holding its `updated_at`, as its version. A second key
+per row holds its current version, which every write moves on when the transaction
+commits: saves, which always stamp `updated_at`, see `UpdatedAtModel.save()`, and
+`update()`, `bulk_update()` & `bulk_upsert()`, which send no `post_save`, but
+`rows_updated` with the `updated_at` of the rows they wrote. Fully saved rows are
+written through, and deleted rows get a tombstone version.
+
+A row loaded from the database is only cached under the current version, or, when
+there is none, after *adding* its own as current. So a row read just before a
+concurrent write is never cached as current, as the write moved the version on.
+"""
+
+from functools import partial
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from testdjereo.models import UpdatedAtModel, rows_updated
+
+# the version of deleted rows
+DELETED = "deleted"
+
+
+def version_key(model, pk) -> str:
+    return f"rows:{model._meta.label_lower}:{pk}:version"
+
+
+def row_key(model, pk, version) -> str:
+    return f"rows:{model._meta.label_lower}:{pk}:{version}"
+
+
+def row_version(updated_at) -> int:
+    return int(updated_at.timestamp() * 1_000_000)
+
+
+def cached_in_bulk(queryset, pks):
+    """Rows of `queryset.model` with primary keys in `pks`, by primary key, fetched
+    with two `get_many()`, of the versions & of the rows, & one query for the rows not
+    cached."""
+    model = queryset.model
+    if queryset.query.has_filters() or queryset.query.is_sliced:
+        raise TypeError("Cannot use the row cache on a filtered queryset.")
+    pks = list(dict.fromkeys(map(model._meta.pk.to_python, pks)))
+    if not pks:
+        return {}
+    if not model.ROW_CACHE_TIMEOUT:
+        return queryset.in_bulk(pks)
+
+    versions = cache.get_many([version_key(model, pk) for pk in pks])
+    versions = {
+        pk: versions[version_key(model, pk)]
+        for pk in pks
+        if version_key(model, pk) in versions
+    }
+    keys = {
+        row_key(model, pk, version): pk
+        for pk, version in versions.items()
+        if version != DELETED
+    }
+    rows = {keys[key]: row for key, row in cache.get_many(keys).items()}
+    missing = [pk for pk in pks if pk not in rows and versions.get(pk) != DELETED]
+    if missing:
+        loaded = queryset.in_bulk(missing)
+        for pk, row in loaded.items():
+            cache_loaded_row(model, pk, versions.get(pk), cacheable(row))
+        rows.update(loaded)
+    return rows
+
+
+def cache_loaded_row(model, pk, version, row):
+    """Cache a row loaded from the database if current, ie. of the current `version`,
+    or made current when there is none."""
+    if row is None:
+        return
+    loaded = row_version(row.updated_at)
+    # `add()` rather than `set()`, so a version set by a concurrent write wins
+    if version is None and cache.add(
+        version_key(model, pk), loaded, model.ROW_CACHE_TIMEOUT
+    ):
+        version = loaded
+    if version == loaded:
+        cache.set(row_key(model, pk, version), row, model.ROW_CACHE_TIMEOUT)
+
+
+def cached_get(queryset, pk):
+    """`queryset.get(pk=pk)`, served from the cache when it holds the row."""
+    row = cached_in_bulk(queryset, [pk]).get(queryset.model._meta.pk.to_python(pk))
+    if row is None:
+        raise queryset.model.DoesNotExist(
+            f"{queryset.model._meta.object_name} matching query does not exist."
+        )
+    return row
+
+
+def cacheable(instance):
+    """A copy of `instance` holding only its fields, without cached relations, or
+    None if some fields are deferred, ie. not known."""
+    if instance.get_deferred_fields():
+        return None
+    fields = instance._meta.concrete_fields
+    return type(instance).from_db(
+        instance._state.db,
+        [f.attname for f in fields],
+        [getattr(instance, f.attname) for f in fields],
+    )
+
+
+def cache_saved_row(model, pk, version, row):
+    entries = {version_key(model, pk): version}
+    if row is not None:
+        entries[row_key(model, pk, version)] = row
+    cache.set_many(entries, model.ROW_CACHE_TIMEOUT)
+
+
+def cache_deleted_row(model, pk):
+    cache.set(version_key(model, pk), DELETED, model.ROW_CACHE_TIMEOUT)
+
+
+def set_versions(model, rows):
+    cache.set_many(
+        {
+            version_key(model, pk): row_version(updated_at)
+            for pk, updated_at in rows.items()
+        },
+        model.ROW_CACHE_TIMEOUT,
+    )
+
+
+def connect_signals():
+    """Connect the receivers for each model opting in to the row cache.
+
+    Per model rather than for all senders, which would stop Django deleting the rows
+    of every other model in bulk.
+    """
+    for model in apps.get_models():
+        if issubclass(model, UpdatedAtModel) and model.ROW_CACHE_TIMEOUT:
+            post_save.connect(write_saved_row, sender=model)
+            post_delete.connect(write_deleted_row, sender=model)
+            rows_updated.connect(write_updated_rows, sender=model)
+
+
+def write_saved_row(sender, instance, update_fields, **kwargs):
+    # with `update_fields`, the instance's other fields may not match the database
+    row = cacheable(instance) if update_fields is None else None
+    version = row_version(instance.updated_at)
+    callback = partial(cache_saved_row, sender, instance.pk, version, row)
+    transaction.on_commit(callback, using=kwargs["using"])
+
+
+def write_deleted_row(sender, instance, **kwargs):
+    callback = partial(cache_deleted_row, sender, instance.pk)
+    transaction.on_commit(callback, using=kwargs["using"])
+
+
+def write_updated_rows(sender, rows, using, **kwargs):
+    transaction.on_commit(partial(set_versions, sender, rows), using=using)
@@ -0,0 +1,318 @@
+"""Cache backend shared by every process on a host, held in a memory-mapped file.
+
+Unlike `LocMemCache`, whose entries are private to each process, every gunicorn
+worker sees the same entries, so a value is computed once per host rather than once
+per worker, and deleting a key invalidates it for all workers. No external service is
+needed: the file lives in `/dev/shm`, which is kept in memory.
+
+The file is a fixed-size, set-associative hash table. Each key hashes to a set of
+`WAYS` slots of `SLOT_SIZE` bytes, which holds the entry's pickled key & value. When
+a set is full, its expired or else least recently used entry is evicted, so the
+cache never grows past `MAX_ENTRIES` slots. Values too large for a slot are not
+cached, with a warning. A set is locked with `fcntl` record locks while it is read or
+written, so processes only contend over keys hashing to the same set.
+
+The whole file is allocated when opened, so a `/dev/shm` too small for it fails
+then, rather than killing a worker with SIGBUS once the cache fills up. Docker gives
+containers a 64 MiB `/dev/shm` by default, see `--shm-size`.
+
+Entries are unpickled, so the file must not be writable by anyone else: it is opened
+without following symlinks, and refused unless it is a regular file owned by this
+user and private to it, eg. one pre-created by another user of the host.
+
+```
+CACHES = {
+    "default": {
+        "BACKEND": "testdjereo.cache.shm.SharedMemoryCache",
+        "LOCATION": "/dev/shm/testdjereo-cache",
+        "OPTIONS": {"MAX_ENTRIES": 4096, "SLOT_SIZE": 4096},
+    }
+}
+```
+"""
+
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import pickle
+import stat
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+MAGIC = b"DJSHM001"
+# magic, number of sets, ways per set, slot size
+FILE_HEADER = struct.Struct("<8sIII")
+# key hash, expiry as a UNIX timestamp, last access as a monotonic clock reading,
+# key length (0 for an empty slot), value length
+SLOT_HEADER = struct.Struct("<QdQII")
+EMPTY_SLOT = bytes(SLOT_HEADER.size)
+
+logger = logging.getLogger(__name__)
+
+# the mapped files of this process, by path & pid
+_tables: dict[tuple[str, int], "_Table"] = {}
+_tables_lock = threading.Lock()
+
+
+class _Table:
+    """A cache file mapped into this process."""
+
+    def __init__(self, path, sets, ways, slot_size):
+        self.sets = sets
+        self.ways = ways
+        self.slot_size = slot_size
+        self.set_size = ways * slot_size
+        self.size = FILE_HEADER.size + sets * self.set_size
+        # `fcntl` locks are held by the process, so threads also need a lock
+        self.lock = threading.Lock()
+
+        self.fd = os.open(
+            path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW | os.O_CLOEXEC, 0o600
+        )
+        try:
+            check_private(self.fd, path)
+            self._initialize(FILE_HEADER.pack(MAGIC, sets, ways, slot_size))
+        except OSError:
+            os.close(self.fd)
+            raise
+        self.map = mmap.mmap(self.fd, self.size)
+
+    def _initialize(self, header):
+        """Size & allocate the file, then write its header, unless another process
+        already did."""
+        fcntl.lockf(self.fd, fcntl.LOCK_EX)
+        try:
+            if os.pread(self.fd, FILE_HEADER.size, 0) != header:
+                os.ftruncate(self.fd, self.size)
+                os.pwrite(self.fd, header, 0)
+            reserve(self.fd, self.size)
+        finally:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN)
+
+    @contextmanager
+    def bucket(self, key: bytes):
+        """Lock the set `key` hashes to, and yield a `_Bucket` to access it."""
+        key_hash = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest())
+        offset = FILE_HEADER.size + key_hash % self.sets * self.set_size
+        with self.lock:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, self.set_size, offset)
+            try:
+                yield _Bucket(self, offset, key, key_hash)
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN, self.set_size, offset)
+
+    def clear(self):
+        with self.lock:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX)
+            try:
+                for slot in range(self.sets * self.ways):
+                    offset = FILE_HEADER.size + slot * self.slot_size
+                    self.map[offset : offset + SLOT_HEADER.size] = EMPTY_SLOT
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN)
+
+
+def reserve(fd, size):
+    """Allocate the `size` bytes of the file up front, raising `OSError` (ENOSPC) if
+    the filesystem is too small. A sparse file's pages are only allocated when first
+    written, and a process writing a page a full `/dev/shm` cannot back is killed by
+    SIGBUS rather than raising an exception."""
+    # not available on macOS, which has no `/dev/shm` either
+    if hasattr(os, "posix_fallocate"):
+        os.posix_fallocate(fd, 0, size)
+
+
+def check_private(fd, path):
+    """Raise `PermissionError` unless `fd` is a regular file only this user can read
+    & write."""
+    st = os.fstat(fd)
+    if not stat.S_ISREG(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError(
+            f"Refusing to use {path}: not a regular file owned by this user with no "
+            + "group or other permissions."
+        )
+
+
+class _Bucket:
+    """The slots of one set, for a given key. Only use while the set is locked."""
+
+    def __init__(self, table, offset, key, key_hash):
+        self.table = table
+        self.map = table.map
+        self.offset = offset
+        self.key = key
+        self.key_hash = key_hash
+
+    def _slots(self):
+        for way in range(self.table.ways):
+            offset = self.offset + way * self.table.slot_size
+            yield offset, SLOT_HEADER.unpack_from(self.map, offset)
+
+    def _find(self):
+        for offset, (key_hash, expires, _, key_length, value_length) in self._slots():
+            if key_hash != self.key_hash or not key_length:
+                continue
+            start = offset + SLOT_HEADER.size
+            if self.map[start : start + key_length] == self.key:
+                return offset, expires, key_length, value_length
+        return None
+
+    def get(self):
+        """The entry's value & expiry, or None if there is no live entry."""
+        found = self._find()
+        if found is None:
+            return None
+        offset, expires, key_length, value_length = found
+        if expires <= time.time():
+            self.map[offset : offset + SLOT_HEADER.size] = EMPTY_SLOT
+            return None
+        self._write_header(offset, expires, key_length, value_length)
+        start = offset + SLOT_HEADER.size + key_length
+        return self.map[start : start + value_length], expires
+
+    def set(self, value: bytes, expires: float) -> bool:
+        """Store the entry, evicting another if needed. Return whether it fits."""
+        key_length = len(self.key)
+        found = self._find()
+        if SLOT_HEADER.size + key_length + len(value) > self.table.slot_size:
+            if found is not None:
+                # don't leave the previous value behind
+                self.map[found[0] : found[0] + SLOT_HEADER.size] = EMPTY_SLOT
+            return False
+
+        offset = found[0] if found is not None else self._victim()
+        # empty the slot first, so it is never seen half-written
+        self.map[offset : offset + SLOT_HEADER.size] = EMPTY_SLOT
+        start = offset + SLOT_HEADER.size
+        self.map[start : start + key_length] = self.key
+        self.map[start + key_length : start + key_length + len(value)] = value
+        self._write_header(offset, expires, key_length, len(value))
+        return True
+
+    def delete(self) -> bool:
+        found = self._find()
+        if found is None:
+            return False
+        offset, expires, *_ = found
+        self.map[offset : offset + SLOT_HEADER.size] = EMPTY_SLOT
+        return expires > time.time()
+
+    def _victim(self):
+        """The slot to store a new entry in: an empty or expired one, or else the
+        least recently used one."""
+        now = time.time()
+        victim, oldest = None, None
+        for offset, (_, expires, accessed, key_length, _) in self._slots():
+            if not key_length or expires <= now:
+                return offset
+            if oldest is None or accessed < oldest:
+                victim, oldest = offset, accessed
+        return victim
+
+    def _write_header(self, offset, expires, key_length, value_length):
+        SLOT_HEADER.pack_into(
+            self.map,
+            offset,
+            self.key_hash,
+            expires,
+            time.monotonic_ns(),
+            key_length,
+            value_length,
+        )
+
+
+class SharedMemoryCache(BaseCache):
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._ways = options.get("WAYS", 8)
+        self._slot_size = options.get("SLOT_SIZE", 4096)
+        self._sets = max(1, self._max_entries // self._ways)
+        # a file per layout, so processes configured differently never share one
+        self._path = f"{location}.{self._sets}x{self._ways}x{self._slot_size}"
+
+    @property
+    def _table(self):
+        # mapped lazily & per process, as workers may be forked after settings load
+        key = (self._path, os.getpid())
+        table = _tables.get(key)
+        if table is None:
+            with _tables_lock:
+                table = _tables.get(key)
+                if table is None:
+                    table = _tables[key] = _Table(
+                        self._path, self._sets, self._ways, self._slot_size
+                    )
+        return table
+
+    def _expires(self, timeout):
+        expires = self.get_backend_timeout(timeout)
+        return float("inf") if expires is None else expires
+
+    def _bucket(self, key, version):
+        key = self.make_and_validate_key(key, version=version)
+        return self._table.bucket(key.encode())
+
+    def _store(self, bucket, pickled, expires):
+        stored = bucket.set(pickled, expires)
+        if not stored:
+            # the same message for every value, so repeats are deduplicated
+            logger.warning(
+                "Values over the %d byte slots of %s are not cached.",
+                self._slot_size,
+                self._path,
+            )
+        return stored
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        with self._bucket(key, version) as bucket:
+            if bucket.get() is not None:
+                return False
+            return self._store(bucket, pickled, self._expires(timeout))
+
+    def get(self, key, default=None, version=None):
+        with self._bucket(key, version) as bucket:
+            entry = bucket.get()
+        # the file is only writable by this user, see `check_private()`
+        return default if entry is None else pickle.loads(entry[0])  # noqa: S301
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        with self._bucket(key, version) as bucket:
+            self._store(bucket, pickled, self._expires(timeout))
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        with self._bucket(key, version) as bucket:
+            entry = bucket.get()
+            if entry is None:
+                return False
+            return bucket.set(entry[0], self._expires(timeout))
+
+    def incr(self, key, delta=1, version=None):
+        with self._bucket(key, version) as bucket:
+            entry = bucket.get()
+            if entry is None:
+                raise ValueError(f"Key '{key}' not found")
+            value = pickle.loads(entry[0]) + delta  # noqa: S301
+            self._store(bucket, pickle.dumps(value, self.pickle_protocol), entry[1])
+        return value
+
+    def has_key(self, key, version=None):
+        with self._bucket(key, version) as bucket:
+            return bucket.get() is not None
+
+    def delete(self, key, version=None):
+        with self._bucket(key, version) as bucket:
+            return bucket.delete()
+
+    def clear(self):
+        self._table.clear()
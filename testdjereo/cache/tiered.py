@@ -0,0 +1,289 @@
+"""Two-tier cache: a bounded in-process LRU cache in front of another cache.
+
+Reads of hot keys are served from the process's own memory (L1) without a round
+trip to the shared cache (L2) configured in `CACHES`. Writes go to both tiers, then
+are broadcast to every process with PostgreSQL `NOTIFY`. Each process runs a thread
+that `LISTEN`s & evicts the keys written elsewhere from its L1. Notifications are
+delivered when the writing transaction commits.
+
+Should notifications be missed, eg. while the listener reconnects, L1 entries still
+expire after `L1_TIMEOUT` seconds, which bounds how stale an L1 can be. The L1 is
+also cleared whenever the listener (re)connects.
+
+```
+CACHES = {
+    "default": {
+        "BACKEND": "testdjereo.cache.tiered.TieredCache",
+        "LOCATION": "tiered",  # names the L1 & the NOTIFY channel
+        "OPTIONS": {"L2": "shared", "MAX_ENTRIES": 1000, "L1_TIMEOUT": 5},
+    },
+    "shared": {"BACKEND": "testdjereo.cache.shm.SharedMemoryCache", ...},
+}
+```
+
+`TieredCache.stats()` returns this process's hits & misses per tier.
+"""
+
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import psycopg
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.db import DEFAULT_DB_ALIAS, connections
+from psycopg import sql
+
+logger = logging.getLogger(__name__)
+
+# payload clearing every key
+CLEAR = "*"
+
+# the L1s of this process, by name & pid
+_l1s: dict[tuple[str, int], "_L1"] = {}
+_l1s_lock = threading.Lock()
+
+
+class _L1:
+    """The in-process tier, shared by the threads of a process, and its listener."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {"l1_hits": 0, "l1_misses": 0, "l2_hits": 0, "l2_misses": 0}
+        # tags this process's notifications, which it need not act on
+        self.token = uuid.uuid4().hex
+        self.listener = None
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.stats["l1_hits"] += 1
+                return entry[0]
+            self.stats["l1_misses"] += 1
+            return None
+
+    def set(self, key, pickled, timeout):
+        with self.lock:
+            self.entries[key] = (pickled, time.monotonic() + timeout)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def count(self, tier, hits, misses):
+        with self.lock:
+            self.stats[f"{tier}_hits"] += hits
+            self.stats[f"{tier}_misses"] += misses
+
+
+class _Listener(threading.Thread):
+    """Evict keys written by other processes from an L1 as notifications arrive."""
+
+    reconnect_delay = 1.0
+    # how often to check whether the listener was stopped
+    poll_interval = 1.0
+
+    def __init__(self, l1, channel, using):
+        super().__init__(name=f"cache-listener-{channel}", daemon=True)
+        self.l1 = l1
+        self.channel = channel
+        self.using = using
+        self.listening = threading.Event()
+        self.stopped = threading.Event()
+
+    def connect(self):
+        params = connections[self.using].get_connection_params()
+        params.pop("cursor_factory", None)
+        return psycopg.connect(**params, autocommit=True)
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                with self.connect() as connection:
+                    connection.execute(
+                        sql.SQL("LISTEN {}").format(sql.Identifier(self.channel))
+                    )
+                    # entries cached while not listening may have been written since
+                    self.l1.clear()
+                    self.listening.set()
+                    while not self.stopped.is_set():
+                        for notify in connection.notifies(timeout=self.poll_interval):
+                            self.handle(notify.payload)
+            except psycopg.Error:
+                logger.warning("Cache listener disconnected", exc_info=True)
+            finally:
+                self.listening.clear()
+            self.stopped.wait(self.reconnect_delay)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def handle(self, payload):
+        token, _, key = payload.partition(":")
+        if token == self.l1.token:
+            return
+        if key == CLEAR:
+            self.l1.clear()
+        else:
+            self.l1.delete(key)
+
+
+def stop_listeners():
+    """Stop this process's listeners & drop its L1s, eg. before the database closes."""
+    with _l1s_lock:
+        for key, l1 in list(_l1s.items()):
+            if key[1] == os.getpid():
+                l1.listener.stop()
+                del _l1s[key]
+
+
+class TieredCache(BaseCache):
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, name, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._name = name
+        self._l2_alias = options["L2"]
+        self._l1_timeout = options.get("L1_TIMEOUT", 5)
+        self._db = options.get("DATABASE", DEFAULT_DB_ALIAS)
+        self._channel = f"cache_{name}"
+
+    @property
+    def _l2(self):
+        return caches[self._l2_alias]
+
+    @property
+    def _l1(self):
+        key = (self._name, os.getpid())
+        l1 = _l1s.get(key)
+        if l1 is None:
+            with _l1s_lock:
+                l1 = _l1s.get(key)
+                if l1 is None:
+                    l1 = _l1s[key] = _L1(self._max_entries)
+                    # started here rather than on import, so it runs in forked workers
+                    l1.listener = _Listener(l1, self._channel, self._db)
+                    l1.listener.start()
+        return l1
+
+    def _l1_set(self, key, value, timeout):
+        timeout = self.get_backend_timeout(timeout)
+        l1_timeout = self._l1_timeout
+        if timeout is not None:
+            l1_timeout = min(l1_timeout, timeout - time.time())
+        if l1_timeout > 0:
+            self._l1.set(key, pickle.dumps(value, self.pickle_protocol), l1_timeout)
+        else:
+            self._l1.delete(key)
+
+    def _notify(self, keys):
+        with connections[self._db].cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_notify(%s, %s || ':' || key) FROM unnest(%s::text[]) key",
+                [self._channel, self._l1.token, keys],
+            )
+
+    def get(self, key, default=None, version=None):
+        return self.get_many([key], version=version).get(key, default)
+
+    def get_many(self, keys, version=None):
+        l1 = self._l1
+        found = {}
+        missing = []
+        for key in keys:
+            pickled = l1.get(self.make_and_validate_key(key, version=version))
+            if pickled is None:
+                missing.append(key)
+            else:
+                found[key] = pickle.loads(pickled)  # noqa: S301 - pickled by this process
+
+        if missing:
+            from_l2 = self._l2.get_many(missing, version=version)
+            l1.count("l2", len(from_l2), len(missing) - len(from_l2))
+            for key, value in from_l2.items():
+                key_l1 = self.make_and_validate_key(key, version=version)
+                self._l1_set(key_l1, value, DEFAULT_TIMEOUT)
+            found.update(from_l2)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self._l2.set_many(data, timeout, version)
+        keys = [self.make_and_validate_key(key, version=version) for key in data]
+        for key, (original, value) in zip(keys, data.items(), strict=True):
+            if original in failed:
+                self._l1.delete(key)
+            else:
+                self._l1_set(key, value, timeout)
+        self._notify(keys)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self._l2.add(key, value, timeout, version)
+        if added:
+            key = self.make_and_validate_key(key, version=version)
+            self._l1_set(key, value, timeout)
+            self._notify([key])
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        touched = self._l2.touch(key, timeout, version)
+        key = self.make_and_validate_key(key, version=version)
+        self._l1.delete(key)
+        self._notify([key])
+        return touched
+
+    def incr(self, key, delta=1, version=None):
+        value = self._l2.incr(key, delta, version)
+        key = self.make_and_validate_key(key, version=version)
+        self._l1.delete(key)
+        self._notify([key])
+        return value
+
+    def has_key(self, key, version=None):
+        key_l1 = self.make_and_validate_key(key, version=version)
+        return self._l1.get(key_l1) is not None or self._l2.has_key(key, version)
+
+    def delete(self, key, version=None):
+        deleted = self._l2.delete(key, version)
+        key = self.make_and_validate_key(key, version=version)
+        self._l1.delete(key)
+        self._notify([key])
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        self._l2.delete_many(keys, version)
+        keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        for key in keys:
+            self._l1.delete(key)
+        self._notify(keys)
+
+    def clear(self):
+        self._l2.clear()
+        self._l1.clear()
+        self._notify([CLEAR])
+
+    def stats(self):
+        """Hits & misses per tier in this process, since it started."""
+        l1 = self._l1
+        with l1.lock:
+            return dict(l1.stats)
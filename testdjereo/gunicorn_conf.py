@@ -0,0 +1,28 @@
+"""
+gunicorn config for testdjereo project, loaded with
+``--config python:testdjereo.gunicorn_conf``.
+
+For more information on this file, see
+https://docs.gunicorn.org/en/stable/settings.html
+"""
+
+import os
+from pathlib import Path
+
+# only the web server's processes record metrics & cache stats, see
+# `testdjereo.metrics` & `testdjereo.cache.instrumented`
+os.environ.setdefault("METRICS_DIR", "/dev/shm/testdjereo-metrics")  # noqa: S108
+os.environ.setdefault("CACHE_STATS_DIR", "/dev/shm/testdjereo-cache-stats")  # noqa: S108
+
+
+def on_starting(server):
+    from testdjereo import metrics
+
+    # the files of a previous master's workers
+    metrics.clear(Path(os.environ["METRICS_DIR"]))
+
+
+def child_exit(server, worker):
+    from testdjereo import metrics
+
+    metrics.mark_process_dead(worker.pid, Path(os.environ["METRICS_DIR"]))
@@ -1,4 +1,12 @@
+import abc
+import copy
 import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+import time
 
 import structlog
 
@@ -13,6 +21,244 @@ class FirstArgOnlyFilter(logging.Filter):
         return True
 
 
+def record_event(record):
+    """The event of a structlog record, or the unformatted message of another."""
+    if isinstance(record.msg, dict):
+        return record.msg.get("event")
+    return str(record.msg)
+
+
+def lookup(settings, record):
+    """The value in `settings` for the record, by the most specific of its logger
+    names & events, eg. "django_structlog.middlewares.request:request_finished", then
+    "django_structlog.middlewares.request", ... "django_structlog", and "" for any."""
+    if not settings:
+        return None
+    event = record_event(record)
+    name = record.name
+    while True:
+        for key in (f"{name}:{event}", name):
+            if key in settings:
+                return key, settings[key]
+        if not name:
+            return None
+        name = name.rpartition(".")[0]
+
+
+def count_dropped(reason):
+    """Count a dropped record in the `log_records_dropped_total` metric."""
+    # imported late, as the settings import this module
+    from testdjereo import metrics
+
+    metrics.LOG_RECORDS_DROPPED.inc(reason=reason)
+
+
+def annotate(record, field, value):
+    """Add `field` to the event of a structlog record, or to another's message."""
+    if isinstance(record.msg, dict):
+        record.msg = {**record.msg, field: value}
+    else:
+        record.msg = f"{record.getMessage()} ({value} {field.replace('_', ' ')})"
+        record.args = ()
+
+
+class KeepImportantFilter(logging.Filter, abc.ABC):
+    """Base of the filters dropping records, which always keep errors & the
+    `request_finished` logs of requests taking `slow_request_ms` or longer.
+
+    Other records are kept when `keep()` returns True, and the others counted by
+    `reason` in the `log_records_dropped_total` metric, see `testdjereo.metrics`.
+    """
+
+    reason = ""
+
+    def __init__(self, slow_request_ms=1000):
+        super().__init__()
+        self.slow_request_ms = slow_request_ms
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR:
+            return True
+        if (
+            isinstance(record.msg, dict)
+            and record.msg.get("duration_ms", 0) >= self.slow_request_ms
+        ):
+            return True
+        if self.keep(record):
+            return True
+        count_dropped(self.reason)
+        return False
+
+    @abc.abstractmethod
+    def keep(self, record):
+        """Whether to keep a record which is neither an error nor a slow request's."""
+
+
+class SamplingFilter(KeepImportantFilter):
+    """Keeps a random `rate` of the records, per logger or event, eg.
+    `{"django_structlog:request_started": 0.01, "django_structlog": 0.1}`.
+
+    Sampled structlog records get a `sample_rate` field, to scale counts back up.
+    """
+
+    reason = "sampled"
+
+    def __init__(self, rates=None, **kwargs):
+        super().__init__(**kwargs)
+        self.rates = dict(rates or {})
+
+    def keep(self, record):
+        match = lookup(self.rates, record)
+        if match is None or match[1] >= 1:
+            return True
+        if random.random() >= match[1]:  # noqa: S311 - sampling, not security
+            return False
+        if isinstance(record.msg, dict):
+            annotate(record, "sample_rate", match[1])
+        return True
+
+
+class RateLimitFilter(KeepImportantFilter):
+    """Keeps up to `rate` records a second, in bursts of up to `burst`, per logger or
+    event, eg. `{"django": (10, 100)}`.
+
+    The first record kept after some were dropped counts them, eg. "(12 rate limited)".
+    """
+
+    reason = "rate_limited"
+
+    def __init__(self, limits=None, **kwargs):
+        super().__init__(**kwargs)
+        self.limits = dict(limits or {})
+        # tokens, time refilled & records dropped since the last kept, by limit
+        self.buckets = {}
+
+    def keep(self, record):
+        match = lookup(self.limits, record)
+        if match is None:
+            return True
+        key, (rate, burst) = match
+        now = time.monotonic()
+        with self.lock:
+            tokens, refilled, dropped = self.buckets.get(key, (burst, now, 0))
+            tokens = min(burst, tokens + (now - refilled) * rate)
+            if tokens < 1:
+                self.buckets[key] = (tokens, now, dropped + 1)
+                return False
+            self.buckets[key] = (tokens - 1, now, 0)
+        if dropped:
+            annotate(record, "rate_limited", dropped)
+        return True
+
+
+class DuplicateFilter(KeepImportantFilter):
+    """Drops repeats of a message within `window` seconds of its first occurrence, per
+    logger or event, eg. `{"waffle": 3600}` for the warning waffle logs on every check
+    of a flag that does not exist.
+
+    The first occurrence after the window counts the repeats dropped, eg. "(41
+    identical messages suppressed)". Up to `max_messages` are tracked, then forgotten
+    all at once.
+    """
+
+    reason = "duplicate"
+
+    def __init__(self, windows=None, max_messages=1000, **kwargs):
+        super().__init__(**kwargs)
+        self.windows = dict(windows or {})
+        self.max_messages = max_messages
+        # time first seen & repeats dropped since, by message
+        self.seen = {}
+
+    def keep(self, record):
+        match = lookup(self.windows, record)
+        if match is None:
+            return True
+        try:
+            event = record_event(record) if isinstance(record.msg, dict) else None
+            message = (record.name, record.levelno, event or record.getMessage())
+        except Exception:
+            return True
+        now = time.monotonic()
+        with self.lock:
+            first_seen, suppressed = self.seen.get(message, (None, 0))
+            if first_seen is not None and now - first_seen < match[1]:
+                self.seen[message] = (first_seen, suppressed + 1)
+                return False
+            if len(self.seen) >= self.max_messages:
+                self.seen.clear()
+            self.seen[message] = (now, 0)
+        if suppressed:
+            annotate(record, "identical_messages_suppressed", suppressed)
+        return True
+
+
+class FlushingQueueListener(logging.handlers.QueueListener):
+    """Waits for room in a full queue to enqueue the stop sentinel, so `stop()` always
+    handles every record queued before it."""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to a bounded queue, handled by a `FlushingQueueListener` thread.
+
+    Formatting & I/O of the handlers given to `dictConfig()` happen on the listener
+    thread, so a slow stream stalls that thread instead of the logging one. When the
+    queue is full, records are dropped under the "drop" policy, counted in `dropped` &
+    the `log_records_dropped_total` metric, or the logging thread waits for room under
+    the "block" policy.
+
+    The listener is started on the first record of each process, ie. after forking,
+    and stopped when logging shuts down, eg. at exit, handling the records left.
+    """
+
+    def __init__(self, queue, policy="drop"):
+        if policy not in ("drop", "block"):
+            raise ValueError(f"Unknown queue policy {policy!r}, expected drop or block.")
+        super().__init__(queue)
+        self.policy = policy
+        self.dropped = 0
+        self._listener_pid = None
+
+    def prepare(self, record):
+        # unlike `QueueHandler.prepare()`, leaves formatting to the listener's handlers
+        return copy.copy(record)
+
+    def enqueue(self, record):
+        if self.policy == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            count_dropped("queue_full")
+
+    def emit(self, record):
+        if self.listener is not None and self._listener_pid != os.getpid():
+            self._start_listener()
+        super().emit(record)
+
+    def _start_listener(self):
+        with self.lock:
+            if self._listener_pid == os.getpid():
+                return
+            # a listener inherited from a parent process has no thread here
+            self.listener._thread = None
+            self.listener.start()
+            self._listener_pid = os.getpid()
+
+    def close(self):
+        with self.lock:
+            if self._listener_pid == os.getpid():
+                self.listener.stop()
+                self._listener_pid = None
+        super().close()
+
+
 class SafeHttpFormatter(logging.Formatter):
     def format(self, record):
         if not hasattr(record, "status_code"):
@@ -21,11 +267,49 @@ class SafeHttpFormatter(logging.Formatter):
 
 
 class LoggingConfigFactory:
-    def __init__(self, *, debug=False):
+    """Build the `LOGGING` dict config.
+
+    With `queue`, production logs are rendered & written by a background thread, see
+    `NonBlockingQueueHandler`, through a queue of up to `queue_size` records.
+
+    Production logs are sampled with `sample_rates`, see `SamplingFilter`, rate
+    limited with `rate_limits`, see `RateLimitFilter`, and repeats dropped with
+    `dedupe_windows`, see `DuplicateFilter`, before they are queued. By default, only
+    waffle's warnings about missing flags, switches & samples, logged on every check,
+    and the shared memory cache's warnings about values too large to cache, logged on
+    every set, are deduplicated, in development too.
+    """
+
+    def __init__(
+        self,
+        *,
+        debug=False,
+        queue=False,
+        queue_size=10_000,
+        queue_policy="drop",
+        sample_rates=None,
+        rate_limits=None,
+        dedupe_windows=None,
+        slow_request_ms=1000,
+    ):
         self.debug = debug
+        self.queue = queue
+        self.queue_size = queue_size
+        self.queue_policy = queue_policy
+        self.sample_rates = sample_rates or {}
+        self.rate_limits = rate_limits or {}
+        self.dedupe_windows = (
+            {"waffle": 60 * 60, "testdjereo.cache.shm": 60 * 60}
+            if dedupe_windows is None
+            else dedupe_windows
+        )
+        self.slow_request_ms = slow_request_ms
 
     def build(self):
         dev_mode = self.debug
+        use_queue = self.queue and not dev_mode
+        prod_handler = "console_prod_queue" if use_queue else "console_prod"
+        volume_filters = ["dedupe", "sample", "rate_limit"]
 
         console_rich = (
             {
@@ -47,6 +331,21 @@ class LoggingConfigFactory:
                 "require_debug_true": {"()": "django.utils.log.RequireDebugTrue"},
                 "require_debug_false": {"()": "django.utils.log.RequireDebugFalse"},
                 "first_arg_only": {"()": FirstArgOnlyFilter},
+                "dedupe": {
+                    "()": DuplicateFilter,
+                    "windows": self.dedupe_windows,
+                    "slow_request_ms": self.slow_request_ms,
+                },
+                "sample": {
+                    "()": SamplingFilter,
+                    "rates": self.sample_rates,
+                    "slow_request_ms": self.slow_request_ms,
+                },
+                "rate_limit": {
+                    "()": RateLimitFilter,
+                    "limits": self.rate_limits,
+                    "slow_request_ms": self.slow_request_ms,
+                },
             },
             "formatters": {
                 "json": {
@@ -62,7 +361,9 @@ class LoggingConfigFactory:
             },
             "handlers": {
                 "console_dev": (
-                    console_rich if dev_mode else {"class": "logging.NullHandler"}
+                    {**console_rich, "filters": ["require_debug_true", "dedupe"]}
+                    if dev_mode
+                    else {"class": "logging.NullHandler"}
                 ),
                 "console_http": (
                     {**console_rich, "formatter": "rich_http"}
@@ -71,15 +372,33 @@ class LoggingConfigFactory:
                 ),
                 "console_prod": {
                     "class": "logging.StreamHandler",
-                    "filters": ["require_debug_false"],
+                    "filters": [
+                        "require_debug_false",
+                        *([] if use_queue else volume_filters),
+                    ],
                     "formatter": "json",
                     "level": "INFO",
                 },
                 "null": {"class": "logging.NullHandler"},
+                **(
+                    {
+                        "console_prod_queue": {
+                            "class": NonBlockingQueueHandler,
+                            "handlers": ["console_prod"],
+                            "filters": volume_filters,
+                            "queue": {"()": "queue.Queue", "maxsize": self.queue_size},
+                            "listener": FlushingQueueListener,
+                            "respect_handler_level": True,
+                            "policy": self.queue_policy,
+                        }
+                    }
+                    if use_queue
+                    else {}
+                ),
             },
             "loggers": {
                 "django": {
-                    "handlers": ["console_dev" if dev_mode else "console_prod"],
+                    "handlers": ["console_dev" if dev_mode else prod_handler],
                     "level": "INFO",
                     "propagate": False,
                 },
@@ -90,13 +409,13 @@ class LoggingConfigFactory:
                     "filters": ["first_arg_only"],
                 },
                 "django_structlog": {
-                    "handlers": ["null" if dev_mode else "console_prod"],
+                    "handlers": ["null" if dev_mode else prod_handler],
                     "level": "INFO",
                     "propagate": False,
                 },
             },
             "root": {
-                "handlers": ["console_dev" if dev_mode else "console_prod"],
+                "handlers": ["console_dev" if dev_mode else prod_handler],
                 "level": "INFO",
             },
         }
@@ -0,0 +1,89 @@
+import itertools
+import multiprocessing
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from testdjereo.cache.shm import SharedMemoryCache
+
+BACKENDS = {
+    "locmem": lambda location, max_entries: LocMemCache(
+        location, {"OPTIONS": {"MAX_ENTRIES": max_entries}}
+    ),
+    "shm": lambda location, max_entries: SharedMemoryCache(
+        location, {"OPTIONS": {"MAX_ENTRIES": max_entries}}
+    ),
+}
+VALUE = "x" * 512
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare get/set latency and hit ratio of LocMemCache and SharedMemoryCache "
+        + "under several worker processes doing read-through caching of keys with a "
+        + "skewed popularity, like gunicorn workers serving requests."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, nargs="+", default=[4, 8, 16], metavar="N"
+        )
+        parser.add_argument("--ops", type=int, default=20_000, help="Gets per worker.")
+        parser.add_argument("--keys", type=int, default=5_000)
+        parser.add_argument("--max-entries", type=int, default=8192)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"Running {options['ops']:,} gets per worker over {options['keys']:,} keys..."
+        )
+        # a fork, so workers start with the parent's settings & empty LocMemCaches
+        context = multiprocessing.get_context("fork")
+        shm = Path("/dev/shm")  # noqa: S108
+
+        for backend, workers in itertools.product(BACKENDS, options["workers"]):
+            with (
+                tempfile.TemporaryDirectory(dir=shm if shm.is_dir() else None) as tmp,
+                context.Pool(workers) as pool,
+            ):
+                args = (
+                    backend,
+                    str(Path(tmp) / "cache"),
+                    options["max_entries"],
+                    options["keys"],
+                    options["ops"],
+                )
+                results = pool.starmap(run_worker, [(*args, i) for i in range(workers)])
+
+            gets, get_time, sets, set_time = (sum(r) for r in zip(*results, strict=True))
+            self.stdout.write(
+                f"{backend} x{workers}: get {get_time / gets * 1e6:,.1f} µs, "
+                f"set {set_time / sets * 1e6 if sets else 0:,.1f} µs, "
+                f"hit ratio {1 - sets / gets:.1%}"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+
+def run_worker(backend, location, max_entries, keys, ops, seed):
+    cache = BACKENDS[backend](location, max_entries)
+    rng = random.Random(seed)  # noqa: S311 - reproducibility, not security
+    # Zipf-like popularity: the i-th key is requested in proportion to 1 / i
+    cum_weights = list(itertools.accumulate(1 / i for i in range(1, keys + 1)))
+    requested = rng.choices(range(keys), cum_weights=cum_weights, k=ops)
+
+    get_time = set_time = 0.0
+    sets = 0
+    for key in requested:
+        start = time.perf_counter()
+        value = cache.get(f"key-{key}")
+        get_time += time.perf_counter() - start
+        if value is None:
+            start = time.perf_counter()
+            cache.set(f"key-{key}", VALUE)
+            set_time += time.perf_counter() - start
+            sets += 1
+    return ops, get_time, sets, set_time
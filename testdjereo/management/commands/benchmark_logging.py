@@ -0,0 +1,99 @@
+import io
+import logging
+import queue
+import statistics
+import time
+
+import structlog
+from django.core.management.base import BaseCommand
+
+from testdjereo.logging import FlushingQueueListener, NonBlockingQueueHandler
+
+
+class SlowStream(io.StringIO):
+    """A stream taking `delay` seconds per write, like a congested stdout pipe."""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+
+    def write(self, s):
+        time.sleep(self.delay)
+        return super().write(s)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the time logging a record takes on the logging thread with the "
+        + "production `StreamHandler`, and with it behind `NonBlockingQueueHandler`, "
+        + "when writing to the stream is slow."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--records", type=int, default=1000)
+        parser.add_argument(
+            "--write-delay", type=float, default=1.0, help="Milliseconds per write."
+        )
+        parser.add_argument("--queue-size", type=int, default=10_000)
+        parser.add_argument("--policy", choices=["drop", "block"], default="drop")
+
+    def handle(self, *args, **options):
+        records = options["records"]
+        self.stdout.write(
+            f"Logging {records:,} records to a stream taking "
+            f"{options['write_delay']} ms per write..."
+        )
+
+        stream_handler = make_stream_handler(options["write_delay"] / 1000)
+        timings = benchmark(stream_handler, records)
+        self.write_timings("stream", timings)
+
+        queue_handler = NonBlockingQueueHandler(
+            queue.Queue(options["queue_size"]), policy=options["policy"]
+        )
+        queue_handler.listener = FlushingQueueListener(
+            queue_handler.queue, make_stream_handler(options["write_delay"] / 1000)
+        )
+        timings = benchmark(queue_handler, records)
+        start = time.perf_counter()
+        queue_handler.close()
+        drained = time.perf_counter() - start
+        self.write_timings(
+            "queue",
+            timings,
+            f", {queue_handler.dropped:,} dropped, drained in {drained:,.2f} s",
+        )
+
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+    def write_timings(self, name, timings, extra=""):
+        p99 = statistics.quantiles(timings, n=100)[98] if len(timings) > 1 else timings[0]
+        self.stdout.write(
+            f"{name}: {statistics.fmean(timings) * 1000:,.3f} ms mean, "
+            f"{p99 * 1000:,.3f} ms p99 per record{extra}"
+        )
+
+
+def make_stream_handler(delay):
+    handler = logging.StreamHandler(SlowStream(delay))
+    handler.setFormatter(
+        structlog.stdlib.ProcessorFormatter(processor=structlog.processors.JSONRenderer())
+    )
+    return handler
+
+
+def benchmark(handler, records):
+    """The seconds each of `records` log calls took on this thread."""
+    logger = logging.getLogger("testdjereo.benchmark_logging")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    timings = []
+    try:
+        for i in range(records):
+            start = time.perf_counter()
+            logger.info("request_finished %d", i, extra={"code": 200})
+            timings.append(time.perf_counter() - start)
+    finally:
+        logger.removeHandler(handler)
+    return timings
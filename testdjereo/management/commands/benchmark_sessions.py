@@ -0,0 +1,68 @@
+from importlib import import_module
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from users.models import AuthUser
+
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "testdjereo": "testdjereo.sessions",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare queries per request of the stock database session engine and "
+        + "`testdjereo.sessions`, for logged-in page views & unchanged session writes. "
+        + "Runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=100)
+
+    def handle(self, *args, **options):
+        requests = options["requests"]
+
+        self.stdout.write(f"Running {requests:,} requests per session engine...")
+
+        for name, engine in SESSION_ENGINES.items():
+            page_views, rewrites = benchmark(engine, requests)
+            self.stdout.write(
+                f"{name}: {page_views / requests:.2f} queries per page view, "
+                f"{rewrites / requests:.2f} queries per unchanged session write"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+
+def benchmark(engine, requests):
+    with (
+        override_settings(SESSION_ENGINE=engine, ALLOWED_HOSTS=["testserver"]),
+        transaction.atomic(),
+    ):
+        user = AuthUser.objects.create_user(email="benchmark-sessions@example.com")
+        client = Client()
+        client.force_login(user)
+        session_key = client.session.session_key
+        store_class = import_module(engine).SessionStore
+        # warm up caches, eg. of the logged-in user
+        client.get("/")
+
+        with CaptureQueriesContext(connection) as page_views:
+            for _ in range(requests):
+                client.get("/")
+
+        with CaptureQueriesContext(connection) as rewrites:
+            for _ in range(requests):
+                # what `SessionMiddleware` does for a request setting an unchanged key
+                session = store_class(session_key)
+                session["_auth_user_id"] = session["_auth_user_id"]
+                session.save()
+
+        store_class(session_key).delete()
+        transaction.set_rollback(True)
+
+    return len(page_views), len(rewrites)
@@ -0,0 +1,62 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+UUID_VERSIONS = {
+    "v4": uuid.uuid4,
+    "v7": uuid.uuid7,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare insert throughput and primary key index size for UUIDv4 and UUIDv7 keys "
+        + "using throwaway temporary tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        batch_size = options["batch_size"]
+
+        self.stdout.write(f"Inserting {rows:,} rows per key version...")
+
+        for version, generate in UUID_VERSIONS.items():
+            elapsed, index_size = benchmark(version, generate, rows, batch_size)
+            self.stdout.write(
+                f"{version}: {rows / elapsed:,.0f} rows/s, "
+                f"index {index_size / 1024 / 1024:,.1f} MiB"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+
+def benchmark(version, generate, rows, batch_size):
+    table = f"benchmark_uuid_{version}"
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {table} "  # noqa: S608
+            + "(id uuid PRIMARY KEY, created_at timestamptz NOT NULL DEFAULT now())"
+        )
+        try:
+            start = time.perf_counter()
+            for offset in range(0, rows, batch_size):
+                count = min(batch_size, rows - offset)
+                # `cursor.cursor` is the underlying psycopg cursor, which supports COPY
+                with cursor.cursor.copy(f"COPY {table} (id) FROM STDIN") as copy:
+                    for _ in range(count):
+                        copy.write_row((generate(),))
+            elapsed = time.perf_counter() - start
+
+            cursor.execute("SELECT pg_relation_size(%s::regclass)", [f"{table}_pkey"])
+            (index_size,) = cursor.fetchone()
+        finally:
+            cursor.execute(f"DROP TABLE {table}")
+
+    return elapsed, index_size
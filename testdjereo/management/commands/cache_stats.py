@@ -0,0 +1,76 @@
+import json
+import shutil
+
+from django.core.management.base import BaseCommand, CommandError
+
+from testdjereo.cache.instrumented import percentile, read_stats, stats_dir
+
+
+class Command(BaseCommand):
+    help = (
+        "Show the hits, misses, value sizes & latencies of the instrumented caches, "
+        + "per cache, operation & key namespace, summed over every process since "
+        + "CACHE_STATS_DIR was last reset."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--json", action="store_true", help="Output JSON lines.")
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Delete the stats written so far. Running processes write their "
+            + "totals since they started again on their next flush.",
+        )
+
+    def handle(self, *args, **options):
+        directory = stats_dir()
+        if directory is None:
+            raise CommandError(
+                "CACHE_STATS_DIR is not set. Set it to the web server's, see "
+                + "testdjereo.gunicorn_conf."
+            )
+        if options["reset"]:
+            shutil.rmtree(directory, ignore_errors=True)
+            self.stdout.write(self.style.SUCCESS(f"Deleted {directory}."))
+            return
+
+        totals = read_stats(directory) if directory.is_dir() else {}
+        rows = []
+        for (cache_name, op, ns), stats in sorted(totals.items()):
+            reads = stats.hits + stats.misses
+            rows.append(
+                {
+                    "cache": cache_name,
+                    "op": op,
+                    "namespace": ns,
+                    "calls": stats.calls,
+                    "hit_ratio": round(stats.hits / reads, 4) if reads else None,
+                    "avg_bytes": (
+                        round(stats.bytes / stats.sized) if stats.sized else None
+                    ),
+                    **{
+                        f"p{q}_ms": percentile(stats.buckets, q / 100)
+                        for q in (50, 95, 99)
+                    },
+                }
+            )
+
+        if options["json"]:
+            for row in rows:
+                self.stdout.write(json.dumps(row))
+            return
+        if not rows:
+            self.stdout.write("No cache stats yet.")
+            return
+        self.stdout.write(
+            f"{'cache':<12} {'op':<12} {'namespace':<20} {'calls':>10} {'hits':>7} "
+            f"{'avg size':>9} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7}"
+        )
+        for row in rows:
+            hit_ratio = "" if row["hit_ratio"] is None else f"{row['hit_ratio']:.1%}"
+            avg_bytes = "" if row["avg_bytes"] is None else f"{row['avg_bytes']:,}"
+            self.stdout.write(
+                f"{row['cache']:<12} {row['op']:<12} {row['namespace']:<20} "
+                f"{row['calls']:>10,} {hit_ratio:>7} {avg_bytes:>9} "
+                f"{row['p50_ms']:>7} {row['p95_ms']:>7} {row['p99_ms']:>7}"
+            )
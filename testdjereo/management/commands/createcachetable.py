@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.commands import createcachetable
+
+from testdjereo.cache.postgres import PostgresCache
+
+
+class Command(createcachetable.Command):
+    help = "Creates the tables needed to use the SQL & PostgreSQL cache backends."
+
+    def handle(self, *tablenames, **options):
+        super().handle(*tablenames, **options)
+        if tablenames:
+            return
+
+        for cache_alias in settings.CACHES:
+            cache = caches[cache_alias]
+            # unwrap `InstrumentedCache`
+            cache = getattr(cache, "wrapped", cache)
+            if not isinstance(cache, PostgresCache):
+                continue
+            if options["dry_run"]:
+                self.stdout.write(cache._sql_create)
+            else:
+                cache.create_table()
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"Cache table '{cache._table}' created.")
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from testdjereo.partitioning import (
+    create_monthly_partition,
+    detach_partition,
+    expired_partitions,
+    get_partitioned_models,
+    month_start,
+    partition_name,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create upcoming monthly partitions and detach expired ones for every model "
+        + "with a PartitioningMeta. Intended to run on a schedule, eg. daily."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Drop expired partitions instead of leaving them as detached tables.",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+
+        for model in get_partitioned_models():
+            meta = model.PartitioningMeta
+            premake = getattr(meta, "premake", 3)
+            retention = getattr(meta, "retention", None)
+            self.stdout.write(f"{model._meta.label}:")
+
+            for months in range(premake + 1):
+                start = month_start(now, months)
+                if create_monthly_partition(model, start):
+                    self.stdout.write(f"  created {partition_name(model, start)}")
+
+            if retention is None:
+                continue
+            for name in expired_partitions(model, retention, today=now):
+                detach_partition(model, name, drop=options["drop"])
+                action = "dropped" if options["drop"] else "detached"
+                self.stdout.write(f"  {action} {name}")
+
+        self.stdout.write(self.style.SUCCESS("Done."))
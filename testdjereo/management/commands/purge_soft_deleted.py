@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from testdjereo.archival import NdjsonArchive, TableArchive, purge_soft_deleted
+from testdjereo.models import DeletedAtModel
+
+
+class Command(BaseCommand):
+    help = (
+        "Archive and hard-delete rows soft-deleted longer ago than the retention window, "
+        + "in short batched transactions. Safe to interrupt and run again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", help="Model to purge, as 'app_label.ModelName'.")
+        parser.add_argument("--retention-days", type=int, required=True)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.0,
+            help="Seconds to pause between batches.",
+        )
+        parser.add_argument("--max-batches", type=int)
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument("--archive-table", help="Copy rows into this table.")
+        target.add_argument("--archive-file", help="Append rows to this NDJSON file.")
+        target.add_argument(
+            "--no-archive",
+            action="store_true",
+            help="Delete rows without keeping a copy.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_model(options["model"])
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e)) from e
+        if not issubclass(model, DeletedAtModel):
+            raise CommandError(f"{options['model']} is not a DeletedAtModel.")
+
+        archive = None
+        if options["archive_table"]:
+            archive = TableArchive(options["archive_table"])
+        elif options["archive_file"]:
+            archive = NdjsonArchive(options["archive_file"])
+
+        self.stdout.write(f"Purging {model._meta.label}...")
+
+        def report(result):
+            self.stdout.write(
+                f"Batch {result.batches}: {result.rows:,} rows "
+                f"({result.rows_per_second:,.0f} rows/s)"
+            )
+
+        result = purge_soft_deleted(
+            model,
+            retention=timedelta(days=options["retention_days"]),
+            batch_size=options["batch_size"],
+            pause=options["sleep"],
+            archive=archive,
+            max_batches=options["max_batches"],
+            on_batch=report,
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Purged {result.rows:,} rows in {result.batches} batches "
+                f"({result.rows_per_second:,.0f} rows/s)."
+            )
+        )
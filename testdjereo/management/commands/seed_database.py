@@ -1,15 +1,50 @@
+import datetime as dt
+import random
+import time
+import uuid
+
 from allauth.account.models import EmailAddress
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 
-from users.models import AuthUser
+from users.models import AuthUser, UserProfile
+
+FIRST_NAMES = [
+    "Alice", "Bruno", "Chloé", "Dmitri", "Emeka", "Fatima", "Grace", "Hiroshi",
+    "Ingrid", "João", "Kofi", "Laila", "Mateo", "Nadia", "Oskar", "Priya",
+]  # fmt: skip
+LAST_NAMES = [
+    "Andersen", "Bianchi", "Costa", "Dubois", "Eriksen", "Fischer", "García", "Horvat",
+    "Ivanova", "Jensen", "Kowalski", "López", "Müller", "Nowak", "Okafor", "Patel",
+]  # fmt: skip
+DOMAINS = ["example.com", "example.org", "example.net"]
+# synthetic users join over the year before this date, so seeded data does not drift
+SEED_EPOCH = dt.datetime(2025, 1, 1, tzinfo=dt.UTC)
 
 
 class Command(BaseCommand):
-    help = "Seed database with three users: admin, staff and regular (non-privileged)."
+    help = (
+        "Seed database with three users: admin, staff and regular (non-privileged). "
+        + "Use --users to also generate synthetic users for profiling at scale."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=0,
+            help="Number of synthetic users to generate, with profiles & emails.",
+        )
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Random seed; the same seed always generates the same users.",
+        )
 
-    @transaction.atomic
     def handle(self, *args, **options):
         if AuthUser.objects.exists():
             raise CommandError(
@@ -36,11 +71,44 @@ class Command(BaseCommand):
             {"username": "user", "email": "user@example.com", "password": "password"},
         ]
 
-        for data in users_data:
-            create_user(data)
+        with transaction.atomic():
+            for data in users_data:
+                create_user(data)
+
+        if options["users"]:
+            self.seed_users(options["users"], options["batch_size"], options["seed"])
 
         self.stdout.write(self.style.SUCCESS("Done."))
 
+    def seed_users(self, count, batch_size, seed):
+        rng = random.Random(seed)  # noqa: S311 - reproducibility, not security
+        # hash once: hashing per user would dominate the run time
+        password = make_password("password")
+        start = time.perf_counter()
+
+        for offset in range(0, count, batch_size):
+            users = [
+                synthetic_user(rng, i, count, password)
+                for i in range(offset, min(offset + batch_size, count))
+            ]
+            with transaction.atomic():
+                AuthUser.objects.bulk_create(users, provision_profiles=False)
+                UserProfile.objects.bulk_create(
+                    [
+                        UserProfile(id=seeded_uuid7(rng, u.date_joined), user=u)
+                        for u in users
+                    ]
+                )
+                EmailAddress.objects.bulk_create(
+                    [
+                        EmailAddress(user=u, email=u.email, primary=True, verified=True)
+                        for u in users
+                    ]
+                )
+            done = offset + len(users)
+            rate = done / (time.perf_counter() - start)
+            self.stdout.write(f"  {done:,}/{count:,} users ({rate:,.0f} users/s)")
+
 
 def create_user(data):  # pragma: no cover
     user = get_user_model().objects.create_user(**data)
@@ -50,3 +118,29 @@ def create_user(data):  # pragma: no cover
         primary=True,
         verified=True,
     )
+
+
+def synthetic_user(rng, i, count, password):
+    first_name = rng.choice(FIRST_NAMES)
+    last_name = rng.choice(LAST_NAMES)
+    # spread sign-ups evenly over the year, so ids & timestamps ascend like real data
+    date_joined = SEED_EPOCH - dt.timedelta(days=365) * (1 - i / count)
+    return AuthUser(
+        id=seeded_uuid7(rng, date_joined),
+        email=f"{first_name}.{last_name}.{i}@{rng.choice(DOMAINS)}".lower(),
+        password=password,
+        first_name=first_name,
+        last_name=last_name,
+        date_joined=date_joined,
+        last_login=date_joined + dt.timedelta(days=rng.expovariate(1 / 30)),
+        is_active=rng.random() < 0.98,
+    )
+
+
+def seeded_uuid7(rng, timestamp):
+    """A UUIDv7 for `timestamp` with its random bits drawn from `rng`."""
+    value = int(timestamp.timestamp() * 1000) << 80 | rng.getrandbits(80)
+    # overwrite the version & variant bits
+    value = value & ~(0xF << 76) | 0x7 << 76
+    value = value & ~(0x3 << 62) | 0x2 << 62
+    return uuid.UUID(int=value)
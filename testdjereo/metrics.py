@@ -0,0 +1,403 @@
+"""Request, database & cache metrics of every worker process, in Prometheus format.
+
+Each process adds to its own file in `METRICS_DIR`, mapped into memory, so recording
+a sample takes a few memory writes & no locks shared with other processes. The
+`-/metrics` view reads the files of every process & sums them:
+
+- `http_request_duration_seconds`: histogram by view, method & status.
+- `db_query_duration_seconds`: histogram by database alias.
+- `cache_operation_duration_seconds`: histogram by cache & operation, recorded by
+  `testdjereo.cache.instrumented`.
+- `worker_busy_seconds_total`, `worker_requests_in_progress` & `workers`: time spent
+  handling requests, requests being handled & the number of live worker processes,
+  eg. `sum(rate(worker_busy_seconds_total[1m])) / sum(workers)` is the workers'
+  utilization.
+- `log_records_dropped_total`: log records dropped by reason, see
+  `testdjereo.logging`.
+
+When gunicorn replaces a worker, its master folds the worker's counters & histograms
+into the file of exited processes, so totals don't go down, and deletes its file,
+dropping its gauges, see `testdjereo.gunicorn_conf`. The master empties `METRICS_DIR`
+when it starts, so the files of a previous master's workers, eg. killed along with
+it, are not summed forever; totals then restart from 0, as Prometheus expects of
+restarted processes. A process reusing the pid of one which exited unnoticed carries
+on from its counters but resets its gauges.
+
+Only gunicorn sets `METRICS_DIR`, so commands, shells & cron jobs record nothing. The
+view needs `METRICS_TOKEN` as bearer token, and is not found without one.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+from django.conf import settings
+from django.dispatch import receiver
+
+from testdjereo.db import query_executed
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+MAGIC = b"DJMET001"
+# magic, bytes used by the header & entries
+FILE_HEADER = struct.Struct("<8sQ")
+# key length, followed by the key, padded so the value is aligned to 8 bytes
+ENTRY_HEADER = struct.Struct("<I")
+VALUE = struct.Struct("<d")
+INITIAL_SIZE = 64 * 1024
+# name of the file of exited processes' counters & histograms, see `mark_process_dead()`
+EXITED = "exited"
+# `request.method` values labelled as such, others are labelled "other"
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+# the mapped files of this process, by path & pid
+_files: dict[tuple[Path, int], "_File"] = {}
+_files_lock = threading.Lock()
+# every metric, in the order they are rendered
+_metrics: list["_Metric"] = []
+
+
+class _File:
+    """A process's metrics file, mapped into memory. Only written by that process."""
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        # offsets of the values, by key
+        self.offsets: dict[str, int] = {}
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self.size = max(os.fstat(self.fd).st_size, INITIAL_SIZE)
+        os.ftruncate(self.fd, self.size)
+        self.map = mmap.mmap(self.fd, self.size)
+
+        magic, self.used = FILE_HEADER.unpack_from(self.map)
+        if magic == MAGIC:
+            # left by an exited process with the same pid, carry on from its totals
+            gauges = {metric.name for metric in _metrics if not metric.keep_exited}
+            for key, offset in _entries(self.map, self.used):
+                self.offsets[key] = offset
+                if json.loads(key)[0] in gauges:
+                    VALUE.pack_into(self.map, offset, 0.0)
+        else:
+            self.used = FILE_HEADER.size
+            FILE_HEADER.pack_into(self.map, 0, MAGIC, self.used)
+
+    def add(self, key, amount):
+        with self.lock:
+            offset = self.offsets.get(key)
+            if offset is None:
+                offset = self._append(key)
+            (value,) = VALUE.unpack_from(self.map, offset)
+            VALUE.pack_into(self.map, offset, value + amount)
+
+    def _append(self, key):
+        encoded = key.encode()
+        offset = self.used + ENTRY_HEADER.size + len(encoded)
+        offset += -offset % VALUE.size
+        used = offset + VALUE.size
+        if used > self.size:
+            self.size = max(self.size * 2, used)
+            os.ftruncate(self.fd, self.size)
+            self.map.close()
+            self.map = mmap.mmap(self.fd, self.size)
+        ENTRY_HEADER.pack_into(self.map, self.used, len(encoded))
+        start = self.used + ENTRY_HEADER.size
+        self.map[start : start + len(encoded)] = encoded
+        VALUE.pack_into(self.map, offset, 0.0)
+        # only counted once written, so readers never see a partial entry
+        self.used = used
+        FILE_HEADER.pack_into(self.map, 0, MAGIC, used)
+        self.offsets[key] = offset
+        return offset
+
+    def close(self):
+        self.map.close()
+        os.close(self.fd)
+
+
+def _entries(data, used):
+    """The keys & value offsets of the entries in the first `used` bytes of `data`."""
+    position = FILE_HEADER.size
+    while position < used:
+        (length,) = ENTRY_HEADER.unpack_from(data, position)
+        start = position + ENTRY_HEADER.size
+        key = bytes(data[start : start + length]).decode()
+        offset = start + length
+        offset += -offset % VALUE.size
+        yield key, offset
+        position = offset + VALUE.size
+
+
+def metrics_dir():
+    path = getattr(settings, "METRICS_DIR", None)
+    return Path(path) if path else None
+
+
+def _file():
+    """This process's file, or None if metrics are disabled."""
+    directory = metrics_dir()
+    if directory is None:
+        return None
+    pid = os.getpid()
+    file = _files.get((directory, pid))
+    if file is None:
+        with _files_lock:
+            file = _files.get((directory, pid))
+            if file is None:
+                directory.mkdir(parents=True, exist_ok=True)
+                file = _files[directory, pid] = _File(directory / f"{pid}.db")
+    return file
+
+
+def _key(name, suffix, labels):
+    return json.dumps([name, suffix, labels], sort_keys=True)
+
+
+class _Metric:
+    type = ""
+    # whether the samples of exited processes are kept
+    keep_exited = True
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        _metrics.append(self)
+
+    def _add(self, amount, labels):
+        file = _file()
+        if file is not None:
+            file.add(_key(self.name, "", labels), amount)
+
+    def samples(self, values):
+        """The lines of `values`, the samples of this metric summed over the processes
+        by name suffix, eg. "_count", & labels."""
+        for (suffix, labels), value in sorted(values.items()):
+            yield f"{self.name}{suffix}{_labels(dict(labels))} {_number(value)}"
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        self._add(amount, labels)
+
+
+class Gauge(_Metric):
+    """A gauge summed over the live processes."""
+
+    type = "gauge"
+    keep_exited = False
+
+    def inc(self, amount=1, **labels):
+        self._add(amount, labels)
+
+    def dec(self, amount=1, **labels):
+        self._add(-amount, labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, buckets):
+        super().__init__(name, documentation)
+        self.buckets = (*buckets, float("inf"))
+        self._bounds = [_number(bound) for bound in self.buckets]
+        # keys of the bucket, sum & count samples, by labels & bucket
+        self._keys: dict[tuple, tuple[str, str, str]] = {}
+
+    def observe(self, value, **labels):
+        file = _file()
+        if file is None:
+            return
+        bucket = bisect_left(self.buckets, value)
+        keys = self._keys.get((*labels.items(), bucket))
+        if keys is None:
+            # each bucket counts its own observations, summed into the others when read
+            bound = self._bounds[bucket]
+            keys = self._keys[(*labels.items(), bucket)] = (
+                _key(self.name, "_bucket", {**labels, "le": bound}),
+                _key(self.name, "_sum", labels),
+                _key(self.name, "_count", labels),
+            )
+        bucket_key, sum_key, count_key = keys
+        file.add(bucket_key, 1)
+        file.add(sum_key, value)
+        file.add(count_key, 1)
+
+    def samples(self, values):
+        series = {}
+        for (suffix, labels), value in values.items():
+            labels = dict(labels)
+            bound = labels.pop("le", None)
+            counts = series.setdefault(tuple(sorted(labels.items())), {})
+            counts[bound if suffix == "_bucket" else suffix] = value
+        for labels, counts in sorted(series.items()):
+            labels = dict(labels)
+            cumulative = 0
+            for bound in self._bounds:
+                cumulative += counts.get(bound, 0)
+                bucket_labels = _labels({**labels, "le": bound})
+                yield f"{self.name}_bucket{bucket_labels} {_number(cumulative)}"
+            for suffix in ("_sum", "_count"):
+                value = counts.get(suffix, 0)
+                yield f"{self.name}{suffix}{_labels(labels)} {_number(value)}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\""))
+        for name, value in sorted(labels.items())
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # exists, but owned by another user
+        return True
+    return True
+
+
+def collect(directory):
+    """Sum the samples in the files of every process in `directory`, by metric name,
+    name suffix & labels, and count the live processes."""
+    totals: dict[str, dict[tuple[str, tuple], float]] = {}
+    live = 0
+    keep_exited = {metric.name: metric.keep_exited for metric in _metrics}
+    for path in sorted(directory.glob("*.db")):
+        alive = path.stem != EXITED and _is_alive(int(path.stem))
+        live += alive
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            continue
+        magic, used = FILE_HEADER.unpack_from(data)
+        if magic != MAGIC:
+            continue
+        for key, offset in _entries(data, used):
+            name, suffix, labels = json.loads(key)
+            if not alive and not keep_exited.get(name, True):
+                continue
+            values = totals.setdefault(name, {})
+            series = (suffix, tuple(sorted(labels.items())))
+            values[series] = values.get(series, 0) + VALUE.unpack_from(data, offset)[0]
+    return totals, live
+
+
+def mark_process_dead(pid, directory):
+    """Fold the counters & histograms of the exited process `pid` into the file of
+    exited processes, and delete its file. Only run by the process which started the
+    others, eg. gunicorn's master, so the file of exited processes has one writer."""
+    path = directory / f"{pid}.db"
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return
+    magic, used = FILE_HEADER.unpack_from(data)
+    if magic == MAGIC:
+        keep_exited = {metric.name: metric.keep_exited for metric in _metrics}
+        exited = _File(directory / f"{EXITED}.db")
+        try:
+            for key, offset in _entries(data, used):
+                if keep_exited.get(json.loads(key)[0], True):
+                    exited.add(key, VALUE.unpack_from(data, offset)[0])
+        finally:
+            exited.close()
+    path.unlink()
+
+
+def clear(directory):
+    """Delete the files of every process in `directory`, before any is started."""
+    for path in directory.glob("*.db"):
+        path.unlink(missing_ok=True)
+
+
+def render_metrics():
+    """Every metric, summed over the processes, in the Prometheus text format."""
+    directory = metrics_dir()
+    totals, live = collect(directory) if directory and directory.is_dir() else ({}, 0)
+    lines = []
+    for metric in _metrics:
+        lines += [
+            f"# HELP {metric.name} {metric.documentation}",
+            f"# TYPE {metric.name} {metric.type}",
+            *metric.samples(totals.get(metric.name, {})),
+        ]
+    lines += [
+        "# HELP workers Live worker processes.",
+        "# TYPE workers gauge",
+        f"workers {live}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to respond to requests, by view, method & status.",
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Time to run database queries, by database.",
+    (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+CACHE_OPERATION_DURATION = Histogram(
+    "cache_operation_duration_seconds",
+    "Time for cache operations, by cache & operation.",
+    (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1),
+)
+WORKER_BUSY = Counter(
+    "worker_busy_seconds_total", "Time worker processes spent handling requests."
+)
+WORKER_IN_PROGRESS = Gauge(
+    "worker_requests_in_progress", "Requests being handled by worker processes."
+)
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total", "Log records dropped, by reason."
+)
+
+
+class MetricsMiddleware:
+    """Records the duration of requests, and how busy the process is. Goes first in
+    `MIDDLEWARE`, to include the time spent in the others."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        WORKER_IN_PROGRESS.inc()
+        try:
+            response = self.get_response(request)
+        finally:
+            WORKER_IN_PROGRESS.dec()
+            elapsed = time.perf_counter() - start
+            WORKER_BUSY.inc(elapsed)
+        match = request.resolver_match
+        REQUEST_DURATION.observe(
+            elapsed,
+            view=match.view_name if match is not None else "<unresolved>",
+            method=request.method if request.method in METHODS else "other",
+            status=str(response.status_code),
+        )
+        return response
+
+
+@receiver(query_executed)
+def record_query_duration(connection, elapsed, **kwargs):
+    DB_QUERY_DURATION.observe(elapsed, database=connection.alias)
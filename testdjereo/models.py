@@ -1,12 +1,22 @@
 import uuid
+from functools import partial
 
-from django.db import models
+from django.contrib.postgres.indexes import BrinIndex
+from django.db import connections, models
+from django.db.models import Q
+from django.dispatch import Signal
 from django.utils import timezone
 
+# sent by the bulk writes of `UpdatedAtQuerySet`, which send no `post_save`, with the
+# model as sender, the `updated_at` of the rows written by primary key as `rows` & the
+# database alias as `using`, so caches of those rows can move on to their new version
+# once the transaction commits
+rows_updated = Signal()
+
 
 class UuidModel(models.Model):
     id: models.UUIDField = models.UUIDField(
-        primary_key=True, default=uuid.uuid4, editable=False
+        primary_key=True, default=uuid.uuid7, editable=False
     )
 
     class Meta:
@@ -20,18 +30,195 @@ class CreatedAtModel(models.Model):
         abstract = True
 
 
+def created_at_brin_index(name):
+    """BRIN index on `created_at`, a fraction of the size of a B-tree index.
+
+    Rows of append-mostly tables are physically stored in roughly `created_at` order,
+    which is what BRIN relies on to skip whole block ranges in recency queries.
+    """
+    return BrinIndex(fields=["created_at"], name=name, autosummarize=True)
+
+
+def returning_updated_at(model, rows, execute, sql, params, many, context):
+    """Execute wrapper adding the `updated_at` of the rows an `UPDATE` of `model`'s
+    table changes to `rows`, by primary key."""
+    quote_name = context["connection"].ops.quote_name
+    table = quote_name(model._meta.db_table)
+    if not sql.startswith(f"UPDATE {table} "):
+        return execute(sql, params, many, context)
+    pk = quote_name(model._meta.pk.column)
+    updated_at = quote_name(model._meta.get_field("updated_at").column)
+    result = execute(
+        f"{sql} RETURNING {table}.{pk}, {table}.{updated_at}", params, many, context
+    )
+    rows.update(context["cursor"].fetchall())
+    return result
+
+
+class UpdatedAtQuerySet(models.QuerySet):
+    """Keep `updated_at` current on bulk writes, which skip `auto_now`.
+
+    Timestamps are set in the same statement as the write itself, so bulk paths stay
+    a single round trip. So are the primary keys & `updated_at` of the rows `update()`
+    changes read, with `RETURNING`, for models with `rows_updated` receivers.
+    """
+
+    def update(self, **kwargs):
+        kwargs.setdefault("updated_at", timezone.now())
+        if not rows_updated.has_listeners(self.model):
+            return super().update(**kwargs)
+        self._for_write = True
+        rows = {}
+        wrapper = partial(returning_updated_at, self.model, rows)
+        with connections[self.db].execute_wrapper(wrapper):
+            updated = super().update(**kwargs)
+        rows_updated.send(self.model, rows=rows, using=self.db)
+        return updated
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        objs = tuple(objs)
+        now = timezone.now()
+        for obj in objs:
+            obj.updated_at = now
+        fields = [*fields, "updated_at"] if "updated_at" not in fields else fields
+        # sends `rows_updated` from `update()`, once per batch
+        return super().bulk_update(objs, fields, batch_size=batch_size)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Also give objects which updated a clashing row, with `update_conflicts`,
+        that row's primary key.
+
+        Django reads back the primary keys of the rows it inserted or updated, but
+        keeps those of objects created with one, eg. by a default like `uuid7()`, which
+        are not the updated row's.
+        """
+        objs = list(objs)
+        preset = [obj for obj in objs if obj._is_pk_set()]
+        objs = super().bulk_create(objs, *args, **kwargs)
+        if kwargs.get("update_conflicts"):
+            if preset:
+                self._set_upserted_pks(preset, kwargs["unique_fields"])
+            # inserted rows are not cached yet, but updated rows may be
+            rows = {obj.pk: obj.updated_at for obj in objs if obj._is_pk_set()}
+            rows_updated.send(self.model, rows=rows, using=self.db)
+        return objs
+
+    def _set_upserted_pks(self, objs, unique_fields):
+        opts = self.model._meta
+        fields = [
+            opts.pk if name == "pk" else opts.get_field(name) for name in unique_fields
+        ]
+        if any(field.primary_key for field in fields):
+            return
+        attnames = [field.attname for field in fields]
+        if len(attnames) == 1:
+            condition = Q(
+                **{f"{attnames[0]}__in": [getattr(o, attnames[0]) for o in objs]}
+            )
+        else:
+            condition = Q()
+            for obj in objs:
+                condition |= Q(**{attname: getattr(obj, attname) for attname in attnames})
+        rows = (
+            self.model._base_manager.using(self.db)
+            .filter(condition)
+            .values_list(*attnames, "pk")
+        )
+        pks = {tuple(row[:-1]): row[-1] for row in rows}
+        for obj in objs:
+            obj.pk = pks.get(tuple(getattr(obj, attname) for attname in attnames), obj.pk)
+
+    def bulk_upsert(self, objs, *, unique_fields, update_fields, batch_size=None):
+        """Insert `objs`, updating `update_fields` of rows clashing on `unique_fields`.
+
+        `updated_at` is always among the updated fields, ie. stamped on both inserted
+        and updated rows. Objects updating a row are given its primary key, at the cost
+        of one more query for objects created with a primary key.
+        """
+        if "updated_at" not in update_fields:
+            update_fields = [*update_fields, "updated_at"]
+        return self.bulk_create(
+            objs,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=update_fields,
+        )
+
+    def cached_get(self, pk):
+        """`get(pk=pk)`, served from the row cache, see `testdjereo.cache.rows`."""
+        from testdjereo.cache.rows import cached_get
+
+        return cached_get(self, pk)
+
+    def cached_in_bulk(self, pks):
+        """`in_bulk(pks)`, served from the row cache with one `get_many()` & one query
+        for the rows not cached, see `testdjereo.cache.rows`."""
+        from testdjereo.cache.rows import cached_in_bulk
+
+        return cached_in_bulk(self, pks)
+
+
+class UpdatedAtManager(models.Manager.from_queryset(UpdatedAtQuerySet)):
+    pass
+
+
 class UpdatedAtModel(models.Model):
     updated_at: models.DateTimeField = models.DateTimeField(auto_now=True)
 
+    objects = UpdatedAtManager()
+
+    # seconds rows are kept in the row cache, which is off unless set
+    ROW_CACHE_TIMEOUT: int | None = None
+
     class Meta:
         abstract = True
 
+    def save(self, *args, update_fields=None, **kwargs):
+        """Also stamp `updated_at` when saving only some `update_fields`, so it moves on
+        with every write, eg. for the versioned caches of `testdjereo.cache.rows`."""
+        if update_fields and "updated_at" not in update_fields:
+            update_fields = [*update_fields, "updated_at"]
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+
+class DeletedAtQuerySet(models.QuerySet):
+    def live(self):
+        return self.filter(deleted_at__isnull=True)
+
+    def deleted(self):
+        return self.filter(deleted_at__isnull=False)
+
+    def soft_delete(self):
+        """Mark every live row in the queryset as deleted with a single UPDATE."""
+        return self.live().update(deleted_at=timezone.now())
+
+    def restore(self):
+        """Undelete every row in the queryset with a single UPDATE."""
+        return self.deleted().update(deleted_at=None)
+
+
+class DeletedAtManager(models.Manager.from_queryset(DeletedAtQuerySet)):
+    """Hide soft-deleted rows unless `include_deleted` is set."""
+
+    def __init__(self, *, include_deleted=False):
+        super().__init__()
+        self.include_deleted = include_deleted
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        return queryset if self.include_deleted else queryset.live()
+
 
 class DeletedAtModel(models.Model):
     deleted_at: models.DateTimeField = models.DateTimeField(
         blank=True, null=True, default=None, editable=False
     )
 
+    # `objects` is declared first so it is the default manager, and only sees live rows
+    objects = DeletedAtManager()
+    all_objects = DeletedAtManager(include_deleted=True)
+
     def soft_delete(self):
         self.deleted_at = timezone.now()
         self.save(update_fields=["deleted_at"])
@@ -42,3 +229,22 @@ class DeletedAtModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+def live_index(*fields, name):
+    """Partial index covering only the live rows of a `DeletedAtModel` subclass.
+
+    Tombstones are left out of the index so it stays small as soft-deleted rows pile
+    up, and queries filtering on `deleted_at__isnull=True` (ie. the default manager)
+    can use it.
+    """
+    return models.Index(
+        fields=fields, name=name, condition=models.Q(deleted_at__isnull=True)
+    )
+
+
+def live_unique_constraint(*fields, name):
+    """Unique constraint enforced only among the live rows of a `DeletedAtModel`."""
+    return models.UniqueConstraint(
+        fields=fields, name=name, condition=models.Q(deleted_at__isnull=True)
+    )
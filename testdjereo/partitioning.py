@@ -0,0 +1,168 @@
+"""PostgreSQL declarative range partitioning on `created_at` for `CreatedAtModel`s.
+
+Partitioning is opt-in. Django rejects unknown `Meta` options, so a model declares
+it with an inner `PartitioningMeta` class instead:
+
+```
+class Event(CreatedAtModel):
+    pk = models.CompositePrimaryKey("id", "created_at")
+    id = models.UUIDField(default=uuid.uuid7, editable=False)
+
+    class PartitioningMeta:
+        premake = 3  # months of partitions to keep ready ahead of the current one
+        retention = 12  # months of partitions to keep attached, or None for all
+```
+
+PostgreSQL requires the partition key to be part of every unique constraint, hence the
+composite primary key. Create the table with `CreatePartitionedModel` and its first
+partitions with `CreateMonthlyPartitions` in a migration, then run the
+`manage_partitions` command periodically to create future partitions and detach old
+ones. Queries filtering on `created_at` only scan the partitions they need.
+"""
+
+import datetime as dt
+
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS, connections, migrations
+from django.db.migrations.operations.base import Operation
+from django.utils import timezone
+
+PARTITION_KEY = "created_at"
+
+
+def get_partitioned_models():
+    return [m for m in apps.get_models() if hasattr(m, "PartitioningMeta")]
+
+
+def month_start(value: dt.datetime | dt.date, months: int = 0) -> dt.date:
+    """First day of the month `months` away from the month containing `value`."""
+    index = value.year * 12 + value.month - 1 + months
+    return dt.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(model, start: dt.date) -> str:
+    return f"{model._meta.db_table}_p{start:%Y%m}"
+
+
+def create_monthly_partition(model, start: dt.date, using=DEFAULT_DB_ALIAS) -> bool:
+    """Create the partition of `model` holding the month starting on `start`.
+
+    Return whether a partition was created, ie. False if it already existed.
+    """
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    name = partition_name(model, start)
+    if name in list_partitions(model, using=using):
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE {quote_name(name)} "
+            + f"PARTITION OF {quote_name(model._meta.db_table)} "
+            + "FOR VALUES FROM (%s) TO (%s)",
+            [start, month_start(start, 1)],
+        )
+    return True
+
+
+def list_partitions(model, using=DEFAULT_DB_ALIAS) -> list[str]:
+    """Names of the partitions currently attached to the table of `model`."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass ORDER BY c.relname
+            """,
+            [model._meta.db_table],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def detach_partition(model, name: str, *, drop=False, using=DEFAULT_DB_ALIAS):
+    """Detach a partition from `model`'s table, keeping it as a standalone table
+    unless `drop` is set."""
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"ALTER TABLE {quote_name(model._meta.db_table)} "
+            + f"DETACH PARTITION {quote_name(name)}"
+        )
+        if drop:
+            cursor.execute(f"DROP TABLE {quote_name(name)}")
+
+
+def expired_partitions(model, retention: int, *, today=None, using=DEFAULT_DB_ALIAS):
+    """Attached partitions holding only months older than `retention` months ago."""
+    oldest = month_start(today or timezone.now(), -retention)
+    return [
+        name
+        for name in list_partitions(model, using=using)
+        if name < partition_name(model, oldest)
+    ]
+
+
+class CreatePartitionedModel(migrations.CreateModel):
+    """Create a model's table as a parent table range-partitioned on `created_at`.
+
+    The parent holds no rows of its own, so add `CreateMonthlyPartitions` after it.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+
+        column = schema_editor.quote_name(model._meta.get_field(PARTITION_KEY).column)
+        sql_create_table = schema_editor.sql_create_table
+        schema_editor.sql_create_table = (
+            f"{sql_create_table} PARTITION BY RANGE ({column})"
+        )
+        try:
+            schema_editor.create_model(model)
+        finally:
+            schema_editor.sql_create_table = sql_create_table
+
+    def describe(self):
+        return f"Create range-partitioned model {self.name}"
+
+
+class CreateMonthlyPartitions(Operation):
+    """Create monthly partitions from `before` months ago to `after` months ahead."""
+
+    reduces_to_sql = False
+    reversible = True
+
+    def __init__(self, model_name, before=0, after=3):
+        self.model_name = model_name
+        self.before = before
+        self.after = after
+
+    def deconstruct(self):
+        kwargs = {
+            "model_name": self.model_name,
+            "before": self.before,
+            "after": self.after,
+        }
+        return (self.__class__.__qualname__, [], kwargs)
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+
+        now = timezone.now()
+        for months in range(-self.before, self.after + 1):
+            create_monthly_partition(
+                model, month_start(now, months), using=schema_editor.connection.alias
+            )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        # partitions are dropped along with their parent table
+        pass
+
+    def describe(self):
+        return f"Create monthly partitions for {self.model_name}"
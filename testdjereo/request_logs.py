@@ -0,0 +1,146 @@
+"""Fields added to the request logs of `django_structlog`.
+
+Every request log gets `duration_ms` & the `view` name. A `REQUEST_PERF_SAMPLE_RATE`
+share of requests also get a summary of where the time went:
+
+- `db_queries` & `db_ms`: the queries run, on any database, & their total time.
+- `cache`: operations, hits, misses & time per cache, see
+  `testdjereo.cache.instrumented`.
+- `template_ms`: time rendering templates of the `TimedDjangoTemplates` backend.
+- `middleware_ms`: time in the request phase of each middleware following a
+  `MiddlewareTimer` in `MIDDLEWARE`, until the next timer. The settings only add the
+  timers when `REQUEST_PERF_SAMPLE_RATE` is above 0. Response phases are not
+  included: the request is logged by the innermost middleware, before the others
+  process the response.
+
+Sampling is decided when Django starts the request; the hooks of requests not sampled
+only read a context variable.
+"""
+
+import contextvars
+import inspect
+import random
+import time
+
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.core.signals import request_started
+from django.dispatch import receiver
+from django.template.backends.django import DjangoTemplates, Template
+from django_structlog import signals
+
+from testdjereo.cache import instrumented
+from testdjereo.db import query_executed
+
+# `RequestPerf` of the current request, or None outside requests & if not sampled
+_perf = contextvars.ContextVar("request_perf", default=None)
+
+
+class RequestPerf:
+    __slots__ = ("db_queries", "db_ms", "template_ms", "rendering", "marks")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_ms = self.template_ms = 0.0
+        self.rendering = False
+        # (middleware name, or None for the view, & when its request phase started)
+        self.marks = []
+
+    def middleware_ms(self, now):
+        timings = {}
+        ends = [start for _, start in self.marks[1:]] + [now]
+        for (name, start), end in zip(self.marks, ends, strict=True):
+            if name is None:
+                break
+            timings[name] = round((end - start) * 1000, 3)
+        return timings
+
+    def as_log_kwargs(self, now):
+        return {
+            "db_queries": self.db_queries,
+            "db_ms": round(self.db_ms, 3),
+            "template_ms": round(self.template_ms, 3),
+            "middleware_ms": self.middleware_ms(now),
+        }
+
+
+@receiver(request_started)
+def start_request_perf(**kwargs):
+    rate = getattr(settings, "REQUEST_PERF_SAMPLE_RATE", 1.0)
+    sampled = random.random() < rate  # noqa: S311 - sampling, not security
+    _perf.set(RequestPerf() if sampled else None)
+    instrumented.start_request_stats(enabled=sampled)
+
+
+@receiver(query_executed)
+def record_query(elapsed, **kwargs):
+    perf = _perf.get()
+    if perf is not None:
+        perf.db_queries += 1
+        perf.db_ms += elapsed * 1000
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        perf = _perf.get()
+        # templates rendered while rendering another are already timed
+        if perf is None or perf.rendering:
+            return super().render(context, request)
+        perf.rendering = True
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            perf.rendering = False
+            perf.template_ms += (time.perf_counter() - start) * 1000
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """`DjangoTemplates` timing the rendering of its templates."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+class MiddlewareTimer:
+    """Marks when the middleware following it, or the view if last, was called."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # unwrap `convert_exception_to_response()`
+        wrapped = inspect.unwrap(get_response)
+        if inspect.ismethod(wrapped) and isinstance(wrapped.__self__, BaseHandler):
+            self.name = None
+        elif inspect.isfunction(wrapped):
+            # named after the factory returning it
+            self.name = wrapped.__qualname__.partition(".<locals>")[0]
+        else:
+            self.name = type(wrapped).__qualname__
+
+    def __call__(self, request):
+        perf = _perf.get()
+        if perf is not None:
+            perf.marks.append((self.name, time.perf_counter()))
+        return self.get_response(request)
+
+
+@receiver(signals.bind_extra_request_metadata)
+def start_request_timer(request, **kwargs):
+    request._log_started_at = time.perf_counter()
+
+
+@receiver(signals.bind_extra_request_finished_metadata)
+@receiver(signals.bind_extra_request_failed_metadata)
+def bind_request_duration(request, log_kwargs, **kwargs):
+    now = time.perf_counter()
+    started_at = getattr(request, "_log_started_at", None)
+    if started_at is not None:
+        log_kwargs["duration_ms"] = round((now - started_at) * 1000, 1)
+    if request.resolver_match is not None:
+        log_kwargs["view"] = request.resolver_match.view_name
+    perf = _perf.get()
+    if perf is not None:
+        log_kwargs.update(perf.as_log_kwargs(now))
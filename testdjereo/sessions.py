@@ -0,0 +1,94 @@
+"""Session engine serving reads from a cache and coalescing writes to the database.
+
+Like `django.contrib.sessions.backends.cached_db`, sessions are read from the cache
+named by `SESSION_CACHE_ALIAS` and fall back to the database on a miss. Saves are
+skipped when the session data is unchanged since it was loaded and its stored expiry
+is less than `SESSION_EXPIRY_UPDATE_THRESHOLD` seconds behind the new one, eg. when
+a view sets a key to the value it already had.
+
+Every write still goes to the database, which stays the source of truth. Under
+several worker processes the session cache must be shared between them, otherwise a
+worker may serve a session another worker has since changed or deleted.
+
+Use by setting `SESSION_ENGINE = "testdjereo.sessions"`.
+"""
+
+import datetime as dt
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+KEY_PREFIX = "testdjereo.sessions"
+DEFAULT_EXPIRY_UPDATE_THRESHOLD = 60 * 60
+
+logger = logging.getLogger("django.contrib.sessions")
+
+
+class SessionStore(CachedDBStore):
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        # the serialized data & expiry date last read from or written to the database
+        self._stored = None
+
+    def load(self):
+        try:
+            cached = self._cache.get(self.cache_key)
+        except Exception:
+            # see `cached_db.SessionStore.load()`
+            cached = None
+
+        if cached is not None:
+            data, expire_date = cached
+        else:
+            s = self._get_session_from_db()
+            if not s:
+                return {}
+            data, expire_date = self.decode(s.session_data), s.expire_date
+            self._set_cache(data, expire_date)
+        self._stored = (self._serialize(data), expire_date)
+        return data
+
+    def save(self, must_create=False):
+        if not must_create and self.session_key is not None and self._is_unchanged():
+            return
+        # skip `cached_db`, whose cache entries hold no expiry date
+        super(CachedDBStore, self).save(must_create)
+        data = self._get_session(no_load=True)
+        expire_date = self.get_expiry_date()
+        self._stored = (self._serialize(data), expire_date)
+        try:
+            self._set_cache(data, expire_date)
+        except Exception:
+            logger.exception("Error saving to cache (%s)", self._cache)
+
+    async def aload(self):
+        return await sync_to_async(self.load)()
+
+    async def asave(self, must_create=False):
+        await sync_to_async(self.save)(must_create)
+
+    def _is_unchanged(self):
+        if self._stored is None or not hasattr(self, "_session_cache"):
+            return False
+        serialized, expire_date = self._stored
+        threshold = dt.timedelta(
+            seconds=getattr(
+                settings,
+                "SESSION_EXPIRY_UPDATE_THRESHOLD",
+                DEFAULT_EXPIRY_UPDATE_THRESHOLD,
+            )
+        )
+        lag = self.get_expiry_date() - expire_date
+        return self._serialize(self._session_cache) == serialized and lag < threshold
+
+    def _serialize(self, data):
+        return self.serializer().dumps(data)
+
+    def _set_cache(self, data, expire_date):
+        self._cache.set(
+            self.cache_key, (data, expire_date), self.get_expiry_age(expiry=expire_date)
+        )
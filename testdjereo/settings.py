@@ -91,6 +91,8 @@ CONTRIB_APPS = [
 INSTALLED_APPS = FIRST_PARTY_APPS + THIRD_PARTY_APPS + CONTRIB_APPS
 
 MIDDLEWARE = [
+    # first, to time the whole request, see `testdjereo.metrics`
+    "testdjereo.metrics.MetricsMiddleware",
     "testdjereo.middleware.SecurityHeadersMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django_permissions_policy.PermissionsPolicyMiddleware",
@@ -114,7 +116,14 @@ if not DEBUG:
 
 ROOT_URLCONF = "testdjereo.urls"
 
-logging_factory = LoggingConfigFactory(debug=DEBUG)
+# production logs are rendered & written to stdout by a background thread, so a slow
+# log pipe does not stall requests
+logging_factory = LoggingConfigFactory(
+    debug=DEBUG,
+    queue=not IS_TESTING,
+    # share of request logs kept, eg. at peak load; errors & slow requests are all kept
+    sample_rates={"django_structlog": env.float("LOG_REQUEST_SAMPLE_RATE", default=1.0)},
+)
 LOGGING = logging_factory.build()
 
 if not DEBUG:
@@ -140,7 +149,8 @@ if not DEBUG:
 TEMPLATES = [
     # Look inside the `templates/` subdirectory of each Django app.
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # render times are added to request logs, see `testdjereo.request_logs`
+        "BACKEND": "testdjereo.request_logs.TimedDjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -202,17 +212,28 @@ EMAIL_PORT = 1025
 # Database
 # https://docs.djangoproject.com/en/stable/ref/settings/#databases
 
+DATABASE_CONFIG = env.dj_db_url("DATABASE_URL")
+
 DATABASES: dict[str, dict[str, Any]] = {
-    #    "default": {"OPTIONS": {"pool": True}, **env.dj_db_url("DATABASE_URL")}
-    "default": {**env.dj_db_url("DATABASE_URL")}
+    # connections are taken from a pool per process, rather than opened per request
+    "default": {
+        **DATABASE_CONFIG,
+        "OPTIONS": {**DATABASE_CONFIG.get("OPTIONS", {}), "pool": True},
+    }
 }
 
 AUTH_USER_MODEL = "users.AuthUser"
 
 AUTHENTICATION_BACKENDS = (
-    # Needed to log in by username in Django admin, regardless of `django-allauth`
-    "django.contrib.auth.backends.ModelBackend",
+    # Needed to log in by username in Django admin, regardless of `django-allauth`.
+    # Both backends serve the user of each request from the cache, see `users.cache`.
+    "users.backends.CachedModelBackend",
     # `django-allauth` specific authentication methods, such as log in by e-mail
+    "users.backends.CachedAuthenticationBackend",
+    # Not cached, & only used by the sessions of users who logged in with them: Django
+    # logs out sessions whose backend is no longer listed. New logins go through the
+    # cached backends above, which authenticate the same users.
+    "django.contrib.auth.backends.ModelBackend",
     "allauth.account.auth_backends.AuthenticationBackend",
 )
 
@@ -226,15 +247,46 @@ CACHE_COMMON_CONFIG = {
     "KEY_PREFIX": f"py{platform.python_version()}_",
 }
 
+# Shared by every worker process on the host, so entries are computed & invalidated
+# once for all of them. Each cache takes up MAX_ENTRIES * SLOT_SIZE bytes of `/dev/shm`,
+# allocated on start: 16 MiB & 8 MiB here, well within the 64 MiB Docker gives
+# containers by default, next to the metrics & cache stats files. Raise `--shm-size`
+# before raising these, see `_deploy/deploy.Dockerfile`.
 CACHE_BACKEND_CONFIG = {
-    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-    "LOCATION": "unique-snowflake",
+    "BACKEND": "testdjereo.cache.shm.SharedMemoryCache",
+    "LOCATION": "/dev/shm/testdjereo-cache",  # noqa: S108
+    "OPTIONS": {"MAX_ENTRIES": 4096, "SLOT_SIZE": 4096},
+}
+
+# Sessions must be shared by every worker process, see `testdjereo.sessions`
+SESSION_CACHE_BACKEND_CONFIG = {
+    **CACHE_BACKEND_CONFIG,
+    "LOCATION": "/dev/shm/testdjereo-sessions",  # noqa: S108
+    "OPTIONS": {"MAX_ENTRIES": 2048, "SLOT_SIZE": 4096},
 }
 
 if DEBUG or IS_TESTING:
     CACHE_BACKEND_CONFIG = {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    SESSION_CACHE_BACKEND_CONFIG = CACHE_BACKEND_CONFIG
 
-CACHES = {"default": {**CACHE_COMMON_CONFIG, **CACHE_BACKEND_CONFIG}}
+# Hits, misses & latencies are recorded, see `testdjereo.cache.instrumented`
+CACHES = {
+    "default": {
+        "BACKEND": "testdjereo.cache.instrumented.InstrumentedCache",
+        "LOCATION": "default",
+        "OPTIONS": {"WRAPPED": {**CACHE_COMMON_CONFIG, **CACHE_BACKEND_CONFIG}},
+    },
+    "sessions": {
+        "BACKEND": "testdjereo.cache.instrumented.InstrumentedCache",
+        "LOCATION": "sessions",
+        "OPTIONS": {"WRAPPED": {**CACHE_COMMON_CONFIG, **SESSION_CACHE_BACKEND_CONFIG}},
+    },
+    # waffle flags, switches & samples, see `testdjereo.cache.flags`
+    "waffle": {
+        "BACKEND": "testdjereo.cache.flags.WaffleSnapshotCache",
+        "OPTIONS": {"CACHE": "default"},
+    },
+}
 
 # Password validation
 # https://docs.djangoproject.com/en/stable/ref/settings/#auth-password-validators
@@ -305,6 +357,10 @@ SILENCED_SYSTEM_CHECKS = [
 
 # 2. Django Contrib Settings -------------------------------------------------------------
 
+# Sessions are read from a cache & only written when they change
+SESSION_ENGINE = "testdjereo.sessions"
+SESSION_CACHE_ALIAS = "sessions"
+
 
 # 3. Third Party Settings ----------------------------------------------------------------
 
@@ -344,5 +400,33 @@ ACCOUNT_LOGIN_METHODS = {"email"}
 WAFFLE_LOG_MISSING_FLAGS = logging.WARNING
 WAFFLE_LOG_MISSING_SWITCHES = logging.WARNING
 WAFFLE_LOG_MISSING_SAMPLES = logging.WARNING
+WAFFLE_CACHE_NAME = "waffle"
 
 # 4. Project Settings --------------------------------------------------------------------
+
+# Seconds a session's stored expiry may lag behind before an unchanged session is saved
+SESSION_EXPIRY_UPDATE_THRESHOLD = 60 * 60
+
+# Where each process writes its cache stats for the `cache_stats` command. Only set for
+# the web server's processes, by `testdjereo.gunicorn_conf`
+CACHE_STATS_DIR = None if IS_TESTING else env.str("CACHE_STATS_DIR", default=None)
+
+# Queries taking this long or longer are logged & explained, see
+# `testdjereo.slow_queries`. None to not log slow queries; every query is still timed,
+# for the metrics & request logs, see `testdjereo.db.query_executed`.
+SLOW_QUERY_MS = None if IS_TESTING else env.int("SLOW_QUERY_MS", default=500)
+
+# Where each process writes its metrics, served at `-/metrics`. Only set for the web
+# server's processes, by `testdjereo.gunicorn_conf`
+METRICS_DIR = None if IS_TESTING else env.str("METRICS_DIR", default=None)
+# Bearer token to scrape `-/metrics` with, which is not found without one
+METRICS_TOKEN = env.str("METRICS_TOKEN", default=None)
+
+# Share of request logs summarising where the time went, see `testdjereo.request_logs`
+REQUEST_PERF_SAMPLE_RATE = env.float("REQUEST_PERF_SAMPLE_RATE", default=1.0)
+# time each middleware & the view, once all middleware are added, unless no request is
+# sampled, as the timers double the middleware each request goes through
+if REQUEST_PERF_SAMPLE_RATE > 0:
+    MIDDLEWARE_TIMER = "testdjereo.request_logs.MiddlewareTimer"
+    MIDDLEWARE = [m for path in MIDDLEWARE for m in (MIDDLEWARE_TIMER, path)]
+    MIDDLEWARE += [MIDDLEWARE_TIMER]
@@ -0,0 +1,194 @@
+"""Log of the database queries taking `SLOW_QUERY_MS` or longer.
+
+Every query is timed, see `testdjereo.db.query_executed`, and each slow one logged as
+a `slow_query` event with:
+
+- `fingerprint`: a hash of the normalized SQL, ie. with literals, placeholders &
+  lists of them replaced, so the calls of a query with different values share it.
+- `sql`: the normalized SQL.
+- `call_site`: the first frame of the project's code running the query.
+
+The plan of a slow query is then captured on a background thread, with
+`EXPLAIN (ANALYZE off, FORMAT JSON)` on a connection of its own, so the query's
+caller does not wait for it. A query is explained at most every `EXPLAIN_INTERVAL`
+seconds, and its plan logged as a `slow_query_plan` event only when its shape
+changed, ie. its nodes, relations & indexes, not its costs. Only the plan's shape &
+estimates are logged: its conditions, filters & outputs hold the query's parameters.
+"""
+
+import hashlib
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+import structlog
+from django.conf import settings
+from django.db import connections
+from django.db.backends import utils as backend_utils
+from django.dispatch import receiver
+
+from testdjereo.db import query_executed
+
+logger = structlog.get_logger(__name__)
+
+EXPLAIN = "EXPLAIN (ANALYZE off, FORMAT JSON) "
+EXPLAIN_INTERVAL = 60 * 60
+# slow queries waiting to be explained, beyond which others are not
+EXPLAIN_QUEUE_SIZE = 100
+# statements `EXPLAIN` accepts & runs without side effects, when not analyzing
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+# keys of the plan nodes making up a plan's shape
+PLAN_SHAPE_KEYS = ("Node Type", "Join Type", "Strategy", "Relation Name", "Index Name")
+# keys of the plan nodes logged besides the shape, none holding the query's values
+PLAN_ESTIMATE_KEYS = ("Startup Cost", "Total Cost", "Plan Rows", "Plan Width")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|%\(\w+\)s")
+_LIST = re.compile(r"\(\?(?:, \?)+\)")
+_ROWS = re.compile(r"(\(\.\.\.\)|\(\?\))(?:, \1)+")
+_SPACE = re.compile(r"\s+")
+
+# slow queries to explain, & the process whose thread explains them
+_queue: queue.Queue = queue.Queue(EXPLAIN_QUEUE_SIZE)
+_worker_pid = None
+_worker_lock = threading.Lock()
+# plan fingerprint & when last explained, by query fingerprint
+_plans: dict[str, tuple[str | None, float]] = {}
+_plans_lock = threading.Lock()
+
+
+def normalize(sql):
+    sql = _SPACE.sub(" ", sql).strip()
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _LIST.sub("(...)", sql)
+    return _ROWS.sub(r"\1, ...", sql)
+
+
+def fingerprint(text):
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+def plan_shape(node, keys=PLAN_SHAPE_KEYS):
+    """The nodes of a plan with only their `keys`, by default without their costs &
+    estimates."""
+    return {
+        **{key: node[key] for key in keys if key in node},
+        "Plans": [plan_shape(child, keys) for child in node.get("Plans", [])],
+    }
+
+
+def call_site():
+    """The innermost frame of the project's code running the query, as
+    "path:line in function"."""
+    base_dir = str(settings.BASE_DIR)
+    frame = sys._getframe(1)
+    # skip the execute wrappers & signal receivers, called by Django's cursor
+    while frame is not None and frame.f_code.co_filename != backend_utils.__file__:
+        frame = frame.f_back
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(base_dir) and "site-packages" not in filename:
+            path = Path(filename).relative_to(base_dir)
+            return f"{path}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+@receiver(query_executed)
+def log_slow_query(connection, sql, params, many, elapsed, **kwargs):
+    threshold = getattr(settings, "SLOW_QUERY_MS", None)
+    elapsed *= 1000
+    # not the queries explaining others
+    if threshold is None or elapsed < threshold or sql.startswith(EXPLAIN):
+        return
+    normalized = normalize(sql)
+    query_fingerprint = fingerprint(normalized)
+    logger.warning(
+        "slow_query",
+        fingerprint=query_fingerprint,
+        sql=normalized,
+        duration_ms=round(elapsed, 1),
+        database=connection.alias,
+        many=many,
+        call_site=call_site(),
+    )
+    if (
+        not many
+        and connection.vendor == "postgresql"
+        and sql.lstrip()[:6].upper().startswith(EXPLAINABLE)
+    ):
+        submit_explain(query_fingerprint, connection.alias, sql, params)
+
+
+def submit_explain(query_fingerprint, alias, sql, params):
+    """Queue the query to be explained, unless explained lately."""
+    now = time.monotonic()
+    with _plans_lock:
+        plan_fingerprint, explained_at = _plans.get(query_fingerprint, (None, None))
+        if explained_at is not None and now - explained_at < EXPLAIN_INTERVAL:
+            return
+        _plans[query_fingerprint] = (plan_fingerprint, now)
+    start_worker()
+    try:
+        _queue.put_nowait((query_fingerprint, alias, sql, params))
+    except queue.Full:
+        with _plans_lock:
+            # so it is explained when next slow
+            _plans[query_fingerprint] = (plan_fingerprint, None)
+
+
+def start_worker():
+    """Start the thread explaining queries, once per process."""
+    global _queue, _worker_pid
+
+    if _worker_pid == os.getpid():
+        return
+    with _worker_lock:
+        if _worker_pid != os.getpid():
+            # not the queue inherited from the parent process
+            _queue = queue.Queue(EXPLAIN_QUEUE_SIZE)
+            threading.Thread(
+                target=explain_queries, args=(_queue,), name="explain", daemon=True
+            ).start()
+            _worker_pid = os.getpid()
+
+
+def explain_queries(jobs):
+    while True:
+        job = jobs.get()
+        try:
+            explain(*job)
+        except Exception:
+            logger.warning("slow_query_explain_failed", fingerprint=job[0], exc_info=True)
+        finally:
+            # slow queries are rare, so don't hold a connection in between
+            connections[job[1]].close()
+            jobs.task_done()
+
+
+def explain(query_fingerprint, alias, sql, params):
+    with connections[alias].cursor() as cursor:
+        cursor.execute(EXPLAIN + sql, params)
+        (plan,) = cursor.fetchone()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    plan = plan[0]["Plan"]
+    plan_fingerprint = fingerprint(json.dumps(plan_shape(plan)))
+    with _plans_lock:
+        previous, explained_at = _plans.get(query_fingerprint, (None, None))
+        _plans[query_fingerprint] = (plan_fingerprint, explained_at)
+    if plan_fingerprint != previous:
+        logger.warning(
+            "slow_query_plan",
+            fingerprint=query_fingerprint,
+            plan_fingerprint=plan_fingerprint,
+            plan=plan_shape(plan, PLAN_SHAPE_KEYS + PLAN_ESTIMATE_KEYS),
+        )
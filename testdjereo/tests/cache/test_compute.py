@@ -0,0 +1,145 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from testdjereo.cache import compute
+from testdjereo.cache.compute import LOCK_SUFFIX, cached_computation, get_or_compute
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+
+class Counter:
+    def __init__(self, duration=0.0):
+        self.calls = 0
+        self.duration = duration
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.calls += 1
+            calls = self.calls
+        time.sleep(self.duration)
+        return calls
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class GetOrComputeTestCase(SimpleTestCase):
+    def setUp(self):
+        self.addCleanup(cache.clear)
+
+    def test_computes_on_miss_only(self):
+        counter = Counter()
+
+        self.assertEqual(get_or_compute("key", counter, timeout=60), 1)
+        self.assertEqual(get_or_compute("key", counter, timeout=60), 1)
+        self.assertEqual(counter.calls, 1)
+
+    def test_concurrent_misses_compute_once(self):
+        counter = Counter(duration=0.1)
+        results = []
+
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(get_or_compute("key", counter, timeout=60))
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(counter.calls, 1)
+        self.assertEqual(results, [1] * 8)
+
+    def test_waits_for_computation_in_another_process(self):
+        counter = Counter()
+        # as if another process were computing the value
+        cache.add("key" + LOCK_SUFFIX, "other")
+        threading.Timer(
+            0.1, cache.set, ["key", ("theirs", 0.0, time.time() + 60)]
+        ).start()
+
+        self.assertEqual(get_or_compute("key", counter, timeout=60), "theirs")
+        self.assertEqual(counter.calls, 0)
+
+    def test_computes_when_other_process_times_out(self):
+        counter = Counter()
+        cache.add("key" + LOCK_SUFFIX, "other")
+
+        self.assertEqual(get_or_compute("key", counter, lock_timeout=0.1), 1)
+
+    def test_early_recomputation(self):
+        counter = Counter()
+        # took 10s to compute & expires in 1s, so is recomputed unless `random()` is
+        # below 0.1
+        cache.set("key", ("early", 10.0, time.time() + 1))
+
+        with mock.patch.object(compute.random, "random", return_value=0.5):
+            self.assertEqual(get_or_compute("key", counter, timeout=60), 1)
+
+    def test_no_early_recomputation_with_zero_beta(self):
+        counter = Counter()
+        cache.set("key", ("early", 10.0, time.time() + 1))
+
+        self.assertEqual(get_or_compute("key", counter, timeout=60, beta=0), "early")
+
+    def test_early_recomputation_is_skipped_while_locked(self):
+        counter = Counter()
+        cache.set("key", ("early", 10.0, time.time() + 1))
+        cache.add("key" + LOCK_SUFFIX, "other")
+
+        self.assertEqual(get_or_compute("key", counter, timeout=60), "early")
+
+    def test_stale_while_revalidate(self):
+        counter = Counter()
+        cache.set("key", ("stale", 0.0, time.time() - 1))
+
+        with mock.patch.object(compute, "_refresher") as refresher:
+            refresher.submit.side_effect = lambda fn, *args: fn(*args)
+            self.assertEqual(
+                get_or_compute("key", counter, timeout=60, stale_timeout=60), "stale"
+            )
+
+        self.assertEqual(counter.calls, 1)
+        self.assertEqual(get_or_compute("key", counter, timeout=60), 1)
+        self.assertIsNone(cache.get("key" + LOCK_SUFFIX))
+
+    def test_no_timeout(self):
+        counter = Counter()
+
+        get_or_compute("key", counter, timeout=None)
+
+        self.assertEqual(get_or_compute("key", counter, timeout=None), 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CachedComputationTestCase(SimpleTestCase):
+    def setUp(self):
+        self.addCleanup(cache.clear)
+
+    def test_caches_by_arguments(self):
+        calls = []
+
+        @cached_computation(60)
+        def double(x):
+            calls.append(x)
+            return x * 2
+
+        self.assertEqual([double(1), double(1), double(2)], [2, 2, 4])
+        self.assertEqual(calls, [1, 2])
+
+    def test_custom_key(self):
+        @cached_computation(60, key=lambda x: "constant")
+        def identity(x):
+            return x
+
+        identity(1)
+
+        self.assertEqual(identity(2), 1)
+        self.assertEqual(cache.get("constant")[0], 1)
@@ -0,0 +1,105 @@
+from decimal import Decimal
+
+import waffle
+from django.contrib.auth.models import Group
+from django.core.cache import caches
+from django.test import RequestFactory, TestCase, override_settings
+from waffle.models import Sample, Switch
+from waffle.testutils import override_switch
+
+from testdjereo.cache.flags import _snapshots, load_snapshot
+from users.models import AuthUser
+
+Flag = waffle.get_waffle_flag_model()
+
+SNAPSHOT_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "sessions": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "waffle": {
+        "BACKEND": "testdjereo.cache.flags.WaffleSnapshotCache",
+        "OPTIONS": {"RECHECK_INTERVAL": 60},
+    },
+}
+
+
+@override_settings(CACHES=SNAPSHOT_CACHES)
+class WaffleSnapshotCacheTestCase(TestCase):
+    def setUp(self):
+        self.addCleanup(caches["default"].clear)
+        self.addCleanup(_snapshots.clear)
+        self.user = AuthUser.objects.create_user("user@example.com")
+        self.request = RequestFactory().get("/")
+        self.request.user = self.user
+
+    def test_lookups_are_served_from_one_query(self):
+        group = Group.objects.create(name="group")
+        self.user.groups.add(group)
+        Flag.objects.create(name="everyone", everyone=True)
+        Flag.objects.create(name="percent", percent=Decimal("0.0"))
+        Flag.objects.create(name="for_user").users.add(self.user)
+        Flag.objects.create(name="for_group").groups.add(group)
+        Switch.objects.create(name="a_switch", active=True)
+        Sample.objects.create(name="a_sample", percent=Decimal("100.0"))
+
+        with self.assertNumQueries(1):
+            self.assertTrue(waffle.flag_is_active(self.request, "everyone"))
+            self.assertFalse(waffle.flag_is_active(self.request, "percent"))
+            self.assertTrue(waffle.flag_is_active(self.request, "for_user"))
+            self.assertFalse(waffle.flag_is_active(self.request, "missing"))
+            self.assertTrue(waffle.switch_is_active("a_switch"))
+            self.assertTrue(waffle.sample_is_active("a_sample"))
+            self.assertEqual(len(Flag.get_all()), 4)
+        with self.assertNumQueries(1):
+            # user's groups
+            self.assertTrue(waffle.flag_is_active(self.request, "for_group"))
+
+    def test_each_request_checks_the_version(self):
+        self.client.get("/")
+        Switch.objects.create(name="a_switch", active=True)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Switch.objects.get(name="a_switch").save()
+        with self.assertNumQueries(1):
+            self.assertTrue(waffle.switch_is_active("a_switch"))
+
+        # unchanged, so loaded once by the process
+        caches["waffle"].close()
+        with self.assertNumQueries(0):
+            self.assertTrue(waffle.switch_is_active("a_switch"))
+
+    def test_testutils_invalidate(self):
+        Switch.objects.create(name="a_switch", active=False)
+        self.assertFalse(waffle.switch_is_active("a_switch"))
+
+        with override_switch("a_switch", active=True):
+            self.assertTrue(waffle.switch_is_active("a_switch"))
+        self.assertFalse(waffle.switch_is_active("a_switch"))
+
+    def test_flag_members_changes_invalidate(self):
+        flag = Flag.objects.create(name="for_user")
+        self.assertFalse(waffle.flag_is_active(self.request, "for_user"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            flag.users.add(self.user)
+
+        self.assertTrue(waffle.flag_is_active(self.request, "for_user"))
+
+
+class LoadSnapshotTestCase(TestCase):
+    def test_empty(self):
+        entries = load_snapshot()
+
+        self.assertEqual(
+            set(entries.values()), {waffle.models.CACHE_EMPTY}, "all kinds are empty"
+        )
+
+    def test_values_are_typed(self):
+        Flag.objects.create(name="percent", percent=Decimal("12.5"))
+
+        flag = load_snapshot()[Flag._cache_key("percent")]
+
+        db_flag = Flag.objects.get()
+        self.assertEqual(flag.pk, db_flag.pk)
+        self.assertEqual(flag.percent, Decimal("12.5"))
+        self.assertEqual(flag.created, db_flag.created)
+        self.assertFalse(flag._state.adding)
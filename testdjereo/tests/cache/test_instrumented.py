@@ -0,0 +1,119 @@
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from testdjereo.cache import instrumented
+from testdjereo.cache.instrumented import flush_stats, percentile, read_stats
+
+INSTRUMENTED_CACHES = {
+    "default": {
+        "BACKEND": "testdjereo.cache.instrumented.InstrumentedCache",
+        "LOCATION": "default",
+        "OPTIONS": {
+            "WRAPPED": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        },
+    },
+}
+
+
+@override_settings(CACHES=INSTRUMENTED_CACHES)
+class InstrumentedCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        self.addCleanup(cache.clear)
+        self.addCleanup(instrumented._stats.clear)
+        instrumented._stats.clear()
+
+    def stats(self, op, ns):
+        return instrumented._stats["default", op, ns]
+
+    def test_reads_count_hits_and_misses(self):
+        cache.set("users:1", None)
+
+        self.assertIsNone(cache.get("users:1", "default"))
+        self.assertEqual(cache.get("users:2", "default"), "default")
+        self.assertEqual(
+            cache.get_many(["users:1", "users:3", "pages:1"]), {"users:1": None}
+        )
+
+        get = self.stats("get", "users")
+        self.assertEqual((get.calls, get.hits, get.misses), (2, 1, 1))
+        self.assertEqual(sum(get.buckets), 2)
+        get_many = self.stats("get_many", "users")
+        self.assertEqual((get_many.calls, get_many.hits, get_many.misses), (1, 1, 1))
+        self.assertEqual(self.stats("get_many", "pages").misses, 1)
+
+    @mock.patch.object(instrumented, "SIZE_SAMPLE_EVERY", 1)
+    def test_writes_count_sizes(self):
+        cache.set("key", "x" * 100)
+        cache.set_many({"a:1": 1, "a:2": 2})
+        self.assertFalse(cache.add("key", "y"))
+
+        self.assertGreater(self.stats("set", "-").bytes, 100)
+        self.assertEqual(self.stats("set_many", "a").calls, 1)
+        self.assertEqual(self.stats("set_many", "a").sized, 2)
+        self.assertEqual(self.stats("add", "-").sized, 0)
+
+    @mock.patch.object(instrumented, "SIZE_SAMPLE_EVERY", 4)
+    def test_sizes_are_sampled(self):
+        for i in range(8):
+            cache.set("key", i)
+
+        self.assertEqual(self.stats("set", "-").calls, 8)
+        self.assertEqual(self.stats("set", "-").sized, 2)
+
+    def test_request_stats_are_logged(self):
+        log_kwargs = {}
+        instrumented.start_request_stats()
+        cache.get("key")
+        cache.set("key", 1)
+        instrumented.log_request_stats(log_kwargs=log_kwargs)
+
+        self.assertEqual(
+            {k: v for k, v in log_kwargs["cache"]["default"].items() if k != "ms"},
+            {"calls": 2, "hits": 0, "misses": 1},
+        )
+
+    def test_flush_and_read_stats(self):
+        cache.get("key")
+
+        with (
+            tempfile.TemporaryDirectory() as tmp,
+            override_settings(CACHE_STATS_DIR=tmp),
+        ):
+            flush_stats(force=True)
+            totals = read_stats(instrumented.stats_dir())
+
+        self.assertEqual(totals["default", "get", "-"].misses, 1)
+
+    def test_stats_file_named_after_pid_and_start_time(self):
+        name = instrumented.stats_file_name()
+
+        self.assertTrue(name.startswith(f"{os.getpid()}-"))
+        self.assertEqual(instrumented.stats_file_name(), name)
+        # a process reusing the pid, after the one whose start time it inherited
+        with mock.patch.object(instrumented, "_process", (0, 0)):
+            self.assertNotEqual(instrumented.stats_file_name(), name)
+
+    def test_flush_skipped_while_another_thread_flushes(self):
+        cache.get("key")
+
+        with (
+            tempfile.TemporaryDirectory() as tmp,
+            override_settings(CACHE_STATS_DIR=tmp),
+            mock.patch.object(instrumented, "_flushed_at", 0.0),
+        ):
+            with instrumented._flush_lock:
+                flush_stats()
+            self.assertEqual(list(Path(tmp).iterdir()), [])
+
+    def test_percentile(self):
+        buckets = [0] * len(instrumented.LATENCY_BUCKETS)
+        buckets[1] = 90
+        buckets[5] = 10
+
+        self.assertEqual(percentile(buckets, 0.5), instrumented.LATENCY_BUCKETS[1])
+        self.assertEqual(percentile(buckets, 0.99), instrumented.LATENCY_BUCKETS[5])
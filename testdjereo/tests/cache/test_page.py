@@ -0,0 +1,84 @@
+import json
+import re
+
+from bs4 import BeautifulSoup
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import _does_token_match
+from django.test import RequestFactory, TestCase, override_settings
+from waffle.models import Switch
+
+from testdjereo.cache.page import make_page
+from users.models import AuthUser
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "sessions": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "waffle": {"BACKEND": "testdjereo.cache.flags.WaffleSnapshotCache"},
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CacheAnonymousPageTestCase(TestCase):
+    def setUp(self):
+        self.addCleanup(cache.clear)
+
+    def get(self, **headers):
+        # a fresh client per request, ie. a new visitor without cookies
+        return self.client_class().get("/", headers=headers)
+
+    def assert_rendered(self, response, rendered=True):
+        self.assertEqual(bool(response.templates), rendered)
+
+    def test_anonymous_page_is_cached(self):
+        self.assert_rendered(self.get())
+        self.assert_rendered(self.get(), False)
+
+    def test_nonce_and_csrf_token_are_fresh(self):
+        first, second = self.get(), self.get()
+
+        nonces = [re.findall(r'nonce="([^"]+)"', r.text) for r in (first, second)]
+        self.assertEqual(len(set(nonces[0])), 1)
+        self.assertEqual(len(set(nonces[1])), 1)
+        self.assertNotEqual(nonces[0], nonces[1])
+
+        body = BeautifulSoup(second.content, features="html.parser").body
+        token = json.loads(body.attrs["hx-headers"])["X-CSRFToken"]
+        secret = second.cookies["csrftoken"].value
+        self.assertNotEqual(secret, first.cookies["csrftoken"].value)
+        self.assertTrue(_does_token_match(token, secret))
+        self.assertNotIn("\x00", second.text)
+
+    def test_keyed_on_htmx_headers(self):
+        self.get()
+
+        self.assert_rendered(self.get(HX_Request="true"))
+        self.assert_rendered(self.get(HX_Request="true"), False)
+
+    def test_waffle_changes_invalidate_pages(self):
+        self.get()
+
+        Switch.objects.create(name="a_switch", active=True)
+
+        self.assert_rendered(self.get())
+
+    def test_authenticated_page_is_not_cached(self):
+        self.get()
+        self.client.force_login(AuthUser.objects.create_user(email="sancho@panza.es"))
+
+        response = self.client.get("/")
+
+        self.assert_rendered(response)
+        self.assertContains(response, "sancho@panza.es")
+
+    def test_make_page_skips_waffle_decisions(self):
+        request = RequestFactory().get("/")
+        request.waffles = {"a_flag": [True, False]}
+
+        self.assertIsNone(make_page(request, HttpResponse("page")))
+
+    def test_make_page_skips_responses_setting_cookies(self):
+        response = HttpResponse("page")
+        response.set_cookie("a_cookie", "value")
+
+        self.assertIsNone(make_page(RequestFactory().get("/"), response))
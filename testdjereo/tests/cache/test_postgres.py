@@ -0,0 +1,153 @@
+import time
+from contextlib import contextmanager
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import ProgrammingError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from testdjereo.cache.postgres import PostgresCache
+
+POSTGRES_CACHES = {
+    "default": {
+        "BACKEND": "testdjereo.cache.postgres.PostgresCache",
+        "LOCATION": "test_cache_entries",
+    },
+}
+
+
+class PostgresCacheTestCase(TestCase):
+    def setUp(self):
+        self.cache = PostgresCache("test_cache_entries", {})
+        self.cache.create_table()
+
+    @contextmanager
+    def assertNumStatements(self, num):
+        """`assertNumQueries()`, but for the savepoints of each operation, as tests
+        run in a transaction."""
+        with CaptureQueriesContext(connection) as queries:
+            yield
+        statements = [q for q in queries if "SAVEPOINT" not in q["sql"]]
+        self.assertEqual(len(statements), num, statements)
+
+    def test_set_get(self):
+        self.cache.set("key", {"value": [1, 2]})
+
+        self.assertEqual(self.cache.get("key"), {"value": [1, 2]})
+        self.assertIsNone(self.cache.get("missing"))
+        self.assertEqual(self.cache.get("missing", "default"), "default")
+
+    def test_overwrite(self):
+        self.cache.set("key", "a")
+        self.cache.set("key", "b")
+
+        self.assertEqual(self.cache.get("key"), "b")
+
+    def test_many_in_single_queries(self):
+        with self.assertNumStatements(1):
+            self.cache.set_many({"a": 1, "b": 2, "c": 3})
+        with self.assertNumStatements(1):
+            self.assertEqual(self.cache.get_many(["a", "b", "x"]), {"a": 1, "b": 2})
+        with self.assertNumStatements(1):
+            self.cache.delete_many(["a", "b"])
+        self.assertEqual(self.cache.get_many(["a", "b", "c"]), {"c": 3})
+
+    def test_add(self):
+        self.assertTrue(self.cache.add("key", "a"))
+        self.assertFalse(self.cache.add("key", "b"))
+        self.assertEqual(self.cache.get("key"), "a")
+
+    def test_add_replaces_expired_entry(self):
+        self.cache.set("key", "a", timeout=0.001)
+        time.sleep(0.01)
+
+        self.assertTrue(self.cache.add("key", "b"))
+        self.assertEqual(self.cache.get("key"), "b")
+
+    def test_expiry(self):
+        self.cache.set("expiring", "value", timeout=0.001)
+        self.cache.set("forever", "value", timeout=None)
+        time.sleep(0.01)
+
+        self.assertIsNone(self.cache.get("expiring"))
+        self.assertFalse(self.cache.has_key("expiring"))
+        self.assertEqual(self.cache.get("forever"), "value")
+
+    def test_zero_timeout_deletes(self):
+        self.cache.set("key", "value")
+
+        self.cache.set("key", "value", timeout=0)
+
+        self.assertFalse(self.cache.has_key("key"))
+
+    def test_touch(self):
+        self.cache.set("key", "value", timeout=0.05)
+
+        self.assertTrue(self.cache.touch("key", timeout=None))
+        time.sleep(0.06)
+        self.assertEqual(self.cache.get("key"), "value")
+        self.assertFalse(self.cache.touch("missing"))
+
+    def test_incr(self):
+        self.cache.set("counter", 1)
+
+        self.assertEqual(self.cache.incr("counter"), 2)
+
+    def test_delete(self):
+        self.cache.set("key", "value")
+
+        self.assertTrue(self.cache.delete("key"))
+        self.assertFalse(self.cache.delete("key"))
+
+    def test_clear(self):
+        self.cache.set("key", "value")
+
+        self.cache.clear()
+
+        self.assertFalse(self.cache.has_key("key"))
+
+    def test_sweep(self):
+        self.cache.set("expiring", "value", timeout=0.001)
+        self.cache.set("live", "value")
+        time.sleep(0.01)
+
+        self.assertEqual(self.cache.sweep(), 1)
+        self.assertEqual(self.cache.get_many(["expiring", "live"]), {"live": "value"})
+
+    def test_sweep_runs_on_set_after_interval(self):
+        cache = PostgresCache("test_cache_entries", {"OPTIONS": {"SWEEP_INTERVAL": 0}})
+        cache.set("expiring", "value", timeout=0.001)
+        time.sleep(0.01)
+
+        with self.assertNumStatements(2):
+            cache.set("key", "value")
+
+    def test_failure_does_not_abort_transaction(self):
+        with self.assertRaises(ProgrammingError):
+            PostgresCache("missing_cache_entries", {}).get("key")
+
+        self.cache.set("key", "value")
+        self.assertEqual(self.cache.get("key"), "value")
+
+    @override_settings(CACHES=POSTGRES_CACHES)
+    def test_createcachetable(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TABLE test_cache_entries")
+
+        call_command("createcachetable", stdout=StringIO())
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT relpersistence FROM pg_class WHERE relname = %s",
+                ["test_cache_entries"],
+            )
+            self.assertEqual(cursor.fetchone(), ("u",))
+
+    @override_settings(CACHES=POSTGRES_CACHES)
+    def test_createcachetable_dry_run(self):
+        out = StringIO()
+
+        call_command("createcachetable", dry_run=True, stdout=out)
+
+        self.assertIn("CREATE UNLOGGED TABLE", out.getvalue())
@@ -0,0 +1,132 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from testdjereo.cache import rows as row_cache
+from testdjereo.tests.test_app.models import TestModelUpdatedAt
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "sessions": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RowCacheTestCase(TestCase):
+    def setUp(self):
+        self.addCleanup(cache.clear)
+        self.rows = [TestModelUpdatedAt.objects.create(name=f"row{i}") for i in range(3)]
+
+    def test_cached_get(self):
+        row = self.rows[0]
+
+        with self.assertNumQueries(1):
+            self.assertEqual(TestModelUpdatedAt.objects.cached_get(row.pk).name, "row0")
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                TestModelUpdatedAt.objects.cached_get(str(row.pk)).name, "row0"
+            )
+
+    def test_cached_get_missing(self):
+        with self.assertRaises(TestModelUpdatedAt.DoesNotExist):
+            TestModelUpdatedAt.objects.cached_get(0)
+
+    def test_cached_in_bulk_queries_misses_only(self):
+        first, second, third = self.rows
+        TestModelUpdatedAt.objects.cached_get(first.pk)
+
+        with self.assertNumQueries(1):
+            rows = TestModelUpdatedAt.objects.cached_in_bulk([first.pk, second.pk, 0])
+        self.assertEqual(set(rows), {first.pk, second.pk})
+
+        with self.assertNumQueries(1):
+            rows = TestModelUpdatedAt.objects.cached_in_bulk([r.pk for r in self.rows])
+        self.assertEqual(rows[third.pk].name, third.name)
+
+    def test_saves_write_through(self):
+        row = self.rows[0]
+        TestModelUpdatedAt.objects.cached_get(row.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            row.count = 1
+            row.save()
+
+        with self.assertNumQueries(0):
+            cached = TestModelUpdatedAt.objects.cached_get(row.pk)
+        self.assertEqual(cached.count, 1)
+        self.assertEqual(cached._state.fields_cache, {})
+
+    def test_saves_with_update_fields_drop_the_row(self):
+        row = self.rows[0]
+        TestModelUpdatedAt.objects.cached_get(row.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            row.count = 1
+            row.save(update_fields=["count"])
+
+        with self.assertNumQueries(1):
+            self.assertEqual(TestModelUpdatedAt.objects.cached_get(row.pk).count, 1)
+
+    def test_rows_loaded_before_a_write_are_not_cached(self):
+        row = self.rows[0]
+        stale = TestModelUpdatedAt.objects.get(pk=row.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            row.count = 1
+            row.save(update_fields=["count"])
+        # as if the rows loaded before the write were then cached
+        row_cache.cache_loaded_row(TestModelUpdatedAt, row.pk, None, stale)
+
+        self.assertEqual(TestModelUpdatedAt.objects.cached_get(row.pk).count, 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(TestModelUpdatedAt.objects.cached_get(row.pk).count, 1)
+
+    def test_deletes_leave_a_tombstone(self):
+        row = self.rows[0]
+        pk = row.pk
+        TestModelUpdatedAt.objects.cached_get(pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            row.delete()
+
+        with (
+            self.assertNumQueries(0),
+            self.assertRaises(TestModelUpdatedAt.DoesNotExist),
+        ):
+            TestModelUpdatedAt.objects.cached_get(pk)
+
+    def test_update_drops_rows(self):
+        TestModelUpdatedAt.objects.cached_in_bulk([r.pk for r in self.rows])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TestModelUpdatedAt.objects.filter(name__in=["row0", "row1"]).update(count=1)
+
+        rows = TestModelUpdatedAt.objects.cached_in_bulk([r.pk for r in self.rows])
+        self.assertEqual([rows[row.pk].count for row in self.rows], [1, 1, 0])
+
+    def test_bulk_update_drops_rows(self):
+        TestModelUpdatedAt.objects.cached_in_bulk([r.pk for r in self.rows])
+        for row in self.rows:
+            row.count = 1
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TestModelUpdatedAt.objects.bulk_update(self.rows, ["count"])
+
+        rows = TestModelUpdatedAt.objects.cached_in_bulk([r.pk for r in self.rows])
+        self.assertEqual({row.count for row in rows.values()}, {1})
+
+    def test_bulk_upsert_drops_rows(self):
+        TestModelUpdatedAt.objects.cached_in_bulk([r.pk for r in self.rows])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TestModelUpdatedAt.objects.bulk_upsert(
+                [TestModelUpdatedAt(name="row0", count=1)],
+                unique_fields=["name"],
+                update_fields=["count"],
+            )
+
+        row = TestModelUpdatedAt.objects.cached_get(self.rows[0].pk)
+        self.assertEqual(row.count, 1)
+
+    def test_filtered_queryset(self):
+        with self.assertRaisesMessage(TypeError, "filtered queryset"):
+            TestModelUpdatedAt.objects.filter(count=0).cached_get(self.rows[0].pk)
@@ -0,0 +1,157 @@
+import errno
+import multiprocessing
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from testdjereo.cache.shm import SharedMemoryCache
+
+
+def set_in_child(location, key, value):
+    SharedMemoryCache(location, {}).set(key, value)
+
+
+class SharedMemoryCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.location = str(Path(tmp.name) / "cache")
+        self.cache = self.make_cache()
+
+    def make_cache(self, **options):
+        return SharedMemoryCache(self.location, {"OPTIONS": options})
+
+    def test_set_get(self):
+        self.cache.set("key", {"value": [1, 2]})
+
+        self.assertEqual(self.cache.get("key"), {"value": [1, 2]})
+        self.assertIsNone(self.cache.get("missing"))
+        self.assertEqual(self.cache.get("missing", "default"), "default")
+
+    def test_overwrite(self):
+        self.cache.set("key", "a")
+        self.cache.set("key", "b")
+
+        self.assertEqual(self.cache.get("key"), "b")
+
+    def test_add(self):
+        self.assertTrue(self.cache.add("key", "a"))
+        self.assertFalse(self.cache.add("key", "b"))
+        self.assertEqual(self.cache.get("key"), "a")
+
+    def test_delete(self):
+        self.cache.set("key", "value")
+
+        self.assertTrue(self.cache.delete("key"))
+        self.assertFalse(self.cache.delete("key"))
+        self.assertFalse(self.cache.has_key("key"))
+
+    def test_expiry(self):
+        self.cache.set("expiring", "value", timeout=0.01)
+        self.cache.set("forever", "value", timeout=None)
+        time.sleep(0.02)
+
+        self.assertIsNone(self.cache.get("expiring"))
+        self.assertEqual(self.cache.get("forever"), "value")
+
+    def test_touch(self):
+        self.cache.set("key", "value", timeout=0.01)
+
+        self.assertTrue(self.cache.touch("key", timeout=None))
+        time.sleep(0.02)
+        self.assertEqual(self.cache.get("key"), "value")
+        self.assertFalse(self.cache.touch("missing"))
+
+    def test_incr(self):
+        self.cache.set("counter", 1)
+
+        self.assertEqual(self.cache.incr("counter"), 2)
+        self.assertEqual(self.cache.decr("counter", 5), -3)
+        with self.assertRaises(ValueError):
+            self.cache.incr("missing")
+
+    def test_many(self):
+        self.cache.set_many({"a": 1, "b": 2})
+
+        self.assertEqual(self.cache.get_many(["a", "b", "c"]), {"a": 1, "b": 2})
+
+    def test_clear(self):
+        self.cache.set("key", "value")
+
+        self.cache.clear()
+
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_value_too_large_for_slot_is_not_cached(self):
+        cache = self.make_cache(SLOT_SIZE=256)
+        cache.set("key", "small")
+
+        with self.assertLogs("testdjereo.cache.shm", "WARNING") as logs:
+            cache.set("key", "x" * 256)
+
+        self.assertIsNone(cache.get("key"))
+        self.assertIn("byte slots", logs.output[0])
+
+    def test_refuses_symlink(self):
+        target = Path(self.location).with_name("target")
+        target.touch(0o600)
+        cache = self.make_cache()
+        Path(cache._path).symlink_to(target)
+
+        with self.assertRaises(OSError):
+            cache.get("key")
+
+    def test_refuses_file_writable_by_others(self):
+        cache = self.make_cache()
+        Path(cache._path).touch(0o666)
+        Path(cache._path).chmod(0o666)
+
+        with self.assertRaisesMessage(PermissionError, "Refusing to use"):
+            cache.get("key")
+
+    def test_file_is_allocated(self):
+        cache = self.make_cache(MAX_ENTRIES=64, SLOT_SIZE=1024)
+        cache.get("key")
+
+        st = os.stat(cache._path)
+        self.assertGreaterEqual(st.st_blocks * 512, 64 * 1024)
+
+    def test_fails_when_filesystem_is_full(self):
+        no_space = OSError(errno.ENOSPC, os.strerror(errno.ENOSPC))
+
+        with (
+            mock.patch("testdjereo.cache.shm.os.posix_fallocate", side_effect=no_space),
+            self.assertRaises(OSError) as context,
+        ):
+            self.cache.get("key")
+        self.assertEqual(context.exception.errno, errno.ENOSPC)
+
+    def test_evicts_least_recently_used_entry(self):
+        # a single set of two slots
+        cache = self.make_cache(MAX_ENTRIES=2, WAYS=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get_many(["a", "b", "c"]), {"a": 1, "c": 3})
+
+    def test_shared_between_cache_instances(self):
+        self.cache.set("key", "value")
+
+        self.assertEqual(self.make_cache().get("key"), "value")
+
+    def test_shared_between_processes(self):
+        process = multiprocessing.get_context("fork").Process(
+            target=set_in_child, args=(self.location, "key", "from child")
+        )
+        process.start()
+        process.join()
+
+        self.assertEqual(process.exitcode, 0)
+        self.assertEqual(self.cache.get("key"), "from child")
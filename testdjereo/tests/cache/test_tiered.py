@@ -0,0 +1,161 @@
+import time
+
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from testdjereo.cache.tiered import stop_listeners
+
+
+def tiered_caches(**options):
+    return {
+        "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+        "tiered": {
+            "BACKEND": "testdjereo.cache.tiered.TieredCache",
+            "LOCATION": "test",
+            "OPTIONS": {"L2": "l2", **options},
+        },
+        "l2": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+
+
+@override_settings(CACHES=tiered_caches())
+class TieredCacheTestCase(TestCase):
+    def setUp(self):
+        self.addCleanup(stop_listeners)
+        self.addCleanup(caches["l2"].clear)
+        self.cache = caches["tiered"]
+        self.l2 = caches["l2"]
+
+    def test_get_from_l1(self):
+        self.cache.set("key", "value")
+        self.l2.clear()
+
+        self.assertEqual(self.cache.get("key"), "value")
+
+    def test_get_from_l2(self):
+        self.l2.set("key", "value")
+
+        self.assertEqual(self.cache.get("key"), "value")
+        self.l2.clear()
+        self.assertEqual(self.cache.get("key"), "value")
+
+    def test_get_many(self):
+        self.cache.set("a", 1)
+        self.l2.set("b", 2)
+
+        self.assertEqual(self.cache.get_many(["a", "b", "c"]), {"a": 1, "b": 2})
+
+    @override_settings(CACHES=tiered_caches(L1_TIMEOUT=0.01))
+    def test_l1_entries_expire(self):
+        cache = caches["tiered"]
+        cache.set("key", "value")
+        self.l2.set("key", "changed")
+        time.sleep(0.02)
+
+        self.assertEqual(cache.get("key"), "changed")
+
+    @override_settings(CACHES=tiered_caches(MAX_ENTRIES=2))
+    def test_l1_evicts_least_recently_used_entry(self):
+        cache = caches["tiered"]
+        cache.set_many({"a": 1, "b": 2})
+        cache.get("a")
+        cache.set("c", 3)
+        self.l2.clear()
+
+        self.assertEqual(cache.get_many(["a", "b", "c"]), {"a": 1, "c": 3})
+
+    def test_add(self):
+        self.assertTrue(self.cache.add("key", "a"))
+        self.assertFalse(self.cache.add("key", "b"))
+        self.assertEqual(self.cache.get("key"), "a")
+
+    def test_delete(self):
+        self.cache.set("key", "value")
+
+        self.assertTrue(self.cache.delete("key"))
+        self.assertIsNone(self.cache.get("key"))
+        self.assertFalse(self.cache.has_key("key"))
+
+    def test_incr(self):
+        self.cache.set("counter", 1)
+        self.cache.get("counter")
+
+        self.assertEqual(self.cache.incr("counter"), 2)
+        self.assertEqual(self.cache.get("counter"), 2)
+
+    def test_clear(self):
+        self.cache.set("key", "value")
+
+        self.cache.clear()
+
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_stats(self):
+        self.cache.set("key", "value")
+        self.l2.set("l2-only", "value")
+
+        self.cache.get("key")
+        self.cache.get("l2-only")
+        self.cache.get("missing")
+
+        self.assertEqual(
+            self.cache.stats(),
+            {"l1_hits": 1, "l1_misses": 2, "l2_hits": 1, "l2_misses": 1},
+        )
+
+    def test_writes_send_one_notification_query(self):
+        with self.assertNumQueries(1):
+            self.cache.set_many({"a": 1, "b": 2})
+
+
+@override_settings(CACHES=tiered_caches())
+class TieredCacheInvalidationTestCase(TransactionTestCase):
+    def setUp(self):
+        self.addCleanup(stop_listeners)
+        self.addCleanup(caches["l2"].clear)
+        self.cache = caches["tiered"]
+
+    def notify(self, payload):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify('cache_test', %s)", [payload])
+
+    def wait_until(self, predicate):
+        deadline = time.monotonic() + 5
+        while not predicate() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return predicate()
+
+    def test_notifications_from_other_processes_evict_l1(self):
+        self.cache.get("warm-up")
+        l1 = self.cache._l1
+        self.assertTrue(l1.listener.listening.wait(5))
+        self.cache.set_many({"a": 1, "b": 2})
+
+        self.notify(f"other:{self.cache.make_key('a')}")
+
+        self.assertTrue(self.wait_until(lambda: l1.get(self.cache.make_key("a")) is None))
+        self.assertIsNotNone(l1.get(self.cache.make_key("b")))
+
+    def test_clear_notification(self):
+        self.cache.get("warm-up")
+        l1 = self.cache._l1
+        self.assertTrue(l1.listener.listening.wait(5))
+        self.cache.set("key", "value")
+
+        self.notify("other:*")
+
+        self.assertTrue(self.wait_until(lambda: not l1.entries))
+
+    def test_own_notifications_are_ignored(self):
+        self.cache.get("warm-up")
+        l1 = self.cache._l1
+        self.assertTrue(l1.listener.listening.wait(5))
+        l1.set("sentinel", b"", 60)
+
+        self.cache.set("key", "value")
+        # notifications are handled in order, so this one is handled last
+        self.notify("other:sentinel")
+
+        self.assertTrue(self.wait_until(lambda: l1.get("sentinel") is None))
+        self.assertIsNotNone(l1.get(self.cache.make_key("key")))
@@ -0,0 +1,25 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+import testdjereo.management.commands.benchmark_cache  # noqa: F401 - for coverage
+
+
+class BenchmarkCacheTests(SimpleTestCase):
+    def test_success(self):
+        out = StringIO()
+        call_command(
+            "benchmark_cache",
+            workers=[1, 2],
+            ops=200,
+            keys=50,
+            max_entries=64,
+            stdout=out,
+        )
+        output = out.getvalue()
+
+        self.assertIn("Running 200 gets per worker over 50 keys...", output)
+        for line in ["locmem x1: ", "locmem x2: ", "shm x1: ", "shm x2: "]:
+            self.assertIn(line, output)
+        self.assertIn("Done.", output)
@@ -0,0 +1,19 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+import testdjereo.management.commands.benchmark_logging  # noqa: F401 - for coverage
+
+
+class BenchmarkLoggingTests(SimpleTestCase):
+    def test_success(self):
+        out = StringIO()
+        call_command("benchmark_logging", records=20, write_delay=0.1, stdout=out)
+        output = out.getvalue()
+
+        self.assertIn("Logging 20 records to a stream taking 0.1 ms per write...", output)
+        self.assertIn("stream: ", output)
+        self.assertIn("queue: ", output)
+        self.assertIn(", 0 dropped, drained in ", output)
+        self.assertIn("Done.", output)
@@ -0,0 +1,31 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+import testdjereo.management.commands.benchmark_sessions  # noqa: F401 - for coverage
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "sessions": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BenchmarkSessionsTests(TestCase):
+    def test_success(self):
+        out = StringIO()
+        call_command("benchmark_sessions", requests=5, stdout=out)
+        output = out.getvalue()
+
+        self.assertIn("Running 5 requests per session engine...", output)
+        self.assertIn(
+            "db: 1.00 queries per page view, 4.00 queries per unchanged session write",
+            output,
+        )
+        self.assertIn(
+            "testdjereo: 0.00 queries per page view, "
+            + "0.00 queries per unchanged session write",
+            output,
+        )
+        self.assertIn("Done.", output)
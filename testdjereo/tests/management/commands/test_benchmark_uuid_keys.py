@@ -0,0 +1,18 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+import testdjereo.management.commands.benchmark_uuid_keys  # noqa: F401 - for coverage
+
+
+class BenchmarkUuidKeysTests(TestCase):
+    def test_success(self):
+        out = StringIO()
+        call_command("benchmark_uuid_keys", rows=500, batch_size=200, stdout=out)
+        output = out.getvalue()
+
+        self.assertIn("Inserting 500 rows per key version...", output)
+        self.assertIn("v4: ", output)
+        self.assertIn("v7: ", output)
+        self.assertIn("Done.", output)
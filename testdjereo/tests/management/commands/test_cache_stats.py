@@ -0,0 +1,69 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+
+from testdjereo.cache.instrumented import LATENCY_BUCKETS
+
+
+class CacheStatsTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        settings = override_settings(CACHE_STATS_DIR=tmp.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def write_stats(self, pid, calls, hits):
+        buckets = [0] * len(LATENCY_BUCKETS)
+        buckets[0] = calls
+        row = {
+            "cache": "default",
+            "op": "get",
+            "namespace": "users",
+            "calls": calls,
+            "hits": hits,
+            "misses": calls - hits,
+            "bytes": 0,
+            "buckets": buckets,
+        }
+        (self.dir / f"{pid}.json").write_text(json.dumps([row]))
+
+    def test_sums_processes(self):
+        self.write_stats(1, calls=10, hits=9)
+        self.write_stats(2, calls=10, hits=7)
+        out = StringIO()
+
+        call_command("cache_stats", json=True, stdout=out)
+
+        row = json.loads(out.getvalue())
+        self.assertEqual(row["calls"], 20)
+        self.assertEqual(row["hit_ratio"], 0.8)
+        self.assertEqual(row["p99_ms"], LATENCY_BUCKETS[0])
+
+    def test_table(self):
+        self.write_stats(1, calls=4, hits=3)
+        out = StringIO()
+
+        call_command("cache_stats", stdout=out)
+
+        self.assertIn("75.0%", out.getvalue().splitlines()[1])
+
+    def test_reset(self):
+        self.write_stats(1, calls=1, hits=1)
+
+        call_command("cache_stats", reset=True, stdout=StringIO())
+
+        self.assertFalse(self.dir.exists())
+        out = StringIO()
+        call_command("cache_stats", stdout=out)
+        self.assertIn("No cache stats yet.", out.getvalue())
+
+    @override_settings(CACHE_STATS_DIR=None)
+    def test_not_configured(self):
+        with self.assertRaisesMessage(CommandError, "CACHE_STATS_DIR is not set."):
+            call_command("cache_stats")
@@ -0,0 +1,46 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils.timezone import now
+
+import testdjereo.management.commands.manage_partitions  # noqa: F401 - for coverage
+from testdjereo.partitioning import (
+    create_monthly_partition,
+    list_partitions,
+    month_start,
+    partition_name,
+)
+from testdjereo.tests.test_app.models import TestModelPartitioned
+
+
+class ManagePartitionsTests(TestCase):
+    def call_command(self, *args, **kwargs):
+        out = StringIO()
+        call_command("manage_partitions", *args, stdout=out, **kwargs)
+        return out.getvalue()
+
+    def test_creates_upcoming_and_detaches_expired_partitions(self):
+        expired = partition_name(TestModelPartitioned, month_start(now(), -3))
+        upcoming = partition_name(TestModelPartitioned, month_start(now(), 2))
+        create_monthly_partition(TestModelPartitioned, month_start(now(), -3))
+
+        out = self.call_command()
+
+        self.assertIn(f"created {upcoming}", out)
+        self.assertIn(f"detached {expired}", out)
+        self.assertIn("Done.", out)
+        partitions = list_partitions(TestModelPartitioned)
+        self.assertIn(upcoming, partitions)
+        self.assertNotIn(expired, partitions)
+        self.assertIn(expired, connection.introspection.table_names())
+
+    def test_drop(self):
+        expired = partition_name(TestModelPartitioned, month_start(now(), -3))
+        create_monthly_partition(TestModelPartitioned, month_start(now(), -3))
+
+        out = self.call_command("--drop")
+
+        self.assertIn(f"dropped {expired}", out)
+        self.assertNotIn(expired, connection.introspection.table_names())
@@ -0,0 +1,46 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils.timezone import now
+
+import testdjereo.management.commands.purge_soft_deleted  # noqa: F401 - for coverage
+from testdjereo.tests.test_app.models import TestModelDeletedAt
+
+
+class PurgeSoftDeletedTests(TestCase):
+    def call_command(self, *args, **kwargs):
+        out = StringIO()
+        call_command("purge_soft_deleted", *args, stdout=out, **kwargs)
+        return out.getvalue()
+
+    def test_success(self):
+        for i in range(3):
+            TestModelDeletedAt.objects.create(name=f"expired-{i}")
+        TestModelDeletedAt.objects.update(deleted_at=now() - timedelta(days=8))
+
+        out = self.call_command(
+            "test_app.TestModelDeletedAt",
+            "--retention-days=7",
+            "--batch-size=2",
+            "--no-archive",
+        )
+
+        self.assertIn("Purging test_app.TestModelDeletedAt...", out)
+        self.assertIn("Batch 2: 3 rows", out)
+        self.assertIn("Purged 3 rows in 2 batches", out)
+        self.assertFalse(TestModelDeletedAt.all_objects.exists())
+
+    def test_error_not_a_deleted_at_model(self):
+        with self.assertRaisesMessage(
+            CommandError, "test_app.TestModelCreatedAt is not a DeletedAtModel."
+        ):
+            self.call_command(
+                "test_app.TestModelCreatedAt", "--retention-days=7", "--no-archive"
+            )
+
+    def test_error_unknown_model(self):
+        with self.assertRaises(CommandError):
+            self.call_command("test_app.Missing", "--retention-days=7", "--no-archive")
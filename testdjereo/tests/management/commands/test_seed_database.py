@@ -1,5 +1,6 @@
 from io import StringIO
 
+from allauth.account.models import EmailAddress
 from django.apps import apps
 from django.contrib.auth import get_user_model
 from django.core.management import call_command
@@ -7,6 +8,7 @@ from django.core.management.base import CommandError
 from django.test import TestCase
 
 import testdjereo.management.commands.seed_database  # noqa: F401 - needed for coverage
+from users.models import UserProfile
 
 
 class SeedDatabaseTests(TestCase):
@@ -57,3 +59,35 @@ class SeedDatabaseTests(TestCase):
                             model.objects.exists(),
                             f"{model_path} is not populated by seed_database",
                         )
+
+    def test_synthetic_users(self):
+        out, _ = self.call_command("--users=5", "--batch-size=2", "--seed=42")
+
+        self.assertIn("4/5 users", out)
+        self.assertIn("5/5 users", out)
+        User = get_user_model()
+        self.assertEqual(User.objects.count(), 3 + 5)
+        self.assertEqual(UserProfile.objects.count(), 3 + 5)
+        self.assertEqual(EmailAddress.objects.filter(verified=True).count(), 3 + 5)
+        synthetic = User.objects.exclude(username__in=["admin", "staff", "user"])
+        self.assertTrue(all(u.id.version == 7 for u in synthetic))
+        self.assertEqual(
+            list(synthetic.order_by("id").values_list("email", flat=True)),
+            list(synthetic.order_by("date_joined").values_list("email", flat=True)),
+        )
+        self.assertTrue(synthetic[0].check_password("password"))
+
+    def test_synthetic_users_are_deterministic(self):
+        def seeded_users(seed):
+            self.call_command("--users=3", f"--seed={seed}")
+            users = list(
+                get_user_model()
+                .objects.exclude(username__in=["admin", "staff", "user"])
+                .order_by("id")
+                .values_list("id", "email", "date_joined", "last_login", "is_active")
+            )
+            get_user_model().objects.all().delete()
+            return users
+
+        self.assertEqual(seeded_users(1), seeded_users(1))
+        self.assertNotEqual(seeded_users(1), seeded_users(2))
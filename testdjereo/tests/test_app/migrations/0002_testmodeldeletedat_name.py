@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("test_app", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="testmodeldeletedat",
+            name="name",
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="testmodeldeletedat",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["name"],
+                name="test_deleted_at_live_name_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="testmodeldeletedat",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=("name",),
+                name="test_deleted_at_live_name_uniq",
+            ),
+        ),
+    ]
@@ -0,0 +1,45 @@
+import uuid
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+import testdjereo.partitioning
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("test_app", "0002_testmodeldeletedat_name"),
+    ]
+
+    operations = [
+        testdjereo.partitioning.CreatePartitionedModel(
+            name="TestModelPartitioned",
+            fields=[
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "pk",
+                    models.CompositePrimaryKey(
+                        "id",
+                        "created_at",
+                        blank=True,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("id", models.UUIDField(default=uuid.uuid7, editable=False)),
+            ],
+            options={
+                "indexes": [
+                    django.contrib.postgres.indexes.BrinIndex(
+                        autosummarize=True,
+                        fields=["created_at"],
+                        name="test_partitioned_created_brin",
+                    )
+                ],
+            },
+        ),
+        testdjereo.partitioning.CreateMonthlyPartitions(
+            model_name="TestModelPartitioned", before=1, after=1
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("test_app", "0003_testmodelpartitioned"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="testmodelupdatedat",
+            name="count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="testmodelupdatedat",
+            name="name",
+            field=models.CharField(blank=True, max_length=50, null=True, unique=True),
+        ),
+    ]
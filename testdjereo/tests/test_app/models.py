@@ -1,4 +1,15 @@
-from testdjereo.models import CreatedAtModel, DeletedAtModel, UpdatedAtModel
+import uuid
+
+from django.db import models
+
+from testdjereo.models import (
+    CreatedAtModel,
+    DeletedAtModel,
+    UpdatedAtModel,
+    created_at_brin_index,
+    live_index,
+    live_unique_constraint,
+)
 
 
 class TestModelCreatedAt(CreatedAtModel):
@@ -7,10 +18,34 @@ class TestModelCreatedAt(CreatedAtModel):
 
 
 class TestModelUpdatedAt(UpdatedAtModel):
+    name = models.CharField(max_length=50, blank=True, null=True, unique=True)
+    count = models.IntegerField(default=0)
+
+    ROW_CACHE_TIMEOUT = 60 * 60
+
     class Meta:
         app_label = "test_app"
 
 
 class TestModelDeletedAt(DeletedAtModel):
+    name = models.CharField(max_length=50, blank=True, null=True)
+
     class Meta:
         app_label = "test_app"
+        indexes = [live_index("name", name="test_deleted_at_live_name_idx")]
+        constraints = [
+            live_unique_constraint("name", name="test_deleted_at_live_name_uniq")
+        ]
+
+
+class TestModelPartitioned(CreatedAtModel):
+    pk = models.CompositePrimaryKey("id", "created_at")
+    id = models.UUIDField(default=uuid.uuid7, editable=False)
+
+    class Meta:
+        app_label = "test_app"
+        indexes = [created_at_brin_index("test_partitioned_created_brin")]
+
+    class PartitioningMeta:
+        premake = 2
+        retention = 1
@@ -0,0 +1,80 @@
+import json
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.db import connection
+from django.test import TestCase
+from django.utils.timezone import now
+
+from testdjereo.archival import NdjsonArchive, TableArchive, purge_soft_deleted
+from testdjereo.tests.test_app.models import TestModelDeletedAt
+
+
+class PurgeSoftDeletedTestCase(TestCase):
+    def setUp(self):
+        self.live = TestModelDeletedAt.objects.create(name="live")
+        self.recent = TestModelDeletedAt.objects.create(name="recent")
+        self.recent.soft_delete()
+        for i in range(5):
+            TestModelDeletedAt.objects.create(name=f"expired-{i}")
+        TestModelDeletedAt.objects.filter(name__startswith="expired-").update(
+            deleted_at=now() - timedelta(days=40)
+        )
+
+    def test_purges_only_rows_past_retention_in_batches(self):
+        batches = []
+
+        result = purge_soft_deleted(
+            TestModelDeletedAt,
+            retention=timedelta(days=30),
+            batch_size=2,
+            on_batch=lambda r: batches.append(r.rows),
+        )
+
+        self.assertEqual(result.rows, 5)
+        self.assertEqual(result.batches, 3)
+        self.assertEqual(batches, [2, 4, 5])
+        self.assertQuerySetEqual(
+            TestModelDeletedAt.all_objects.order_by("name"), [self.live, self.recent]
+        )
+
+    def test_max_batches_allows_resuming(self):
+        first = purge_soft_deleted(
+            TestModelDeletedAt, retention=timedelta(days=30), batch_size=2, max_batches=1
+        )
+        second = purge_soft_deleted(
+            TestModelDeletedAt, retention=timedelta(days=30), batch_size=2
+        )
+
+        self.assertEqual(first.rows, 2)
+        self.assertEqual(second.rows, 3)
+        self.assertEqual(TestModelDeletedAt.all_objects.count(), 2)
+
+    def test_table_archive(self):
+        purge_soft_deleted(
+            TestModelDeletedAt,
+            retention=timedelta(days=30),
+            archive=TableArchive("test_deleted_at_archive"),
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM test_deleted_at_archive ORDER BY name")
+            names = [row[0] for row in cursor.fetchall()]
+        self.assertEqual(names, [f"expired-{i}" for i in range(5)])
+
+    def test_ndjson_archive(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "archive.ndjson"
+            purge_soft_deleted(
+                TestModelDeletedAt,
+                retention=timedelta(days=30),
+                batch_size=3,
+                archive=NdjsonArchive(path),
+            )
+            rows = [json.loads(line) for line in path.read_text().splitlines()]
+
+        self.assertEqual(
+            sorted(row["name"] for row in rows), [f"expired-{i}" for i in range(5)]
+        )
+        self.assertIsNotNone(rows[0]["deleted_at"])
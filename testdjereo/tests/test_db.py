@@ -0,0 +1,51 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.utils.timezone import now
+
+from testdjereo.db import copy_objects, install_query_timer, query_executed, time_query
+from testdjereo.tests.test_app.models import TestModelDeletedAt, TestModelUpdatedAt
+
+
+class CopyObjectsTestCase(TestCase):
+    def test_copy_objects(self):
+        objs = [TestModelUpdatedAt(name=f"copied-{i}", count=i) for i in range(3)]
+
+        copy_objects(objs)
+
+        rows = TestModelUpdatedAt.objects.order_by("name")
+        self.assertEqual(
+            [(o.name, o.count) for o in rows], [(o.name, o.count) for o in objs]
+        )
+        self.assertAlmostEqual(rows[0].updated_at, now(), delta=timedelta(seconds=1))
+
+    def test_copy_objects_with_nulls(self):
+        copy_objects([TestModelDeletedAt(name=None)])
+
+        self.assertEqual(TestModelDeletedAt.objects.get().name, None)
+
+    def test_copy_no_objects(self):
+        copy_objects([])
+
+        self.assertFalse(TestModelUpdatedAt.objects.exists())
+
+
+class QueryTimerTestCase(TestCase):
+    def test_single_wrapper_sends_query_executed(self):
+        # the test database connection was created before the receiver ran
+        install_query_timer(connection)
+        install_query_timer(connection)
+        executed = []
+
+        def receiver(sql, elapsed, **kwargs):
+            executed.append((sql, elapsed))
+
+        query_executed.connect(receiver)
+        self.addCleanup(query_executed.disconnect, receiver)
+        TestModelUpdatedAt.objects.exists()
+
+        self.assertEqual(connection.execute_wrappers, [time_query])
+        ((sql, elapsed),) = executed
+        self.assertIn("test_app_testmodelupdatedat", sql)
+        self.assertGreater(elapsed, 0)
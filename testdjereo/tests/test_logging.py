@@ -1,14 +1,24 @@
+import io
 import json
 import logging
+import queue
 from logging.config import dictConfig
+from unittest import mock
 
 from django.test import Client, SimpleTestCase, override_settings
 from parameterized import parameterized
 
+from testdjereo import metrics
 from testdjereo.logging import (
+    DuplicateFilter,
     FirstArgOnlyFilter,
+    FlushingQueueListener,
+    KeepImportantFilter,
     LoggingConfigFactory,
+    NonBlockingQueueHandler,
+    RateLimitFilter,
     SafeHttpFormatter,
+    SamplingFilter,
 )
 
 
@@ -48,6 +58,113 @@ class FirstArgOnlyFilterTest(SimpleTestCase):
         self.assertIsNone(self.record.args)
 
 
+def make_event_record(event, name="django_structlog", level=logging.INFO, **fields):
+    record = make_logging_record("", name=name, levelno=level)
+    record.msg = {"event": event, **fields}
+    return record
+
+
+class KeepImportantFilterTest(SimpleTestCase):
+    def test_is_abstract(self):
+        with self.assertRaises(TypeError):
+            KeepImportantFilter()
+
+    @mock.patch.object(metrics.LOG_RECORDS_DROPPED, "inc")
+    def test_dropped_records_are_counted(self, inc):
+        SamplingFilter(rates={"": 0}).filter(make_logging_record("msg"))
+        SamplingFilter(rates={"": 1}).filter(make_logging_record("msg"))
+
+        inc.assert_called_once_with(reason="sampled")
+
+
+class SamplingFilterTest(SimpleTestCase):
+    def test_rates_by_logger_and_event(self):
+        log_filter = SamplingFilter(
+            rates={"django_structlog": 1, "django_structlog:request_started": 0}
+        )
+        started = make_event_record("request_started", name="django_structlog.mw")
+        finished = make_event_record("request_finished", name="django_structlog.mw")
+
+        self.assertFalse(log_filter.filter(started))
+        self.assertTrue(log_filter.filter(finished))
+        self.assertTrue(log_filter.filter(make_logging_record("other")))
+
+    @mock.patch("testdjereo.logging.random.random", return_value=0.05)
+    def test_sampled_records_get_the_rate(self, _):
+        log_filter = SamplingFilter(rates={"django_structlog": 0.1})
+        record = make_event_record("request_finished")
+
+        self.assertTrue(log_filter.filter(record))
+        self.assertEqual(record.msg["sample_rate"], 0.1)
+
+    def test_errors_and_slow_requests_are_kept(self):
+        log_filter = SamplingFilter(rates={"": 0}, slow_request_ms=500)
+
+        self.assertTrue(log_filter.filter(make_event_record("x", level=logging.ERROR)))
+        self.assertTrue(log_filter.filter(make_event_record("x", duration_ms=500)))
+        self.assertFalse(log_filter.filter(make_event_record("x", duration_ms=499)))
+
+
+class RateLimitFilterTest(SimpleTestCase):
+    def test_token_bucket(self):
+        log_filter = RateLimitFilter(limits={"test_logger": (1, 2)})
+
+        with mock.patch("testdjereo.logging.time.monotonic", return_value=100):
+            kept = [log_filter.filter(make_logging_record("msg")) for _ in range(4)]
+        self.assertEqual(kept, [True, True, False, False])
+
+        record = make_logging_record("msg")
+        with mock.patch("testdjereo.logging.time.monotonic", return_value=101):
+            self.assertTrue(log_filter.filter(record))
+            self.assertFalse(log_filter.filter(make_logging_record("msg")))
+        self.assertEqual(record.getMessage(), "msg (2 rate limited)")
+
+
+class DuplicateFilterTest(SimpleTestCase):
+    def make_record(self, flag):
+        return make_logging_record(
+            "Flag %s not found", name="waffle", levelno=logging.WARNING, args=(flag,)
+        )
+
+    def test_repeats_are_suppressed_within_the_window(self):
+        log_filter = DuplicateFilter(windows={"waffle": 60})
+
+        with mock.patch("testdjereo.logging.time.monotonic", return_value=100):
+            self.assertTrue(log_filter.filter(self.make_record("a")))
+            self.assertFalse(log_filter.filter(self.make_record("a")))
+            self.assertFalse(log_filter.filter(self.make_record("a")))
+            self.assertTrue(log_filter.filter(self.make_record("b")))
+
+        record = self.make_record("a")
+        with mock.patch("testdjereo.logging.time.monotonic", return_value=160):
+            self.assertTrue(log_filter.filter(record))
+        self.assertEqual(
+            record.getMessage(), "Flag a not found (2 identical messages suppressed)"
+        )
+
+    def test_structlog_events(self):
+        log_filter = DuplicateFilter(windows={"django_structlog": 60})
+        first = make_event_record("cache_miss", request_id="1")
+
+        self.assertTrue(log_filter.filter(first))
+        self.assertFalse(
+            log_filter.filter(make_event_record("cache_miss", request_id="2"))
+        )
+
+    def test_other_loggers_are_kept(self):
+        log_filter = DuplicateFilter(windows={"waffle": 60})
+
+        self.assertTrue(log_filter.filter(make_logging_record("msg")))
+        self.assertTrue(log_filter.filter(make_logging_record("msg")))
+
+    def test_forgets_messages_when_full(self):
+        log_filter = DuplicateFilter(windows={"waffle": 60}, max_messages=2)
+        for flag in ["a", "b", "c"]:
+            log_filter.filter(self.make_record(flag))
+
+        self.assertTrue(log_filter.filter(self.make_record("a")))
+
+
 class SafeHttpFormatterTest(SimpleTestCase):
     def setUp(self):
         self.formatter = SafeHttpFormatter("%(levelname)s %(status_code)s %(message)s")
@@ -74,7 +191,7 @@ class LoggingConfigFactoryTest(SimpleTestCase):
         factory = LoggingConfigFactory(debug=debug_value)
         config = factory.build()
 
-        self.assertEqual(len(config["filters"]), 3)
+        self.assertEqual(len(config["filters"]), 6)
         self.assertEqual(len(config["formatters"]), 3)
         self.assertEqual(len(config["handlers"]), 4)
         self.assertEqual(config["loggers"]["django"]["handlers"], expected_handlers[0])
@@ -87,6 +204,85 @@ class LoggingConfigFactoryTest(SimpleTestCase):
         self.assertEqual(all({v["propagate"] for v in config["loggers"].values()}), False)
         self.assertEqual(config["root"]["handlers"], expected_handlers[3])
 
+    def test_volume_filters(self):
+        config = LoggingConfigFactory(sample_rates={"django_structlog": 0.5}).build()
+
+        self.assertEqual(
+            config["handlers"]["console_prod"]["filters"],
+            ["require_debug_false", "dedupe", "sample", "rate_limit"],
+        )
+        self.assertEqual(config["filters"]["sample"]["rates"], {"django_structlog": 0.5})
+        self.assertEqual(
+            config["filters"]["dedupe"]["windows"],
+            {"waffle": 3600, "testdjereo.cache.shm": 3600},
+        )
+
+        config = LoggingConfigFactory(queue=True).build()
+        self.assertEqual(
+            config["handlers"]["console_prod_queue"]["filters"],
+            ["dedupe", "sample", "rate_limit"],
+        )
+        self.assertEqual(
+            config["handlers"]["console_prod"]["filters"], ["require_debug_false"]
+        )
+
+
+class NonBlockingQueueHandlerTest(SimpleTestCase):
+    def make_handler(self, policy="drop", maxsize=0):
+        self.stream = io.StringIO()
+        target = logging.StreamHandler(self.stream)
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize), policy=policy)
+        handler.listener = FlushingQueueListener(handler.queue, target)
+        self.addCleanup(handler.close)
+        return handler
+
+    def test_records_are_written_by_the_listener(self):
+        handler = self.make_handler()
+        record = make_logging_record("hello %s", args=("world",))
+
+        handler.handle(record)
+        handler.close()
+
+        self.assertEqual(self.stream.getvalue(), "hello world\n")
+
+    def test_drop_policy_counts_dropped_records(self):
+        handler = self.make_handler(maxsize=1)
+        handler.listener.start()
+        handler.listener.stop()  # no thread taking records off the queue
+        handler._listener_pid = -1  # not started again in this process
+
+        with mock.patch.object(metrics.LOG_RECORDS_DROPPED, "inc") as inc:
+            for msg in ["first", "second", "third"]:
+                handler.handle(make_logging_record(msg))
+
+        self.assertEqual(handler.dropped, 2)
+        self.assertEqual(inc.call_args_list, [mock.call(reason="queue_full")] * 2)
+        self.assertEqual(handler.queue.get_nowait().msg, "first")
+
+    def test_unknown_policy(self):
+        with self.assertRaisesMessage(ValueError, "Unknown queue policy 'wait'"):
+            NonBlockingQueueHandler(queue.Queue(), policy="wait")
+
+    def test_dict_config(self):
+        config = LoggingConfigFactory(queue=True, queue_size=5, queue_policy="block")
+        config = config.build()
+        self.assertEqual(config["root"]["handlers"], ["console_prod_queue"])
+        self.addCleanup(dictConfig, LoggingConfigFactory().build())
+
+        dictConfig(config)
+
+        handler = logging.getLogger().handlers[0]
+        self.assertIsInstance(handler, NonBlockingQueueHandler)
+        self.assertEqual(handler.policy, "block")
+        self.assertEqual(handler.queue.maxsize, 5)
+        self.assertIsInstance(handler.listener, FlushingQueueListener)
+        self.assertEqual(handler.listener.handlers[0].name, "console_prod")
+
+    def test_no_queue_in_dev_mode(self):
+        config = LoggingConfigFactory(debug=True, queue=True).build()
+
+        self.assertNotIn("console_prod_queue", config["handlers"])
+
 
 class LogsFormatTest(SimpleTestCase):
     """Test logs format based on DEBUG mode in Django runserver."""
@@ -111,20 +307,28 @@ class LogsFormatTest(SimpleTestCase):
             log_dict: dict = json.loads(json_part)
 
             expected_keys = {
+                "cache",
                 "code",
+                "db_ms",
+                "db_queries",
+                "duration_ms",
                 "event",
                 "ip",
                 "level",
                 "logger",
+                "middleware_ms",
                 "request",
                 "request_id",
+                "template_ms",
                 "timestamp",
                 "user_id",
+                "view",
             }
             expected_values = {
                 "event": "request_finished",
                 "logger": "django_structlog.middlewares.request",
                 "request": "GET /",
+                "view": "index",
             }
             self.assertEqual(
                 set(log_dict.keys()),
@@ -133,6 +337,9 @@ class LogsFormatTest(SimpleTestCase):
             )
             for k in expected_values.keys():
                 self.assertEqual(log_dict[k], expected_values[k], f"{k} should match")
+            self.assertEqual(
+                set(log_dict["cache"]["default"]), {"calls", "hits", "misses", "ms"}
+            )
 
     def test_logs_format_debug_true(self):
         config = LoggingConfigFactory(debug=True).build()
@@ -0,0 +1,170 @@
+import os
+import tempfile
+from pathlib import Path
+
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from testdjereo import db, metrics
+from testdjereo.metrics import WORKER_BUSY, WORKER_IN_PROGRESS, _File, _key
+from users.models import AuthUser
+
+# not a running process, pids are at most 2**22 on Linux
+EXITED_PID = 2**22 + 1
+
+
+class MetricsTestCase(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = Path(tmp.name)
+        settings_override = override_settings(
+            METRICS_DIR=tmp.name, METRICS_TOKEN="s3cret"
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(metrics._files.clear)
+
+    def scrape(self):
+        response = self.client.get(
+            "/-/metrics", headers={"Authorization": "Bearer s3cret"}
+        )
+        self.assertEqual(response["Content-Type"], metrics.CONTENT_TYPE)
+        return response.content.decode().splitlines()
+
+    def test_requests(self):
+        self.client.get("/")
+        self.client.get("/missing/")
+
+        lines = self.scrape()
+
+        self.assertIn(
+            'http_request_duration_seconds_count{method="GET",status="200",'
+            + 'view="index"} 1',
+            lines,
+        )
+        self.assertIn(
+            'http_request_duration_seconds_bucket{le="+Inf",method="GET",status="404",'
+            + 'view="<unresolved>"} 1',
+            lines,
+        )
+        # the scrape itself
+        self.assertIn("worker_requests_in_progress 1", lines)
+        self.assertIn("workers 1", lines)
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = metrics.DB_QUERY_DURATION
+        histogram.observe(0.0001, database="test")
+        histogram.observe(0.003, database="test")
+        histogram.observe(60, database="test")
+
+        lines = self.scrape()
+
+        self.assertIn(
+            'db_query_duration_seconds_bucket{database="test",le="0.0005"} 1', lines
+        )
+        self.assertIn(
+            'db_query_duration_seconds_bucket{database="test",le="0.005"} 2', lines
+        )
+        self.assertIn(
+            'db_query_duration_seconds_bucket{database="test",le="+Inf"} 3', lines
+        )
+        self.assertIn('db_query_duration_seconds_count{database="test"} 3', lines)
+
+    def test_queries(self):
+        # the test database connection was created before the receiver ran
+        db.install_query_timer(connection)
+        AuthUser.objects.count()
+
+        self.assertIn(
+            'db_query_duration_seconds_count{database="default"} 1', self.scrape()
+        )
+
+    def test_exited_processes_keep_counters_only(self):
+        exited = _File(self.directory / f"{EXITED_PID}.db")
+        exited.add(_key(WORKER_BUSY.name, "", {}), 2.5)
+        exited.add(_key(WORKER_IN_PROGRESS.name, "", {}), 1)
+
+        lines = self.scrape()
+
+        self.assertTrue(
+            any(line.startswith("worker_busy_seconds_total 2.5") for line in lines)
+        )
+        self.assertIn("worker_requests_in_progress 1", lines)
+        self.assertIn("workers 1", lines)
+
+    def test_reopened_file_keeps_totals_but_not_gauges(self):
+        path = self.directory / f"{EXITED_PID}.db"
+        busy = _key(WORKER_BUSY.name, "", {})
+        in_progress = _key(WORKER_IN_PROGRESS.name, "", {})
+        exited = _File(path)
+        exited.add(busy, 1)
+        exited.add(in_progress, 1)
+
+        reopened = _File(path)
+        reopened.add(busy, 2)
+
+        values = {
+            key: metrics.VALUE.unpack_from(reopened.map, offset)[0]
+            for key, offset in metrics._entries(reopened.map, reopened.used)
+        }
+        self.assertEqual(values, {busy: 3, in_progress: 0})
+
+    def test_mark_process_dead(self):
+        for pid in (EXITED_PID, EXITED_PID + 1):
+            exited = _File(self.directory / f"{pid}.db")
+            exited.add(_key(WORKER_BUSY.name, "", {}), 2.5)
+            exited.add(_key(WORKER_IN_PROGRESS.name, "", {}), 1)
+            exited.close()
+            metrics.mark_process_dead(pid, self.directory)
+        metrics.mark_process_dead(EXITED_PID, self.directory)
+
+        lines = self.scrape()
+
+        self.assertEqual(
+            {path.name for path in self.directory.iterdir()},
+            {"exited.db", f"{os.getpid()}.db"},
+        )
+        self.assertTrue(
+            any(line.startswith("worker_busy_seconds_total 5") for line in lines)
+        )
+        self.assertIn("worker_requests_in_progress 1", lines)
+        self.assertIn("workers 1", lines)
+
+    def test_clear(self):
+        for pid in (EXITED_PID, metrics.EXITED):
+            _File(self.directory / f"{pid}.db").close()
+        (self.directory / "other.txt").touch()
+
+        metrics.clear(self.directory)
+
+        self.assertEqual({path.name for path in self.directory.iterdir()}, {"other.txt"})
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_not_found_without_token(self):
+        self.assertEqual(self.client.get("/-/metrics").status_code, 404)
+
+    def test_forbidden_with_wrong_token(self):
+        response = self.client.get(
+            "/-/metrics", headers={"Authorization": "Bearer wrong"}
+        )
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_file_grows(self):
+        file = _File(self.directory / f"{EXITED_PID}.db")
+        for i in range(5000):
+            file.add(f"key-{i:040}", i)
+
+        self.assertGreater(file.size, metrics.INITIAL_SIZE)
+        self.assertEqual(len(list(metrics._entries(file.map, file.used))), 5000)
+
+    def test_label_values_are_escaped(self):
+        self.assertEqual(metrics._labels({"view": 'a"b\\c\n'}), '{view="a\\"b\\\\c\\n"}')
+
+    @override_settings(METRICS_DIR=None)
+    def test_disabled(self):
+        WORKER_BUSY.inc()
+
+        self.assertIn("workers 0", self.scrape())
+        self.assertEqual(list(self.directory.iterdir()), [])
@@ -1,8 +1,10 @@
 from datetime import timedelta
 
+from django.db import IntegrityError
 from django.test import TestCase
 from django.utils.timezone import now
 
+from testdjereo.models import rows_updated
 from testdjereo.tests.test_app.models import (
     TestModelCreatedAt,
     TestModelDeletedAt,
@@ -22,6 +24,16 @@ class ModelTestCase(TestCase):
         obj.save()
         self.assertGreater(obj.updated_at, initial_updated_at)
 
+    def test_updated_at_field_on_save_with_update_fields(self):
+        obj = TestModelUpdatedAt.objects.create()
+        initial_updated_at = obj.updated_at
+        obj.count = 1
+        obj.save(update_fields=["count"])
+
+        obj.refresh_from_db()
+        self.assertEqual(obj.count, 1)
+        self.assertGreater(obj.updated_at, initial_updated_at)
+
     def test_deleted_at_model_soft_delete(self):
         obj = TestModelDeletedAt.objects.create()
         self.assertIsNone(obj.deleted_at)
@@ -35,3 +47,100 @@ class ModelTestCase(TestCase):
         obj.soft_delete()
         obj.restore()
         self.assertIsNone(obj.deleted_at)
+
+
+class DeletedAtManagerTestCase(TestCase):
+    def setUp(self):
+        self.live = TestModelDeletedAt.objects.create(name="live")
+        self.dead = TestModelDeletedAt.objects.create(name="dead")
+        self.dead.soft_delete()
+
+    def test_default_manager_hides_soft_deleted_rows(self):
+        self.assertQuerySetEqual(TestModelDeletedAt.objects.all(), [self.live])
+
+    def test_all_objects_includes_soft_deleted_rows(self):
+        self.assertQuerySetEqual(
+            TestModelDeletedAt.all_objects.order_by("name"), [self.dead, self.live]
+        )
+
+    def test_queryset_soft_delete_issues_one_update(self):
+        TestModelDeletedAt.objects.create(name="other")
+
+        with self.assertNumQueries(1):
+            count = TestModelDeletedAt.objects.soft_delete()
+
+        self.assertEqual(count, 2)
+        self.assertFalse(TestModelDeletedAt.objects.exists())
+        self.assertEqual(TestModelDeletedAt.all_objects.deleted().count(), 3)
+
+    def test_queryset_restore_issues_one_update(self):
+        with self.assertNumQueries(1):
+            count = TestModelDeletedAt.all_objects.restore()
+
+        self.assertEqual(count, 1)
+        self.assertEqual(TestModelDeletedAt.objects.count(), 2)
+
+    def test_live_unique_constraint_ignores_soft_deleted_rows(self):
+        TestModelDeletedAt.objects.create(name="dead")
+
+        with self.assertRaises(IntegrityError):
+            TestModelDeletedAt.objects.create(name="live")
+
+
+class UpdatedAtQuerySetTestCase(TestCase):
+    def setUp(self):
+        self.obj = TestModelUpdatedAt.objects.create(name="a")
+        self.stale = now() - timedelta(days=1)
+        TestModelUpdatedAt.objects.filter(pk=self.obj.pk).update(updated_at=self.stale)
+
+    def test_update_stamps_updated_at(self):
+        with self.assertNumQueries(1):
+            TestModelUpdatedAt.objects.filter(pk=self.obj.pk).update(count=1)
+
+        self.obj.refresh_from_db()
+        self.assertEqual(self.obj.count, 1)
+        self.assertAlmostEqual(self.obj.updated_at, now(), delta=timedelta(seconds=1))
+
+    def test_bulk_update_stamps_updated_at(self):
+        other = TestModelUpdatedAt.objects.create(name="b")
+        self.obj.count, other.count = 1, 2
+
+        with self.assertNumQueries(1):
+            TestModelUpdatedAt.objects.bulk_update([self.obj, other], ["count"])
+
+        for obj in (self.obj, other):
+            obj.refresh_from_db()
+            self.assertAlmostEqual(obj.updated_at, now(), delta=timedelta(seconds=1))
+        self.assertEqual([self.obj.count, other.count], [1, 2])
+
+    def test_bulk_upsert_stamps_updated_at(self):
+        with self.assertNumQueries(1):
+            TestModelUpdatedAt.objects.bulk_upsert(
+                [
+                    TestModelUpdatedAt(name="a", count=5),
+                    TestModelUpdatedAt(name="b", count=6),
+                ],
+                unique_fields=["name"],
+                update_fields=["count"],
+            )
+
+        self.assertEqual(TestModelUpdatedAt.objects.count(), 2)
+        self.obj.refresh_from_db()
+        self.assertEqual(self.obj.count, 5)
+        self.assertAlmostEqual(self.obj.updated_at, now(), delta=timedelta(seconds=1))
+
+    def test_update_sends_updated_at_of_rows(self):
+        sent = []
+
+        def receiver(sender, rows, **kwargs):
+            sent.append(rows)
+
+        rows_updated.connect(receiver, sender=TestModelUpdatedAt)
+        self.addCleanup(rows_updated.disconnect, receiver, sender=TestModelUpdatedAt)
+        TestModelUpdatedAt.objects.create(name="b")
+
+        with self.assertNumQueries(1):
+            TestModelUpdatedAt.objects.filter(name="a").update(count=1)
+
+        self.obj.refresh_from_db()
+        self.assertEqual(sent, [{self.obj.pk: self.obj.updated_at}])
@@ -0,0 +1,84 @@
+import datetime as dt
+
+from django.test import SimpleTestCase, TestCase
+from django.utils.timezone import now
+
+from testdjereo.partitioning import (
+    create_monthly_partition,
+    detach_partition,
+    expired_partitions,
+    get_partitioned_models,
+    list_partitions,
+    month_start,
+    partition_name,
+)
+from testdjereo.tests.test_app.models import TestModelPartitioned
+
+
+class MonthStartTest(SimpleTestCase):
+    def test_month_start(self):
+        self.assertEqual(month_start(dt.date(2026, 10, 17)), dt.date(2026, 10, 1))
+        self.assertEqual(month_start(dt.date(2026, 10, 17), 3), dt.date(2027, 1, 1))
+        self.assertEqual(month_start(dt.date(2026, 1, 31), -1), dt.date(2025, 12, 1))
+
+    def test_partition_name(self):
+        self.assertEqual(
+            partition_name(TestModelPartitioned, dt.date(2026, 1, 1)),
+            "test_app_testmodelpartitioned_p202601",
+        )
+
+    def test_get_partitioned_models(self):
+        self.assertEqual(get_partitioned_models(), [TestModelPartitioned])
+
+
+class PartitioningTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # not only those of the migration, which may be older with `--keepdb`
+        for months in (-1, 0, 1):
+            create_monthly_partition(TestModelPartitioned, month_start(now(), months))
+
+    def test_list_partitions(self):
+        partitions = list_partitions(TestModelPartitioned)
+
+        for months in (-1, 0, 1):
+            name = partition_name(TestModelPartitioned, month_start(now(), months))
+            self.assertIn(name, partitions)
+        self.assertEqual(partitions, sorted(partitions))
+
+    def test_recent_data_query_prunes_to_one_partition(self):
+        obj = TestModelPartitioned.objects.create()
+        start = month_start(now())
+        recent = TestModelPartitioned.objects.filter(
+            created_at__gte=start, created_at__lt=month_start(start, 1)
+        )
+
+        plan = recent.explain()
+
+        self.assertEqual(list(recent), [obj])
+        self.assertIn(partition_name(TestModelPartitioned, start), plan)
+        self.assertNotIn(
+            partition_name(TestModelPartitioned, month_start(start, -1)), plan
+        )
+        self.assertNotIn(
+            partition_name(TestModelPartitioned, month_start(start, 1)), plan
+        )
+
+    def test_create_monthly_partition_is_idempotent(self):
+        start = month_start(now(), 6)
+
+        self.assertTrue(create_monthly_partition(TestModelPartitioned, start))
+        self.assertFalse(create_monthly_partition(TestModelPartitioned, start))
+
+    def test_expired_and_detach_partitions(self):
+        old = month_start(now(), -3)
+        create_monthly_partition(TestModelPartitioned, old)
+        name = partition_name(TestModelPartitioned, old)
+
+        self.assertIn(name, expired_partitions(TestModelPartitioned, 1))
+        self.assertNotIn(
+            partition_name(TestModelPartitioned, month_start(now(), -1)),
+            expired_partitions(TestModelPartitioned, 1),
+        )
+        detach_partition(TestModelPartitioned, name)
+        self.assertNotIn(name, list_partitions(TestModelPartitioned))
@@ -0,0 +1,66 @@
+from django.db import connection
+from django.template import engines
+from django.test import TestCase, override_settings
+
+from testdjereo import db, request_logs
+from users.models import AuthUser
+
+
+class RequestPerfTestCase(TestCase):
+    def setUp(self):
+        self.log_kwargs = {}
+        self.addCleanup(request_logs._perf.set, None)
+
+    def finish(self, request):
+        request_logs.bind_request_duration(request=request, log_kwargs=self.log_kwargs)
+
+    def test_queries_are_counted(self):
+        request_logs.start_request_perf()
+        # the test database connection was created before the receiver ran
+        db.install_query_timer(connection)
+        AuthUser.objects.count()
+        AuthUser.objects.exists()
+        perf = request_logs._perf.get()
+
+        self.assertEqual(perf.db_queries, 2)
+        self.assertGreater(perf.db_ms, 0)
+
+    def test_outermost_render_is_timed(self):
+        engine = engines.all()[0]
+        template = engine.from_string("{{ inner.render }}")
+        inner = engine.from_string("inner")
+        request_logs.start_request_perf()
+
+        self.assertEqual(template.render({"inner": inner}), "inner")
+        perf = request_logs._perf.get()
+        self.assertGreater(perf.template_ms, 0)
+        self.assertFalse(perf.rendering)
+
+    def test_middleware_request_phases(self):
+        perf = request_logs.RequestPerf()
+        perf.marks = [("First", 1.0), ("Second", 1.5), (None, 2.0)]
+
+        self.assertEqual(perf.middleware_ms(3.0), {"First": 500.0, "Second": 500.0})
+
+    def test_short_circuiting_middleware_is_timed_until_the_log(self):
+        perf = request_logs.RequestPerf()
+        perf.marks = [("First", 1.0), ("Redirect", 1.5)]
+
+        self.assertEqual(perf.middleware_ms(2.0), {"First": 500.0, "Redirect": 500.0})
+
+    def test_request_summary(self):
+        response = self.client.get("/")
+        request = response.wsgi_request
+        self.finish(request)
+
+        self.assertEqual(self.log_kwargs["view"], "index")
+        self.assertIn("RequestMiddleware", self.log_kwargs["middleware_ms"])
+        self.assertIn("SessionMiddleware", self.log_kwargs["middleware_ms"])
+        self.assertGreater(self.log_kwargs["template_ms"], 0)
+
+    @override_settings(REQUEST_PERF_SAMPLE_RATE=0.0)
+    def test_not_sampled(self):
+        response = self.client.get("/")
+        self.finish(response.wsgi_request)
+
+        self.assertEqual(set(self.log_kwargs), {"duration_ms", "view"})
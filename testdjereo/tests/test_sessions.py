@@ -0,0 +1,72 @@
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from testdjereo.sessions import SessionStore
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+    "sessions": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SessionStoreTestCase(TestCase):
+    def setUp(self):
+        self.addCleanup(caches["sessions"].clear)
+        session = SessionStore()
+        session["answer"] = 42
+        session.save()
+        self.session_key = session.session_key
+
+    def test_load_from_cache(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(SessionStore(self.session_key)["answer"], 42)
+
+    def test_load_from_database_on_cache_miss(self):
+        caches["sessions"].clear()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(SessionStore(self.session_key)["answer"], 42)
+        with self.assertNumQueries(0):
+            self.assertEqual(SessionStore(self.session_key)["answer"], 42)
+
+    def test_unchanged_session_is_not_saved(self):
+        session = SessionStore(self.session_key)
+        session["answer"] = 42
+
+        with self.assertNumQueries(0):
+            session.save()
+
+    def test_changed_session_is_saved(self):
+        session = SessionStore(self.session_key)
+        session["answer"] = 43
+        session.save()
+
+        stored = Session.objects.get(session_key=self.session_key)
+        self.assertEqual(stored.get_decoded(), {"answer": 43})
+        self.assertEqual(SessionStore(self.session_key)["answer"], 43)
+
+    @override_settings(SESSION_EXPIRY_UPDATE_THRESHOLD=0)
+    def test_unchanged_session_is_saved_to_extend_expiry(self):
+        expire_date = Session.objects.get(session_key=self.session_key).expire_date
+        session = SessionStore(self.session_key)
+        session["answer"] = 42
+        session.save()
+
+        stored = Session.objects.get(session_key=self.session_key)
+        self.assertGreater(stored.expire_date, expire_date)
+
+    def test_delete(self):
+        SessionStore(self.session_key).delete()
+
+        self.assertEqual(SessionStore(self.session_key).load(), {})
+        self.assertFalse(Session.objects.exists())
+
+    async def test_async(self):
+        session = SessionStore(self.session_key)
+        self.assertEqual(await session.aget("answer"), 42)
+        await session.aset("answer", 43)
+        await session.asave()
+
+        self.assertEqual(await SessionStore(self.session_key).aget("answer"), 43)
@@ -0,0 +1,112 @@
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from testdjereo import db, slow_queries
+from testdjereo.slow_queries import normalize, plan_shape
+from users.models import AuthUser
+
+
+class NormalizeTest(SimpleTestCase):
+    def test_literals_and_placeholders(self):
+        self.assertEqual(
+            normalize("SELECT *\n  FROM t WHERE a = 'it''s' AND b = 1.5 AND c = %s"),
+            "SELECT * FROM t WHERE a = ? AND b = ? AND c = ?",
+        )
+
+    def test_lists_and_rows(self):
+        self.assertEqual(
+            normalize('SELECT "t1"."id" FROM "t1" WHERE "id" IN (%s, %s, %s)'),
+            'SELECT "t1"."id" FROM "t1" WHERE "id" IN (...)',
+        )
+        self.assertEqual(
+            normalize("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s), (%s, %s)"),
+            "INSERT INTO t (a, b) VALUES (...), ...",
+        )
+
+    def test_plan_shape_ignores_costs(self):
+        plan = {
+            "Node Type": "Seq Scan",
+            "Relation Name": "t",
+            "Total Cost": 12.5,
+            "Plans": [{"Node Type": "Hash", "Plan Rows": 10}],
+        }
+
+        self.assertEqual(
+            plan_shape(plan),
+            {
+                "Node Type": "Seq Scan",
+                "Relation Name": "t",
+                "Plans": [{"Node Type": "Hash", "Plans": []}],
+            },
+        )
+
+
+# the explaining thread's connection only sees committed rows & tables
+class SlowQueryLogTest(TransactionTestCase):
+    def setUp(self):
+        # in setUp, so the database is flushed after the cleanups, with the default
+        settings_override = override_settings(SLOW_QUERY_MS=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # the test database connection was created before the receiver ran
+        db.install_query_timer(connection)
+        self.addCleanup(slow_queries._plans.clear)
+        self.addCleanup(slow_queries._queue.join)
+
+    def events(self, logs, event, fingerprint=None):
+        """The `event`s logged, of the users query or of `fingerprint`."""
+        return [
+            r.msg
+            for r in logs.records
+            if r.msg["event"] == event
+            and (
+                r.msg["fingerprint"] == fingerprint
+                if fingerprint
+                else "users_authuser" in r.msg.get("sql", "")
+            )
+        ]
+
+    def test_slow_queries_are_logged_and_explained(self):
+        with self.assertLogs("testdjereo.slow_queries", "WARNING") as logs:
+            AuthUser.objects.filter(email="user@example.com").exists()
+            slow_queries._queue.join()
+
+        (query,) = self.events(logs, "slow_query")
+        self.assertIn('WHERE "users_authuser"."email" = ?', query["sql"])
+        self.assertRegex(query["call_site"], r"^testdjereo/tests/test_slow_queries.py:")
+        (plan,) = self.events(logs, "slow_query_plan", query["fingerprint"])
+        self.assertEqual(plan["fingerprint"], query["fingerprint"])
+        self.assertEqual(plan["plan"]["Node Type"], "Limit")
+        self.assertEqual(plan["plan"]["Plans"][0]["Relation Name"], "users_authuser")
+        self.assertIn("Total Cost", plan["plan"])
+
+    def test_parameters_are_not_logged(self):
+        email = "secret-8f3a@example.com"
+        with self.assertLogs("testdjereo.slow_queries", "WARNING") as logs:
+            # `Filter` & `Index Cond` of the plan hold the parameter
+            AuthUser.objects.filter(email=email).exists()
+            AuthUser.objects.filter(first_name=email).exists()
+            slow_queries._queue.join()
+
+        self.assertTrue(any(r.msg["event"] == "slow_query_plan" for r in logs.records))
+        for record in logs.records:
+            self.assertNotIn("secret-8f3a", str(record.msg))
+
+    def test_plans_are_deduplicated(self):
+        sql = "SELECT 1 FROM users_authuser WHERE email = %s"
+        with self.assertLogs("testdjereo.slow_queries", "WARNING") as logs:
+            slow_queries.explain("query", "default", sql, ["a@example.com"])
+            slow_queries.explain("query", "default", sql, ["b@example.com"])
+
+        self.assertEqual(len(self.events(logs, "slow_query_plan", "query")), 1)
+
+    def test_explained_once_per_interval(self):
+        with self.assertLogs("testdjereo.slow_queries", "WARNING") as logs:
+            for _ in range(3):
+                AuthUser.objects.filter(email="user@example.com").exists()
+            slow_queries._queue.join()
+
+        queries = self.events(logs, "slow_query")
+        self.assertEqual(len(queries), 3)
+        fingerprint = queries[0]["fingerprint"]
+        self.assertEqual(len(self.events(logs, "slow_query_plan", fingerprint)), 1)
@@ -23,6 +23,7 @@ from testdjereo import views as testdjereo_views
 
 urlpatterns = [
     path("-/", include("django_alive.urls")),
+    path("-/metrics", testdjereo_views.metrics, name="metrics"),
     path("admin/", admin.site.urls),
     path("accounts/", include("allauth.urls")),
     path("", testdjereo_views.index, name="index"),
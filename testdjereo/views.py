@@ -1,5 +1,23 @@
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
 
+from testdjereo.cache.page import cache_anonymous_page
+from testdjereo.metrics import CONTENT_TYPE, render_metrics
 
+
+@cache_anonymous_page(60 * 5)
 def index(request):
     return render(request, "index.html")
+
+
+def metrics(request):
+    token = settings.METRICS_TOKEN
+    if not token:
+        raise Http404
+    authorization = request.headers.get("Authorization", "")
+    if not constant_time_compare(authorization, f"Bearer {token}"):
+        raise PermissionDenied
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
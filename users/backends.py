@@ -0,0 +1,20 @@
+from allauth.account.auth_backends import AuthenticationBackend
+from django.contrib.auth.backends import ModelBackend
+
+from users import cache
+
+
+class CachedUserMixin:
+    """Load the user of each request from `users.cache` rather than the database."""
+
+    def get_user(self, user_id):
+        user = cache.get_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+
+class CachedModelBackend(CachedUserMixin, ModelBackend):
+    pass
+
+
+class CachedAuthenticationBackend(CachedUserMixin, AuthenticationBackend):
+    pass
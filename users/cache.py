@@ -0,0 +1,175 @@
+"""Cross-request cache of authenticated users, read by the `users.backends` backends.
+
+Each user is cached with their profile under a key holding their id and version, the
+latest of their & their profile's `updated_at`, so saving either moves them to a new
+key. A second key per user points at the current version; the signal receivers below
+move it on when a user or profile changes, including through `update()` &
+`bulk_update()`, after the transaction commits, and set a tombstone when a user is
+deleted. It is never deleted, so a user read before a change is not cached as
+current: its version is not.
+
+Only the users' fields are cached, not model instances, and not their password: its
+session hash is cached in its place, see `AuthUser.get_session_auth_hash()`. The
+cache must be shared by every process serving requests, see `check_user_cache()`, or
+the others would keep serving a user changed by one of them.
+"""
+
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from testdjereo.models import rows_updated
+from users.models import AuthUser, UserProfile
+
+USER_CACHE_TIMEOUT = 60 * 60
+# the version of deleted users
+DELETED = "deleted"
+
+
+def version_key(user_id) -> str:
+    return f"users:user:{user_id}:version"
+
+
+def user_key(user_id, version) -> str:
+    return f"users:user:{user_id}:{version}"
+
+
+def version(updated_at) -> int:
+    return int(updated_at.timestamp() * 1_000_000)
+
+
+def user_version(user) -> int:
+    profile = AuthUser.userprofile.related.get_cached_value(user, None)
+    if profile is None:
+        return version(user.updated_at)
+    return version(max(user.updated_at, profile.updated_at))
+
+
+def cached_attnames(model):
+    return [f.attname for f in model._meta.concrete_fields if f.attname != "password"]
+
+
+def to_cache(user):
+    """The fields of `user` & their profile, & their session hash."""
+    profile = AuthUser.userprofile.related.get_cached_value(user, None)
+    return (
+        [getattr(user, attname) for attname in cached_attnames(AuthUser)],
+        None
+        if profile is None
+        else [getattr(profile, attname) for attname in cached_attnames(UserProfile)],
+        user.get_session_auth_hash(),
+    )
+
+
+def from_cache(entry, using):
+    """The user of an entry of `to_cache()`, with their password deferred."""
+    user_values, profile_values, session_auth_hash = entry
+    user = AuthUser.from_db(using, cached_attnames(AuthUser), user_values)
+    user._session_auth_hash = session_auth_hash
+    if profile_values is not None:
+        user.userprofile = UserProfile.from_db(
+            using, cached_attnames(UserProfile), profile_values
+        )
+    return user
+
+
+def get_user(user_id):
+    """The `AuthUser` with `user_id` and their profile, or None if there is none."""
+    queryset = AuthUser.objects.select_related("userprofile")
+    current = cache.get(version_key(user_id))
+    if current == DELETED:
+        return None
+    if current is not None:
+        entry = cache.get(user_key(user_id, current))
+        if entry is not None:
+            return from_cache(entry, queryset.db)
+
+    user = queryset.filter(pk=user_id).first()
+    if user is None:
+        return None
+    loaded = user_version(user)
+    # `add()` rather than `set()`, so a version set by a concurrent write wins
+    if current is None and cache.add(version_key(user_id), loaded, USER_CACHE_TIMEOUT):
+        current = loaded
+    if current == loaded:
+        cache.set(user_key(user_id, current), to_cache(user), USER_CACHE_TIMEOUT)
+    return user
+
+
+def set_version(user_id, current):
+    cache.set(version_key(user_id), current, USER_CACHE_TIMEOUT)
+
+
+def set_versions(versions):
+    cache.set_many(
+        {version_key(user_id): current for user_id, current in versions.items()},
+        USER_CACHE_TIMEOUT,
+    )
+
+
+@receiver(post_save, sender=AuthUser)
+def update_cached_user_version(sender, instance, **kwargs):
+    # every save stamps `updated_at`, see `UpdatedAtModel.save()`
+    callback = partial(set_version, instance.pk, version(instance.updated_at))
+    transaction.on_commit(callback, using=kwargs["using"])
+
+
+@receiver(rows_updated, sender=AuthUser)
+def update_cached_user_versions(sender, rows, using, **kwargs):
+    versions = {pk: version(updated_at) for pk, updated_at in rows.items()}
+    transaction.on_commit(partial(set_versions, versions), using=using)
+
+
+@receiver(post_delete, sender=AuthUser)
+def delete_cached_user(sender, instance, **kwargs):
+    callback = partial(set_version, instance.pk, DELETED)
+    transaction.on_commit(callback, using=kwargs["using"])
+
+
+@receiver(post_save, sender=UserProfile)
+def update_profile_user_version(sender, instance, **kwargs):
+    callback = partial(set_version, instance.user_id, version(instance.updated_at))
+    transaction.on_commit(callback, using=kwargs["using"])
+
+
+@receiver(post_delete, sender=UserProfile)
+def update_profileless_user_version(sender, instance, **kwargs):
+    # a version no load matches, so the user is not cached until it expires, rather
+    # than risk caching them with the deleted profile
+    callback = partial(set_version, instance.user_id, version(timezone.now()))
+    transaction.on_commit(callback, using=kwargs["using"])
+
+
+def check_user_cache(**kwargs):
+    """Error when the cached authentication backends are used with a cache private to
+    each process, eg. `LocMemCache`, which only the process saving a user would
+    invalidate."""
+    from users.backends import CachedUserMixin
+
+    cached_backends = [
+        path
+        for path in settings.AUTHENTICATION_BACKENDS
+        if issubclass(import_string(path), CachedUserMixin)
+    ]
+    # unwrap `testdjereo.cache.instrumented.InstrumentedCache`
+    backend = getattr(caches["default"], "wrapped", caches["default"])
+    if not cached_backends or not isinstance(backend, LocMemCache):
+        return []
+    return [
+        Error(
+            "The cached authentication backends need a cache shared by every process.",
+            hint=(
+                f"Use a shared cache as the 'default' cache, or other backends than "
+                f"{', '.join(cached_backends)}."
+            ),
+            id="users.E001",
+        )
+    ]
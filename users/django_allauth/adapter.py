@@ -18,8 +18,8 @@ class CustomAccountAdapter(DefaultAccountAdapter):
     def clean_email(self, email):
         """Intercept attempts to sign up with an existing email and send a reminder."""
         email = super().clean_email(email)
-        existing = EmailAddress.objects.filter(email__iexact=email, verified=True).first()
-        if existing:
+        # allauth stores addresses lowercased, so this exact lookup can use its indexes
+        if EmailAddress.objects.is_verified(email):
             self.send_account_already_exists_mail(email)
             # Raise a ValidationError to stop normal signup, but use generic message
             # (default is "A user is already registered with this email address.")
@@ -25,9 +25,38 @@ class AuthUserFactory(DjangoModelFactory):
         with disable_authuser_postsave_signal():
             return super()._create(model_class, *args, **kwargs)
 
+    @classmethod
+    def bulk_create_batch(cls, size, **kwargs):
+        """Like `create_batch()`, but saves the users with a single `bulk_create()`.
+
+        The users are the same as `create_batch()` would create, without profiles.
+        """
+        users = cls.build_batch(size, **kwargs)
+        with disable_authuser_postsave_signal():
+            cls._bulk_create(users)
+        return users
+
+    @classmethod
+    def _bulk_create(cls, users):
+        manager = cls._get_manager(cls._meta.model)
+        manager.bulk_create(users, provision_profiles=False)
+
 
 class UserProfileFactory(DjangoModelFactory):
     class Meta:
         model = UserProfile
 
     user = SubFactory(AuthUserFactory)
+
+    @classmethod
+    def bulk_create_batch(cls, size, **kwargs):
+        """Like `create_batch()`, but saves the profiles and their new users with one
+        `bulk_create()` per model."""
+        profiles = cls.build_batch(size, **kwargs)
+        with disable_authuser_postsave_signal():
+            # users passed in rather than built by the subfactory are already saved
+            AuthUserFactory._bulk_create(
+                [profile.user for profile in profiles if profile.user._state.adding]
+            )
+            cls._get_manager(cls._meta.model).bulk_create(profiles)
+        return profiles
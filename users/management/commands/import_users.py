@@ -0,0 +1,144 @@
+import csv
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from allauth.account.models import EmailAddress
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models.functions import Upper
+
+from testdjereo.db import copy_objects
+from users.models import AuthUser, UserProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Import users from a CSV or NDJSON file with 'email' and optional 'password', "
+        + "'first_name' and 'last_name' fields. Users are loaded in chunks with COPY, "
+        + "skipping signals, and passwords are hashed across a process pool. Users "
+        + "whose email already exists are skipped, so a failed import can be re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path)
+        parser.add_argument("--format", choices=["csv", "ndjson"])
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Password hashing processes. Use 0 to hash in this process.",
+        )
+        parser.add_argument(
+            "--skip",
+            type=int,
+            default=0,
+            help="Number of records to skip, eg. to resume after a failed chunk.",
+        )
+        parser.add_argument(
+            "--verified",
+            action="store_true",
+            help="Mark the imported email addresses as verified.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or ("csv" if path.suffix == ".csv" else "ndjson")
+        records = itertools.islice(read_records(path, fmt), options["skip"], None)
+        chunks = itertools.batched(records, options["chunk_size"], strict=False)
+        pool = ProcessPoolExecutor(options["workers"]) if options["workers"] else None
+        # hand passwords to the pool in batches to keep inter-process overhead low
+        hash_passwords = partial(pool.map, chunksize=64) if pool else map
+
+        self.stdout.write(f"Importing users from {path}...")
+        imported = 0
+        offset = options["skip"]
+        start = time.perf_counter()
+        try:
+            for chunk in chunks:
+                try:
+                    count = import_chunk(chunk, hash_passwords, options["verified"])
+                except Exception as e:
+                    raise CommandError(
+                        f"Failed to import records {offset}-{offset + len(chunk) - 1}: "
+                        + f"{e}. Earlier records were imported; re-run with "
+                        + f"--skip={offset} to resume."
+                    ) from e
+                imported += count
+                rate = imported / (time.perf_counter() - start)
+                self.stdout.write(
+                    f"Records {offset}-{offset + len(chunk) - 1}: {count} imported "
+                    f"({rate:,.0f} users/s)"
+                )
+                offset += len(chunk)
+        finally:
+            if pool:
+                pool.shutdown()
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {imported:,} users in {elapsed:,.1f}s "
+                f"({imported / elapsed if elapsed else 0:,.0f} users/s)."
+            )
+        )
+
+
+def read_records(path, fmt):
+    with open(path, newline="") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def import_chunk(records, hash_passwords, verified):
+    """Import the users in `records` whose email is not taken, in one transaction.
+
+    Return the number of users imported.
+    """
+    by_email = {}
+    for record in records:
+        email = AuthUser.objects.normalize_email(record["email"].strip()).lower()
+        by_email.setdefault(email, record)
+    # case-insensitively, like `filter_by_email()`, as `create_user()` keeps the case
+    # of the local part; served by the `UPPER(email)` index
+    taken = set(
+        AuthUser.objects.annotate(email_upper=Upper("email"))
+        .filter(email_upper__in=[email.upper() for email in by_email])
+        .values_list("email_upper", flat=True)
+    )
+    new = {email: r for email, r in by_email.items() if email.upper() not in taken}
+
+    # `make_password(None)` returns an unusable password without hashing anything
+    passwords = hash_passwords(
+        make_password, [r.get("password") or None for r in new.values()]
+    )
+    users = [
+        AuthUser(
+            email=email,
+            password=password,
+            first_name=record.get("first_name", ""),
+            last_name=record.get("last_name", ""),
+        )
+        for (email, record), password in zip(new.items(), passwords, strict=True)
+    ]
+
+    with transaction.atomic():
+        copy_objects(users)
+        copy_objects([UserProfile(user=user) for user in users])
+        copy_objects(
+            [
+                EmailAddress(user=user, email=user.email, primary=True, verified=verified)
+                for user in users
+            ]
+        )
+    return len(users)
@@ -0,0 +1,36 @@
+# Switch the primary key default to time-ordered UUIDv7. The default is applied by
+# Django rather than the database, so existing keys are left untouched and no table
+# rewrite takes place.
+
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0003_alter_authuser_manager"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="authuser",
+            name="id",
+            field=models.UUIDField(
+                default=uuid.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="userprofile",
+            name="id",
+            field=models.UUIDField(
+                default=uuid.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Index built with CREATE INDEX CONCURRENTLY so signups and logins are not blocked by a
+# lock on the users table while it is created.
+
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0004_alter_authuser_id_alter_userprofile_id"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="authuser",
+            index=models.Index(
+                django.db.models.functions.text.Upper("email"),
+                name="users_authuser_email_upper_idx",
+            ),
+        ),
+    ]
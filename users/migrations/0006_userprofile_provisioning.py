@@ -0,0 +1,24 @@
+# Only the field class changes, so `user.userprofile` creates missing profiles; the
+# database is left as is.
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations
+
+import users.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0005_authuser_email_upper_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="userprofile",
+            name="user",
+            field=users.models.ProvisioningOneToOneField(
+                on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL
+            ),
+        ),
+    ]
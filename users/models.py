@@ -1,12 +1,44 @@
 from django.contrib.auth.models import AbstractUser, UserManager
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models.fields.related_descriptors import ReverseOneToOneDescriptor
+from django.db.models.functions import Upper
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
-from testdjereo.models import UpdatedAtModel, UuidModel
+from testdjereo.models import UpdatedAtModel, UpdatedAtQuerySet, UuidModel
 
 
-class AuthUserManager(UserManager["AuthUser"]):
+class AuthUserQuerySet(UpdatedAtQuerySet):
+    def filter_by_email(self, email):
+        """Case-insensitive email lookup, served by the `UPPER(email)` index."""
+        return self.filter(email__iexact=email)
+
+    def bulk_create(self, objs, *args, provision_profiles=True, **kwargs):
+        """Also create a UserProfile per user, in one INSERT.
+
+        `bulk_create()` sends no `post_save` signals, so profiles are not otherwise
+        provisioned. Pass `provision_profiles=False` to skip this.
+        """
+        users = super().bulk_create(objs, *args, **kwargs)
+        if not provision_profiles or not users:
+            return users
+
+        provisioned = users
+        if kwargs.get("ignore_conflicts"):
+            # users skipped on conflict were not inserted and cannot have profiles
+            inserted = set(
+                self.model._base_manager.using(self.db)
+                .filter(pk__in=[u.pk for u in users])
+                .values_list("pk", flat=True)
+            )
+            provisioned = [u for u in users if u.pk in inserted]
+        UserProfile.objects.using(self.db).bulk_create(
+            [UserProfile(user=user) for user in provisioned], ignore_conflicts=True
+        )
+        return users
+
+
+class AuthUserManager(UserManager.from_queryset(AuthUserQuerySet)):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError("The 'email' field must be set")
@@ -34,25 +66,73 @@ class AuthUser(UpdatedAtModel, UuidModel, AbstractUser):
 
     objects = AuthUserManager()
 
+    # cached by `users.cache` instead, for the user of each request
+    ROW_CACHE_TIMEOUT = None
+
     class Meta:
         verbose_name = "auth user"
+        indexes = [
+            # `email__iexact` lookups compile to `UPPER(email) = UPPER(%s)`, which the
+            # unique B-tree on `email` cannot serve
+            models.Index(Upper("email"), name="users_authuser_email_upper_idx"),
+        ]
 
     def __str__(self):
         return self.email
 
-
-class UserProfile(UuidModel):
-    user: models.OneToOneField[UserProfile, AuthUser] = models.OneToOneField(
+    def get_session_auth_hash(self):
+        # users served by `users.cache` carry the hash rather than their password,
+        # until it is loaded or set
+        if "password" in self.get_deferred_fields() and hasattr(
+            self, "_session_auth_hash"
+        ):
+            return self._session_auth_hash
+        return super().get_session_auth_hash()
+
+
+class ProvisioningReverseOneToOneDescriptor(ReverseOneToOneDescriptor):
+    """`user.userprofile`, which creates the profile of a saved user without one, eg.
+    created by `bulk_create(provision_profiles=False)`."""
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        try:
+            return super().__get__(instance, cls)
+        except self.RelatedObjectDoesNotExist:
+            if instance._state.adding:
+                raise
+        manager = self.related.related_model._base_manager.db_manager(instance._state.db)
+        try:
+            with transaction.atomic(using=manager.db):
+                profile = manager.create(user=instance)
+        except IntegrityError:
+            # created concurrently
+            profile = manager.get(user=instance)
+        self.related.set_cached_value(instance, profile)
+        return profile
+
+
+class ProvisioningOneToOneField(models.OneToOneField):
+    related_accessor_class = ProvisioningReverseOneToOneDescriptor
+
+
+class UserProfile(UpdatedAtModel, UuidModel):
+    user: models.OneToOneField[UserProfile, AuthUser] = ProvisioningOneToOneField(
         "users.AuthUser",
         on_delete=models.CASCADE,
     )
 
+    # `UserProfile.objects.cached_get()`, see `testdjereo.cache.rows`; the profile of
+    # each request's user is cached along with them by `users.cache`
+    ROW_CACHE_TIMEOUT = 60 * 60
+
     def __str__(self):
         return f"Profile for {self.user}"
 
 
 @receiver(post_save, sender=AuthUser)
-def create_or_update_user_profile(
-    sender, instance, created, **kwargs
-):  # pragma: no cover
-    UserProfile.objects.update_or_create(user=instance)
+def create_user_profile(sender, instance, created, **kwargs):  # pragma: no cover
+    # only on creation, so logins & other saves of an existing user cost no extra queries
+    if created:
+        UserProfile.objects.create(user=instance)
@@ -2,7 +2,7 @@ from contextlib import contextmanager
 
 from django.db.models.signals import post_save
 
-from users.models import AuthUser, create_or_update_user_profile
+from users.models import AuthUser, create_user_profile
 
 
 @contextmanager
@@ -11,8 +11,8 @@ def disable_authuser_postsave_signal():
 
     Intended to be used alongside Factory Boy model factories."""
 
-    post_save.disconnect(create_or_update_user_profile, sender=AuthUser)
+    post_save.disconnect(create_user_profile, sender=AuthUser)
     try:
         yield
     finally:
-        post_save.connect(create_or_update_user_profile, sender=AuthUser)
+        post_save.connect(create_user_profile, sender=AuthUser)
@@ -2,7 +2,9 @@ from allauth.account.models import EmailAddress
 from django.contrib.auth import get_user_model
 from django.core import mail
 from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 
 from users.django_allauth.adapter import (
     AMBIGUOUS_EMAIL_CLASH_MESSAGE,
@@ -38,6 +40,20 @@ class CustomAccountAdapterTests(TestCase):
         self.assertEqual(len(mail.outbox), 1)
         self.assertIn("alice@example.com", mail.outbox[0].to)
 
+    def test_clean_email_existing_email_check_uses_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.adapter.clean_email("Bob@Example.com")
+        (query,) = [q["sql"] for q in ctx.captured_queries if "emailaddress" in q["sql"]]
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN {query}")
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+
+        self.assertIn("Index", plan)
+        self.assertNotIn("Seq Scan", plan)
+
     def test_error_message_replaced(self):
         self.assertEqual(
             self.adapter.error_messages["email_taken"],
@@ -0,0 +1,95 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from allauth.account.models import EmailAddress
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+import users.management.commands.import_users  # noqa: F401 - needed for coverage
+from users.models import UserProfile
+
+User = get_user_model()
+
+CSV = """email,password,first_name,last_name
+Alonso@Quijano.es,rocinante,Alonso,Quijano
+sancho@panza.es,,Sancho,Panza
+existing@example.com,,,
+"""
+
+NDJSON = """{"email": "alonso@quijano.es", "first_name": "Alonso"}
+
+{"email": "sancho@panza.es"}
+"""
+
+
+class ImportUsersTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        User.objects.create_user(email="existing@example.com")
+
+    def call_command(self, path, *args, workers=0):
+        out = StringIO()
+        call_command("import_users", path, f"--workers={workers}", *args, stdout=out)
+        return out.getvalue()
+
+    def write(self, name, content):
+        path = self.tmp / name
+        path.write_text(content)
+        return path
+
+    def test_import_csv(self):
+        out = self.call_command(self.write("users.csv", CSV), "--chunk-size=2")
+
+        self.assertIn("Records 0-1: 2 imported", out)
+        self.assertIn("Records 2-2: 0 imported", out)
+        self.assertIn("Imported 2 users", out)
+
+        alonso = User.objects.get(email="alonso@quijano.es")
+        self.assertEqual(alonso.first_name, "Alonso")
+        self.assertTrue(alonso.check_password("rocinante"))
+        self.assertIsNotNone(alonso.updated_at)
+        self.assertFalse(User.objects.get(email="sancho@panza.es").has_usable_password())
+        self.assertEqual(UserProfile.objects.filter(user__in=[alonso]).count(), 1)
+        address = EmailAddress.objects.get(user=alonso)
+        self.assertTrue(address.primary)
+        self.assertFalse(address.verified)
+
+    def test_import_ndjson_verified(self):
+        self.call_command(self.write("users.ndjson", NDJSON), "--verified")
+
+        self.assertEqual(User.objects.count(), 3)
+        self.assertEqual(EmailAddress.objects.filter(verified=True).count(), 2)
+
+    def test_rerun_skips_imported_users(self):
+        path = self.write("users.csv", CSV)
+        self.call_command(path)
+
+        out = self.call_command(path)
+
+        self.assertIn("Imported 0 users", out)
+        self.assertEqual(User.objects.count(), 3)
+
+    def test_skips_case_variants_of_existing_emails(self):
+        User.objects.create_user(email="Sancho@Panza.es")
+
+        out = self.call_command(self.write("users.csv", CSV))
+
+        self.assertIn("Imported 1 users", out)
+        self.assertEqual(User.objects.filter(email__iexact="sancho@panza.es").count(), 1)
+
+    def test_skip(self):
+        out = self.call_command(self.write("users.csv", CSV), "--skip=1")
+
+        self.assertIn("Records 1-2: 1 imported", out)
+        self.assertFalse(User.objects.filter(email="alonso@quijano.es").exists())
+
+    def test_hash_passwords_in_worker_processes(self):
+        self.call_command(self.write("users.csv", CSV), workers=2)
+
+        self.assertTrue(
+            User.objects.get(email="alonso@quijano.es").check_password("rocinante")
+        )
@@ -0,0 +1,174 @@
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from users import cache as user_cache
+from users.backends import CachedModelBackend
+from users.factories import AuthUserFactory
+from users.models import AuthUser, UserProfile
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "sessions": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class UserCacheTestCase(TestCase):
+    def setUp(self):
+        self.addCleanup(cache.clear)
+        self.user = AuthUser.objects.create_user(email="sancho@panza.es")
+
+    def test_get_user_caches_user_and_profile(self):
+        profile = UserProfile.objects.get(user=self.user)
+        user_cache.get_user(self.user.pk)
+
+        with self.assertNumQueries(0):
+            user = user_cache.get_user(self.user.pk)
+            self.assertEqual(user, self.user)
+            self.assertEqual(user.userprofile, profile)
+
+    def test_get_missing_user(self):
+        self.assertIsNone(user_cache.get_user(AuthUserFactory.build().pk))
+
+    def test_save_invalidates_user(self):
+        user_cache.get_user(self.user.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = "Sancho"
+            self.user.save()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(user_cache.get_user(self.user.pk).first_name, "Sancho")
+        with self.assertNumQueries(0):
+            user_cache.get_user(self.user.pk)
+
+    def test_save_with_update_fields_invalidates_user(self):
+        user_cache.get_user(self.user.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            update_last_login(None, self.user)
+
+        with self.assertNumQueries(1):
+            self.assertIsNotNone(user_cache.get_user(self.user.pk).last_login)
+        with self.assertNumQueries(0):
+            user_cache.get_user(self.user.pk)
+
+    def test_queryset_update_invalidates_user(self):
+        user_cache.get_user(self.user.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AuthUser.objects.filter(pk=self.user.pk).update(first_name="Sancho")
+
+        self.assertEqual(user_cache.get_user(self.user.pk).first_name, "Sancho")
+
+    def test_queryset_update_moves_version_on(self):
+        stale = AuthUser.objects.select_related("userprofile").get(pk=self.user.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AuthUser.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        # a request which loaded the user before the update cannot cache them
+        self.assertFalse(
+            cache.add(
+                user_cache.version_key(self.user.pk), user_cache.user_version(stale)
+            )
+        )
+        self.assertIsNone(CachedModelBackend().get_user(self.user.pk))
+
+    def test_bulk_update_invalidates_user(self):
+        user_cache.get_user(self.user.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = "Sancho"
+            AuthUser.objects.bulk_update([self.user], ["first_name"])
+
+        self.assertEqual(user_cache.get_user(self.user.pk).first_name, "Sancho")
+
+    def test_password_is_not_cached(self):
+        self.user.set_password("rocinante")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        user_cache.get_user(self.user.pk)
+
+        version = cache.get(user_cache.version_key(self.user.pk))
+        entry = cache.get(user_cache.user_key(self.user.pk, version))
+        self.assertNotIn(self.user.password, entry[0])
+        with self.assertNumQueries(0):
+            user = user_cache.get_user(self.user.pk)
+            self.assertEqual(
+                user.get_session_auth_hash(), self.user.get_session_auth_hash()
+            )
+        # not the cached hash once the password changes
+        user.set_password("dulcinea")
+        self.assertEqual(
+            user.get_session_auth_hash(),
+            AuthUser(password=user.password).get_session_auth_hash(),
+        )
+
+    def test_delete_invalidates_user(self):
+        user_cache.get_user(self.user.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AuthUser.objects.get(pk=self.user.pk).delete()
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(user_cache.get_user(self.user.pk))
+
+    def test_profile_delete_invalidates_user(self):
+        user_cache.get_user(self.user.pk)
+        profile = UserProfile.objects.get(user=self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.delete()
+
+        user = user_cache.get_user(self.user.pk)
+        # not the deleted profile, but one provisioned on access
+        self.assertNotEqual(user.userprofile, profile)
+
+    def test_backend_rejects_inactive_user(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        self.assertIsNone(CachedModelBackend().get_user(self.user.pk))
+
+    def test_index_makes_no_user_queries(self):
+        self.client.force_login(self.user)
+        self.client.get("/")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/")
+
+        self.assertContains(response, "sancho@panza.es")
+        table = AuthUser._meta.db_table
+        self.assertEqual([q["sql"] for q in queries if table in q["sql"]], [])
+
+    def test_sessions_of_uncached_backends_are_kept(self):
+        self.client.force_login(
+            self.user, backend="django.contrib.auth.backends.ModelBackend"
+        )
+
+        response = self.client.get("/")
+
+        self.assertContains(response, "sancho@panza.es")
+
+
+class UserCacheCheckTestCase(SimpleTestCase):
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_process_local_cache(self):
+        errors = user_cache.check_user_cache()
+
+        self.assertEqual([error.id for error in errors], ["users.E001"])
+
+    def test_shared_cache(self):
+        self.assertEqual(user_cache.check_user_cache(), [])
+
+    @override_settings(
+        CACHES=LOCMEM_CACHES,
+        AUTHENTICATION_BACKENDS=["django.contrib.auth.backends.ModelBackend"],
+    )
+    def test_uncached_backends(self):
+        self.assertEqual(user_cache.check_user_cache(), [])
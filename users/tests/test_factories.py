@@ -1,4 +1,5 @@
 from django.test import TestCase
+from factory.random import reseed_random
 
 from users.factories import AuthUserFactory, UserProfileFactory
 from users.models import AuthUser, UserProfile
@@ -28,3 +29,51 @@ class UserProfileFactoryTest(TestCase):
         profile = UserProfileFactory()
 
         self.assertEqual(UserProfile.objects.filter(user=profile.user).count(), 1)
+
+
+class BulkCreateBatchTest(TestCase):
+    def test_authuser_bulk_create_batch(self):
+        with self.assertNumQueries(1):
+            users = AuthUserFactory.bulk_create_batch(3, first_name="Ada")
+
+        self.assertEqual(len(users), 3)
+        self.assertQuerySetEqual(
+            AuthUser.objects.order_by("id"), sorted(users, key=lambda u: u.id)
+        )
+        self.assertEqual({u.first_name for u in AuthUser.objects.all()}, {"Ada"})
+        self.assertFalse(UserProfile.objects.exists())
+
+    def test_authuser_bulk_create_batch_matches_create_batch(self):
+        fields = ["username", "email", "first_name", "last_name", "password", "is_active"]
+
+        def saved_users(create):
+            reseed_random("bulk")
+            users = create(2)
+            return list(
+                AuthUser.objects.filter(id__in=[u.id for u in users])
+                .order_by("email")
+                .values(*fields)
+            )
+
+        created = saved_users(AuthUserFactory.create_batch)
+        AuthUser.objects.all().delete()
+        bulk_created = saved_users(AuthUserFactory.bulk_create_batch)
+
+        self.assertEqual(created, bulk_created)
+
+    def test_userprofile_bulk_create_batch(self):
+        with self.assertNumQueries(2):
+            profiles = UserProfileFactory.bulk_create_batch(3)
+
+        self.assertEqual(UserProfile.objects.count(), 3)
+        self.assertEqual(AuthUser.objects.count(), 3)
+        for profile in profiles:
+            self.assertEqual(UserProfile.objects.get(user=profile.user), profile)
+
+    def test_userprofile_bulk_create_batch_with_existing_user(self):
+        user = AuthUserFactory()
+
+        with self.assertNumQueries(1):
+            (profile,) = UserProfileFactory.bulk_create_batch(1, user=user)
+
+        self.assertEqual(UserProfile.objects.get(user=user), profile)
@@ -1,4 +1,6 @@
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.db import connection
 from django.test import TestCase
 
 from users.models import AuthUser, UserProfile
@@ -17,6 +19,20 @@ class AuthUserTestCase(TestCase):
         profile = AuthUser.objects.get(username=self.user.username)
         self.assertIsNotNone(profile.updated_at)
 
+    def test_id_is_time_ordered_uuid7(self):
+        later_user = get_user_model().objects.create_user(email="later@quijano.es")
+
+        self.assertEqual(self.user.id.version, 7)
+        self.assertLess(self.user.id, later_user.id)
+
+    def test_queryset_update_stamps_updated_at(self):
+        initial_updated_at = self.user.updated_at
+
+        AuthUser.objects.filter(pk=self.user.pk).update(first_name="Sancho")
+
+        self.user.refresh_from_db()
+        self.assertGreater(self.user.updated_at, initial_updated_at)
+
     def test_create_user_without_email_raises_error(self):
         with self.assertRaises(ValueError) as err:
             get_user_model().objects.create_user(email=None, password="testpassword")
@@ -30,6 +46,34 @@ class AuthUserTestCase(TestCase):
         self.assertTrue(superuser.is_superuser)
 
 
+class AuthUserEmailLookupTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email="dulcinea@toboso.es")
+
+    def explain(self, queryset):
+        # tables in tests are tiny, so force the planner to use an index if it can
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def test_filter_by_email_is_case_insensitive(self):
+        self.assertEqual(
+            list(AuthUser.objects.filter_by_email("Dulcinea@Toboso.ES")), [self.user]
+        )
+
+    def test_filter_by_email_uses_upper_email_index(self):
+        plan = self.explain(AuthUser.objects.filter_by_email("Dulcinea@Toboso.ES"))
+
+        self.assertIn("Index Scan using users_authuser_email_upper_idx", plan)
+
+    def test_login_email_lookup_uses_index(self):
+        # allauth lowercases the address and looks users up by exact match
+        plan = self.explain(AuthUser.objects.filter(email="dulcinea@toboso.es"))
+
+        self.assertIn("Index Scan using users_authuser_email", plan)
+
+
 class UserProfileTestCase(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -43,3 +87,73 @@ class UserProfileTestCase(TestCase):
         profile = UserProfile.objects.get(user=self.user)
         self.assertEqual(profile.user, self.user)
         self.assertEqual(str(profile), f"Profile for {self.user}")
+
+    def test_login_does_not_touch_user_profile(self):
+        # previously an upsert of the profile followed every save of the user
+        with self.assertNumQueries(1):
+            update_last_login(None, self.user)
+
+    def test_profile_is_provisioned_lazily(self):
+        (user,) = AuthUser.objects.bulk_create(
+            [AuthUser(email="lazy@quijano.es")], provision_profiles=False
+        )
+
+        # the profile lookup, & the insert in a savepoint
+        with self.assertNumQueries(4):
+            profile = user.userprofile
+        with self.assertNumQueries(0):
+            self.assertEqual(user.userprofile, profile)
+        self.assertEqual(UserProfile.objects.get(user=user), profile)
+
+    def test_existing_profile_is_not_recreated(self):
+        user = AuthUser.objects.get(pk=self.user.pk)
+        profile = UserProfile.objects.get(user=self.user)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(user.userprofile, profile)
+
+    def test_unsaved_user_has_no_profile(self):
+        with self.assertRaises(AuthUser.userprofile.RelatedObjectDoesNotExist):
+            AuthUser(email="unsaved@quijano.es").userprofile  # noqa: B018
+
+    def test_bulk_create_provisions_profiles_in_one_insert(self):
+        users = [AuthUser(email=f"bulk{i}@quijano.es") for i in range(3)]
+
+        with self.assertNumQueries(2):
+            AuthUser.objects.bulk_create(users)
+
+        self.assertEqual(UserProfile.objects.filter(user__in=users).count(), 3)
+
+    def test_bulk_create_without_profiles(self):
+        users = [AuthUser(email=f"bulk{i}@quijano.es") for i in range(3)]
+
+        with self.assertNumQueries(1):
+            AuthUser.objects.bulk_create(users, provision_profiles=False)
+
+        self.assertFalse(UserProfile.objects.filter(user__in=users).exists())
+
+    def test_bulk_create_ignore_conflicts_only_provisions_inserted_users(self):
+        UserProfile.objects.filter(user=self.user).delete()
+        users = [AuthUser(email=self.user.email), AuthUser(email="new@quijano.es")]
+
+        AuthUser.objects.bulk_create(users, ignore_conflicts=True)
+
+        self.assertFalse(UserProfile.objects.filter(user=self.user).exists())
+        self.assertTrue(UserProfile.objects.filter(user__email="new@quijano.es").exists())
+
+    def test_bulk_upsert_provisions_profiles_of_existing_rows(self):
+        UserProfile.objects.filter(user=self.user).delete()
+        users = [
+            AuthUser(email=self.user.email, first_name="Alonso"),
+            AuthUser(email="new@quijano.es", first_name="New"),
+        ]
+
+        AuthUser.objects.bulk_upsert(
+            users, unique_fields=["email"], update_fields=["first_name"]
+        )
+
+        self.assertEqual(users[0].pk, self.user.pk)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, "Alonso")
+        self.assertTrue(UserProfile.objects.filter(user=self.user).exists())
+        self.assertTrue(UserProfile.objects.filter(user=users[1]).exists())
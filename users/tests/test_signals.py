@@ -1,18 +1,14 @@
-from django.db.models.signals import post_save
-from django.test import SimpleTestCase
+from django.test import TestCase
 
-from users.models import AuthUser
+from users.models import AuthUser, UserProfile
 from users.signals import disable_authuser_postsave_signal
 
 
-class UserProfileTestCase(SimpleTestCase):
+class UserProfileTestCase(TestCase):
     def test_disable_authuser_postsave_signal(self):
-        has_listeners_before = post_save.has_listeners(AuthUser)
-
         with disable_authuser_postsave_signal():
-            has_listeners_in_context = post_save.has_listeners(AuthUser)
-        has_listeners_after = post_save.has_listeners(AuthUser)
+            without_profile = AuthUser.objects.create_user(email="sancho@panza.es")
+        with_profile = AuthUser.objects.create_user(email="alonso@quijano.es")
 
-        self.assertTrue(has_listeners_before)
-        self.assertFalse(has_listeners_in_context)
-        self.assertTrue(has_listeners_after)
+        self.assertFalse(UserProfile.objects.filter(user=without_profile).exists())
+        self.assertTrue(UserProfile.objects.filter(user=with_profile).exists())